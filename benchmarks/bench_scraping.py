@@ -0,0 +1,108 @@
+"""Benchmark full-tree parsing against the targeted scraping layer.
+
+Usage:
+    python benchmarks/bench_scraping.py [saved_page.html ...]
+
+Pass pages saved from ``https://github.com/<owner>/<repo>`` (repository home
+pages, README extraction) or ``https://github.com/<owner>/<repo>/network/dependents``
+(dependents extraction); the kind of each page is detected from its content.
+Without arguments, synthetic pages of a similar size and shape are generated:
+their README sits inside the ``main#js-repo-pjax-container`` element that wraps
+the file tree and most of the page, as on current GitHub markup.
+"""
+
+import sys
+import timeit
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+from khc_cli.utils.scraping import HTML_PARSER, find_readme_container, parse_dependents_page
+
+REPEAT = 5
+
+
+def _noise(blocks):
+    return "".join(
+        f'<div class="d-flex flex-items-center"><span class="color-fg-muted">item {i}</span>'
+        f'<svg class="octicon"><path d="M0 0h16v16H0z"></path></svg></div>'
+        for i in range(blocks)
+    )
+
+
+def synthetic_dependents_page(rows=30, noise_blocks=2000):
+    """Build a page with the same structure as a GitHub dependents page."""
+    noise = _noise(noise_blocks)
+    box_rows = "".join(
+        f'<div class="Box-row d-flex flex-items-center">'
+        f'<a data-repository-hovercards-enabled="" href="/owner{i}">owner{i}</a> / '
+        f'<a data-hovercard-type="repository" href="/owner{i}/repo{i}">repo{i}</a>'
+        f'<span class="color-fg-muted">{i}</span></div>'
+        for i in range(rows)
+    )
+    pagination = (
+        '<div class="paginate-container"><div class="BtnGroup">'
+        '<a class="btn" href="?page=1">Previous</a><a class="btn" href="?page=3">Next</a></div></div>'
+    )
+    return f"<html><head></head><body><header>{noise}</header><main>{box_rows}{pagination}</main>" \
+           f"<footer>{noise}</footer></body></html>".encode("utf-8")
+
+
+def synthetic_repository_page(files=300, readme_items=200, noise_blocks=500):
+    """Build a page with the same structure as a GitHub repository home page."""
+    file_rows = "".join(
+        f'<tr class="react-directory-row"><td><svg class="octicon"><path d="M0 0h16v16H0z"></path></svg>'
+        f'<a class="Link--primary" href="/owner/repo/blob/main/file{i}.py">file{i}.py</a></td>'
+        f'<td><a class="Link--secondary" href="/owner/repo/commit/{i:040x}">Commit {i}</a></td>'
+        f'<td><relative-time datetime="2024-01-01T00:00:00Z">Jan 1</relative-time></td></tr>'
+        for i in range(files)
+    )
+    readme = "".join(
+        f'<h2>Section {i}</h2><ul><li><a href="https://github.com/owner/project{i}">Project {i}</a> - text.</li></ul>'
+        for i in range(readme_items)
+    )
+    main = (
+        f'<main id="js-repo-pjax-container"><nav>{_noise(noise_blocks)}</nav>'
+        f'<table aria-labelledby="folders-and-files">{file_rows}</table>'
+        f'<div id="readme" class="Box-sc-g0xbh4-0"><article class="markdown-body entry-content container-lg">'
+        f'{readme}</article></div><div class="Layout-sidebar">{_noise(noise_blocks)}</div></main>'
+    )
+    return f"<html><head></head><body><header>{_noise(noise_blocks)}</header>{main}" \
+           f"<footer>{_noise(noise_blocks)}</footer></body></html>".encode("utf-8")
+
+
+def full_dependents(content):
+    """Reference implementation: whole tree built with html.parser."""
+    soup = BeautifulSoup(content, "html.parser")
+    rows = soup.find_all("div", {"class": "Box-row"})
+    return [row.find("a", {"data-hovercard-type": "repository"}) for row in rows]
+
+
+def full_readme(content):
+    """Reference implementation: whole tree built with html.parser."""
+    return BeautifulSoup(content, "html.parser").find("div", {"id": "readme"})
+
+
+def bench(name, content):
+    if b"Box-row" in content:
+        full_parse, targeted_parse = full_dependents, parse_dependents_page
+    else:
+        full_parse, targeted_parse = full_readme, find_readme_container
+    full = min(timeit.repeat(lambda: full_parse(content), number=1, repeat=REPEAT))
+    targeted = min(timeit.repeat(lambda: targeted_parse(content), number=1, repeat=REPEAT))
+    print(f"{name} ({targeted_parse.__name__}): {len(content) / 1024:.0f} KiB, "
+          f"full html.parser {full * 1000:.1f} ms, targeted ({HTML_PARSER}) {targeted * 1000:.1f} ms, "
+          f"speedup x{full / targeted:.1f}")
+
+
+def main():
+    pages = [Path(arg) for arg in sys.argv[1:]]
+    if not pages:
+        bench("synthetic dependents", synthetic_dependents_page())
+        bench("synthetic repository", synthetic_repository_page())
+    for page in pages:
+        bench(page.name, page.read_bytes())
+
+
+if __name__ == "__main__":
+    main()
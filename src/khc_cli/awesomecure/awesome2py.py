@@ -2,8 +2,13 @@ from markdown import markdownFromFile, markdown
 from bs4 import BeautifulSoup, element, Tag
 from pprint import pprint
 
+import re
 import sys
 
+HEADING = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+LINKED_LIST_ITEM = re.compile(r"^\s*[-*+]\s+\[([^\]]*)\]\(")
+FENCE = re.compile(r"^\s*(```|~~~)")
+
 class AwesomeListRubric(object):
     def __init__(self, key, rubricEntries):
         super(AwesomeListRubric, self).__init__()
@@ -47,12 +52,21 @@ class AwesomeListEntry(object):
         return str(self)
        
 class AwesomeList(object):
-    def __init__(self, path):
+    def __init__(self, path, lazy=False):
+        """
+        Parse an Awesome list.
+
+        With ``lazy=True`` nothing is parsed up front and ``rubrics`` stays empty:
+        the entries are parsed section by section while iterating ``iter_entries()``.
+        """
         super().__init__()
+        self.path = path
+        self.lazy = lazy
         self.rubrics = []
-        soup = self.convertFromHtml(path)
-        contents, d = self.generateDict(soup)
-        self.createStructure(contents, d)
+        if not lazy:
+            soup = self.convertFromHtml(path)
+            contents, d = self.generateDict(soup)
+            self.createStructure(contents, d)
     def convertFromHtml(self, path):
         html = markdown(open(path).read())
         soup = BeautifulSoup(html, features='html.parser')
@@ -67,19 +81,26 @@ class AwesomeList(object):
         ### find content h2
         while True:
             toc = soup.find("h2")
-            if toc and toc.get_text() == "Contents":
-                toc.extract() ## extract will consume the item
+            if toc is None:
+                break
+            toc.extract() ## extract will consume the item
+            if toc.get_text() == "Contents":
                 aList = self.findList(soup)
                 if aList:
                     for item in self.findListItems(aList):
-                        ali = AwesomeListEntry(item)
-                        d[ali.name] = ali.htmldata
+                        self.addContentsEntry(d, AwesomeListEntry(item))
                 break
         ### remove "Contents" from contents dict
         if "Contens" in d:
             del d["Contents"]
         return d
 
+    def addContentsEntry(self, d, ali):
+        ### nested contents entries are the sub list (h3) rubrics
+        d[ali.name] = ali.htmldata
+        for child in ali.children:
+            self.addContentsEntry(d, child)
+
     def generateDict(self, soup):
         ### we ll specifically fetch the contents entry        
         contents = self.findContents(soup)
@@ -144,6 +165,118 @@ class AwesomeList(object):
             children = tree
         return children
     
+    ########################################################
+    def scanOutline(self):
+        """
+        Cheap line based pre-scan of the markdown file, without any HTML parsing.
+
+        Returns:
+            Tuple ``(contents, subListsAreUsed, counts)``: the rubric names listed in the
+            "Contents" section, whether h3 sub lists are used, and the number of linked
+            list items (nested ones included) per ``(level, heading)``.
+        """
+        contents = []
+        subListsAreUsed = False
+        counts = {}
+        heading = None
+        inFence = False
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                if FENCE.match(line):
+                    inFence = not inFence
+                    continue
+                if inFence:
+                    continue
+                match = HEADING.match(line)
+                if match:
+                    heading = (len(match.group(1)), match.group(2))
+                    if heading[0] == 3:
+                        subListsAreUsed = True
+                    continue
+                item = LINKED_LIST_ITEM.match(line)
+                if item and heading:
+                    if heading == (2, "Contents"):
+                        contents.append(item.group(1).strip())
+                    else:
+                        counts[heading] = counts.get(heading, 0) + 1
+        return contents, subListsAreUsed, counts
+
+    def count_entries(self):
+        """Return the number of entries ``iter_entries()`` will yield, using the cheap pre-scan."""
+        if not self.lazy:
+            return sum(1 for _ in self.iter_entries())
+        contents, subListsAreUsed, counts = self.scanOutline()
+        level = 3 if subListsAreUsed else 2
+        names = set(contents)
+        return sum(n for (l, title), n in counts.items() if l == level and title in names)
+
+    def iterSections(self):
+        """Yield ``(level, heading, markdown)`` for each heading section of the file."""
+        heading = None
+        lines = []
+        inFence = False
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                if FENCE.match(line):
+                    inFence = not inFence
+                match = None if inFence else HEADING.match(line)
+                if match:
+                    if heading:
+                        yield heading[0], heading[1], "".join(lines)
+                    heading = (len(match.group(1)), match.group(2))
+                    lines = []
+                else:
+                    lines.append(line)
+        if heading:
+            yield heading[0], heading[1], "".join(lines)
+
+    def iterSectionEntries(self, text):
+        """Parse the first list of a section and yield its top level entries."""
+        soup = BeautifulSoup(markdown(text), features='html.parser')
+        aList = self.findList(soup)
+        if not aList:
+            return
+        for item in self.findListItems(aList):
+            me, _ = item
+            if me.find("a", href=True) is None:
+                continue
+            yield AwesomeListEntry(item)
+
+    def iterRubrics(self):
+        """Yield ``(rubric_key, entries)`` pairs, parsing one section at a time."""
+        _, subListsAreUsed, _ = self.scanOutline()
+        level = 3 if subListsAreUsed else 2
+        contents = None
+        for sectionLevel, title, text in self.iterSections():
+            if contents is None:
+                if sectionLevel == 2 and title == "Contents":
+                    contents = {}
+                    for ali in self.iterSectionEntries(text):
+                        self.addContentsEntry(contents, ali)
+                continue
+            if sectionLevel == level and title in contents:
+                yield title, self.iterSectionEntries(text)
+
+    def iter_entries(self):
+        """
+        Yield ``(rubric_key, entry, depth)`` for every entry, nested children included.
+
+        In lazy mode the markdown is converted and parsed one section at a time, so that
+        consumers can start working on the first entries before the whole list is parsed.
+        """
+        if self.lazy:
+            rubrics = self.iterRubrics()
+        else:
+            rubrics = ((rubric.key, rubric.entries) for rubric in self.rubrics)
+        for rubricKey, entries in rubrics:
+            for entry in entries:
+                yield from self.iterEntryTree(rubricKey, entry)
+
+    def iterEntryTree(self, rubricKey, entry):
+        yield rubricKey, entry, entry.depth
+        for child in entry.children:
+            yield from self.iterEntryTree(rubricKey, child)
+
     def __str__(self):
         s = ""
         for e in self.rubrics:
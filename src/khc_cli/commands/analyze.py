@@ -11,7 +11,6 @@ from typing_extensions import Annotated
 from urllib.parse import urlparse
 
 from khc_cli.github_client import GitHubClient
-from khc_cli.utils.helpers import crawl_github_dependents
 from khc_cli.utils.template_loader import get_awesome_list_template
 
 app = typer.Typer()
@@ -20,40 +19,39 @@ LOGGER = logging.getLogger(__name__)
 # Load environment variables from .env file
 load_dotenv()
 
+def parse_forges(values):
+    """Parse ``host=kind`` or ``base_url=kind`` options into a mapping of forge instances to their kind."""
+    from khc_cli.utils.forges import ADAPTER_CLASSES
+    
+    forges = {}
+    for value in values or []:
+        instance, _, kind = value.rpartition("=")
+        if not instance or kind.strip().lower() not in ADAPTER_CLASSES:
+            console.print(f"[red]Invalid forge '{value}', expected host=kind or base_url=kind with kind in: {', '.join(ADAPTER_CLASSES)}[/red]")
+            raise typer.Exit(1)
+        forges[instance.strip()] = kind.strip().lower()
+    return forges
+
 @app.command()
 def repo(
     repo_name: Annotated[str, typer.Argument(help="Repository name (e.g., owner/repo)")],
     output_format: Annotated[str, typer.Option("--format", "-f", help="Output format: table, json")] = "table",
     github_api_key: Annotated[str, typer.Option(envvar="GITHUB_API_KEY", help="GitHub API Key")] = None,
+    daemon: Annotated[bool, typer.Option(help="Route the lookup through 'khc-cli serve' when it is running")] = True,
 ):
     """Analyze a specific GitHub repository."""
+    from khc_cli.utils.daemon import call_daemon, repo_summary
     
     with Progress() as progress:
         task = progress.add_task("Analyzing repository...", total=100)
         
-        github_client = GitHubClient(github_api_key)
-        
         try:
-            repo = github_client.client.get_repo(repo_name)
-            
-            if not repo:
-                console.print(f"[red]Repository {repo_name} not found[/red]")
-                raise typer.Exit(1)
-            
-            progress.update(task, advance=50)
-        
-            # Collect information
-            info = {
-                "name": repo.name,
-                "stars": repo.stargazers_count,
-                "forks": repo.forks_count,
-                "language": repo.language,
-                "description": repo.description,
-                "last_update": repo.updated_at.isoformat() if repo.updated_at else None,
-                "dependents": len(crawl_github_dependents(repo_name, 5))
-            }
-            
-            progress.update(task, advance=50)
+            info = call_daemon("/repo", {"name": repo_name}) if daemon else None
+            if info is None:
+                github_client = GitHubClient(github_api_key)
+                progress.update(task, advance=50)
+                info = repo_summary(github_client, repo_name)
+            progress.update(task, completed=100)
         except Exception as e:
             console.print(f"[red]Error analyzing repository {repo_name}: {e}[/red]")
             raise typer.Exit(1)
@@ -77,6 +75,14 @@ def etl(
     output_dir: Annotated[Path, typer.Option(help="Output directory")] = Path("./csv"),
     github_api_key: Annotated[str, typer.Option(envvar="GITHUB_API_KEY", help="GitHub API Key")] = None,
     use_template: Annotated[bool, typer.Option(help="Use Awesome List template for analyze command")]= True,
+    snapshot: Annotated[bool, typer.Option(help="Persist raw API payloads in a snapshot archive for offline transforms")] = True,
+    git_metrics: Annotated[bool, typer.Option(help="Compute commit metrics from local partial clones instead of the API")] = False,
+    git_cache_dir: Annotated[Path, typer.Option(help="Cache directory of the partial clones")] = Path.home() / ".cache" / "khc-cli" / "git",
+    git_processes: Annotated[int, typer.Option(help="Number of processes used to update clones and compute metrics")] = 4,
+    budget: Annotated[int, typer.Option(help="Maximum requests sent to GitHub for repositories, all enabled stages included; most overdue and volatile first")] = None,
+    forge: Annotated[list[str], typer.Option(help="Self-hosted forge to enrich, as host=kind or base_url=kind with kind gitlab or gitea (repeatable)")] = None,
+    readmes: Annotated[bool, typer.Option(help="Store project READMEs in a compressed blob store, referenced by hash")] = False,
+    issue_metrics: Annotated[bool, typer.Option(help="Fetch issue and pull request counts with batched count-only GraphQL queries")] = False,
 ):
     """Run the ETL pipeline for an Awesome list."""
     from khc_cli.commands.etl import run_etl_pipeline
@@ -114,5 +120,348 @@ def etl(
         local_readme_path=output_dir / ".awesome-cache.md",
         projects_csv_path=projects_csv_path,
         orgs_csv_path=orgs_csv_path,
-        github_api_key=github_api_key
-    )
\ No newline at end of file
+        github_api_key=github_api_key,
+        snapshot_dir=output_dir / "snapshots" if snapshot else None,
+        repo_index_path=output_dir / "repo-index.json",
+        git_cache_dir=git_cache_dir if git_metrics else None,
+        git_processes=git_processes,
+        budget=budget,
+        schedule_path=output_dir / "refresh-schedule.json",
+        forges=parse_forges(forge),
+        readme_store_dir=output_dir / "readmes" if readmes else None,
+        issue_metrics=issue_metrics,
+        issue_stats_path=output_dir / "issue-metrics-stats.json",
+        forge_cache_path=output_dir / "forge-cache.json",
+    )
+
+@app.command()
+def transform(
+    snapshot: Annotated[Path, typer.Option(help="Snapshot segment, or archive directory (latest segment is used)")] = Path("./csv/snapshots"),
+    output_dir: Annotated[Path, typer.Option(help="Output directory")] = Path("./csv"),
+):
+    """Rebuild the ETL outputs from a snapshot archive, without any network call."""
+    from khc_cli.commands.etl import run_transform_from_snapshot
+    
+    output_dir.mkdir(parents=True, exist_ok=True)
+    projects_csv_path = output_dir / "projects.csv"
+    orgs_csv_path = output_dir / "github_organizations.csv"
+    
+    try:
+        count = run_transform_from_snapshot(snapshot, projects_csv_path, orgs_csv_path)
+    except FileNotFoundError as e:
+        console.print(f"[red]Error: {e}[/red]")
+        raise typer.Exit(1)
+    
+    console.print(f"[green]{count} projects rebuilt from {snapshot} into {projects_csv_path} and {orgs_csv_path}[/green]")
+
+@app.command()
+def shard_init(
+    awesome_repo_url: Annotated[str, typer.Option(help="URL of the Awesome list")] = "https://api.github.com/repos/Krypto-Hashers-Community/khc-cli/contents/README.md",
+    queue: Annotated[Path, typer.Option(help="Path of the SQLite work queue")] = Path("./csv/etl-queue.sqlite"),
+    github_api_key: Annotated[str, typer.Option(envvar="GITHUB_API_KEY", help="GitHub API Key")] = None,
+):
+    """Split the entries of an Awesome list into work items for sharded ETL workers."""
+    from khc_cli.commands.shard import run_shard_coordinator
+    
+    try:
+        count = run_shard_coordinator(
+            awesome_repo_url=awesome_repo_url,
+            awesome_readme_filename="README.md",
+            local_readme_path=queue.parent / ".awesome-cache.md",
+            queue_path=queue,
+            github_api_key=github_api_key,
+            repo_index_path=queue.parent / "repo-index.json",
+        )
+    except Exception as e:
+        console.print(f"[red]Error extracting README: {e}[/red]")
+        raise typer.Exit(1)
+    
+    console.print(f"[green]{count} work items enqueued in {queue}[/green]")
+
+@app.command()
+def shard_work(
+    queue: Annotated[Path, typer.Option(help="Path of the SQLite work queue")] = Path("./csv/etl-queue.sqlite"),
+    processes: Annotated[int, typer.Option(help="Number of worker processes")] = 1,
+    batch_size: Annotated[int, typer.Option(help="Number of items claimed at once by a worker")] = 10,
+    github_api_key: Annotated[str, typer.Option(envvar="GITHUB_API_KEY", help="GitHub API Key, or several keys separated by commas")] = None,
+):
+    """Claim and enrich work items of a sharded ETL run until the queue is drained."""
+    from khc_cli.commands.shard import run_shard_workers
+    from khc_cli.utils.work_queue import WorkQueue
+    
+    if not queue.exists():
+        console.print(f"[red]Queue {queue} does not exist, run 'khc-cli analyze shard-init' first[/red]")
+        raise typer.Exit(1)
+    
+    run_shard_workers(queue, github_api_key, processes=processes, batch_size=batch_size)
+    
+    with WorkQueue(queue) as work_queue:
+        counts = work_queue.counts()
+    table = Table(title=f"Work queue {queue}")
+    table.add_column("Status", style="cyan")
+    table.add_column("Items", style="green")
+    for status, count in sorted(counts.items()):
+        table.add_row(status, str(count))
+    console.print(table)
+
+@app.command()
+def shard_merge(
+    queue: Annotated[Path, typer.Option(help="Path of the SQLite work queue")] = Path("./csv/etl-queue.sqlite"),
+    output_dir: Annotated[Path, typer.Option(help="Output directory")] = Path("./csv"),
+    snapshot: Annotated[bool, typer.Option(help="Persist raw API payloads in a snapshot archive for offline transforms")] = True,
+):
+    """Assemble the ordered CSV outputs of a sharded ETL run."""
+    from khc_cli.commands.shard import run_shard_merge
+    
+    output_dir.mkdir(parents=True, exist_ok=True)
+    projects_csv_path = output_dir / "projects.csv"
+    orgs_csv_path = output_dir / "github_organizations.csv"
+    
+    failures = run_shard_merge(
+        queue,
+        projects_csv_path,
+        orgs_csv_path,
+        snapshot_dir=output_dir / "snapshots" if snapshot else None,
+    )
+    
+    console.print(f"[green]Output merged into {projects_csv_path} and {orgs_csv_path}[/green]")
+    if failures:
+        console.print(f"[yellow]{len(failures)} entries were not processed:[/yellow]")
+        for failed_url in failures:
+            console.print(f"  - {failed_url}")
+
+
+@app.command()
+def plan(
+    awesome_repo_url: Annotated[str, typer.Option(help="URL of the Awesome list")] = "https://api.github.com/repos/Krypto-Hashers-Community/khc-cli/contents/README.md",
+    readme: Annotated[Path, typer.Option(help="Local copy of the list; avoids downloading it")] = None,
+    output_dir: Annotated[Path, typer.Option(help="Output directory of the ETL (for its repository index and measured query costs)")] = Path("./csv"),
+    concurrency: Annotated[int, typer.Option(help="Number of parallel workers (see shard-work)")] = 1,
+    latency: Annotated[float, typer.Option(help="Mean duration of one API request, in seconds")] = 0.5,
+    git_metrics: Annotated[bool, typer.Option(help="Plan for commit metrics computed from local partial clones")] = False,
+    git_cache_dir: Annotated[Path, typer.Option(help="Cache directory of the partial clones")] = Path.home() / ".cache" / "khc-cli" / "git",
+    git_processes: Annotated[int, typer.Option(help="Number of processes used to update clones and compute metrics")] = 4,
+    readmes: Annotated[bool, typer.Option(help="Plan for fetching project READMEs")] = False,
+    issue_metrics: Annotated[bool, typer.Option(help="Plan for fetching issue and pull request counts")] = False,
+    forge: Annotated[list[str], typer.Option(help="Self-hosted forge enriched by the ETL, as host=kind or base_url=kind (repeatable)")] = None,
+    github_api_key: Annotated[str, typer.Option(envvar="GITHUB_API_KEY", help="GitHub API Key, or several keys separated by commas")] = None,
+):
+    """Forecast the API requests and runtime of an ETL run, without running it."""
+    from datetime import timedelta
+    from khc_cli.awesomecure.awesome2py import AwesomeList
+    from khc_cli.commands.shard import split_tokens
+    from khc_cli.utils.canonical import RepoIndex
+    from khc_cli.utils.helpers import fetch_awesome_readme_content
+    from khc_cli.utils.planner import scan_entries, estimate_stages, project_runtime
+    
+    tokens = [token for token in split_tokens(github_api_key) if token]
+    github_client = GitHubClient(tokens[0]) if tokens else None
+    
+    if readme:
+        if not readme.exists():
+            console.print(f"[red]File {readme} does not exist[/red]")
+            raise typer.Exit(1)
+        awesome_list = AwesomeList(str(readme), lazy=True)
+        readme_requests = 0
+    else:
+        if not github_client:
+            console.print("[red]A GitHub API key is required to download the list, or use --readme[/red]")
+            raise typer.Exit(1)
+        awesome_repo_path = urlparse(awesome_repo_url).path.strip("/")
+        awesome_list = fetch_awesome_readme_content(
+            github_client.client, awesome_repo_path, "README.md", output_dir / ".awesome-cache.md", lazy=True
+        )
+        readme_requests = 2
+    
+    scan = scan_entries(awesome_list, RepoIndex(output_dir / "repo-index.json"), parse_forges(forge))
+    stages = estimate_stages(
+        scan, readme_requests, git_cache_dir if git_metrics else None,
+        output_dir / "readmes" if readmes else None, issue_metrics, output_dir / "issue-metrics-stats.json",
+    )
+    rate_limits = github_client.get_rate_limits() if github_client else None
+    buckets, seconds = project_runtime(
+        stages, rate_limits, tokens=max(len(tokens), 1), concurrency=concurrency,
+        latency=latency, git_processes=git_processes,
+    )
+    
+    console.print(f"[green]{scan['entries']} entries, {scan['unique']} unique "
+                  f"({len(scan['github'])} GitHub repositories, "
+                  f"{sum(len(forge['keys']) for forge in scan['forges'].values())} on other forges, "
+                  f"{scan['other']} not on GitHub)[/green]")
+    
+    table = Table(title="Estimated requests per stage")
+    table.add_column("Stage", style="cyan")
+    table.add_column("Bucket", style="cyan")
+    table.add_column("Requests", style="green")
+    table.add_column("Quota cost", style="green")
+    for stage in stages:
+        table.add_row(stage["name"], stage["bucket"], str(stage["requests"]), str(stage.get("cost", stage["requests"])))
+    console.print(table)
+    
+    table = Table(title="Rate limit buckets")
+    table.add_column("Bucket", style="cyan")
+    table.add_column("Planned requests", style="green")
+    table.add_column("Quota cost", style="green")
+    table.add_column("Remaining / limit (per token)", style="green")
+    table.add_column("Fits", style="green")
+    table.add_column("Projected time", style="green")
+    for name, bucket in buckets.items():
+        quota = f"{bucket.get('remaining')} / {bucket.get('limit')}" if bucket.get("limit") else "-"
+        fits = "-" if "fits" not in bucket else ("yes" if bucket["fits"] else f"[red]no, waits {timedelta(seconds=int(bucket['wait']))}[/red]")
+        table.add_row(name, str(bucket["requests"]), str(bucket["cost"]), quota, fits,
+                      str(timedelta(seconds=int(bucket["seconds"]))))
+    console.print(table)
+    
+    console.print(f"[green]Projected wall-clock time: {timedelta(seconds=int(seconds))}[/green]")
+
+
+@app.command()
+def readme(
+    repo_name: Annotated[str, typer.Argument(help="Repository (owner/repo) or URL of a project of the list")],
+    output_dir: Annotated[Path, typer.Option(help="Output directory of the ETL")] = Path("./csv"),
+):
+    """Print the README of a project, as stored by 'analyze etl --readmes'."""
+    import csv
+    import sys
+    from khc_cli.utils.canonical import entry_key
+    from khc_cli.utils.readme_store import BlobStore
+    
+    projects_csv_path = output_dir / "projects.csv"
+    if not projects_csv_path.exists():
+        console.print(f"[red]File {projects_csv_path} does not exist, run 'khc-cli analyze etl --readmes' first[/red]")
+        raise typer.Exit(1)
+    
+    key = entry_key(repo_name if "://" in repo_name else f"https://github.com/{repo_name}").lower()
+    digest = None
+    with open(projects_csv_path, "r", newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            if entry_key(row["git_url"]).lower() == key:
+                digest = row.get("readme_content")
+                break
+    content = BlobStore(output_dir / "readmes").get_bytes(digest) if digest else None
+    if content is None:
+        console.print(f"[red]No stored README for {repo_name}[/red]")
+        raise typer.Exit(1)
+    # Raw Markdown bytes, in whatever encoding the project uses: not decoded, not rendered
+    sys.stdout.buffer.write(content if content.endswith(b"\n") else content + b"\n")
+    sys.stdout.flush()
+
+
+@app.command("list")
+def list_report(
+    output_dir: Annotated[Path, typer.Option(help="Output directory of the ETL")] = Path("./csv"),
+    by: Annotated[str, typer.Option(help="Group by: rubric, organization_country, dominating_language")] = "rubric",
+    stale_days: Annotated[int, typer.Option(help="Projects without commit for more days are stale")] = 365,
+    top: Annotated[int, typer.Option(help="Number of rows of the distributions and stale list")] = 10,
+    output_format: Annotated[str, typer.Option("--format", "-f", help="Output format: table, json")] = "table",
+    daemon: Annotated[bool, typer.Option(help="Route the query through 'khc-cli serve' when it is running")] = True,
+):
+    """Summarize the projects table produced by the ETL."""
+    from khc_cli.utils.project_table import GROUP_COLUMNS, load_project_table, project_report
+    from khc_cli.utils.daemon import DaemonError, call_daemon
+    
+    projects_csv_path = output_dir / "projects.csv"
+    if not projects_csv_path.exists():
+        console.print(f"[red]File {projects_csv_path} does not exist, run 'khc-cli analyze etl' first[/red]")
+        raise typer.Exit(1)
+    if by not in GROUP_COLUMNS:
+        console.print(f"[red]Cannot group by '{by}', use one of: {', '.join(GROUP_COLUMNS)}[/red]")
+        raise typer.Exit(1)
+    
+    try:
+        report = call_daemon(
+            "/list", {"output_dir": str(output_dir.resolve()), "by": by, "stale_days": stale_days, "top": top}
+        ) if daemon else None
+    except DaemonError as e:
+        console.print(f"[red]Error: {e}[/red]")
+        raise typer.Exit(1)
+    if report is None:
+        table = load_project_table(projects_csv_path, output_dir / "github_organizations.csv")
+        report = project_report(table, by, stale_days, top)
+    groups = report["groups"]
+    
+    if output_format == "json":
+        import json
+        console.print_json(json.dumps(report))
+        return
+    
+    summary = Table(title=f"{report['projects']} projects by {by}")
+    for column in ["Group", "Projects", "Stars", "Mean stars", "Active ratio", "Stale"]:
+        summary.add_column(column, style="cyan" if column == "Group" else "green")
+    for group in groups:
+        summary.add_row(group["group"], str(group["projects"]), str(group["stars"]),
+                        str(group["mean_stars"]), f"{group['active_ratio']:.0%}", str(group["stale"]))
+    console.print(summary)
+    
+    for title, key in [("Languages", "languages"), ("Licenses", "licenses")]:
+        distribution = Table(title=title)
+        distribution.add_column("Value", style="cyan")
+        distribution.add_column("Projects", style="green")
+        for row in report[key]:
+            distribution.add_row(row["value"], str(row["projects"]))
+        console.print(distribution)
+    
+    stale_table = Table(title=f"Stale projects (no commit for {stale_days} days)")
+    stale_table.add_column("Project", style="cyan")
+    stale_table.add_column("Last commit", style="green")
+    stale_table.add_column("URL", style="green")
+    for row in report["stale_projects"]:
+        stale_table.add_row(row["project_name"], row["last_commit_date"], row["git_url"])
+    console.print(stale_table)
+
+
+@app.command()
+def sync(
+    awesome_repo_url: Annotated[str, typer.Option(help="URL of the Awesome list")] = "https://api.github.com/repos/Krypto-Hashers-Community/khc-cli/contents/README.md",
+    output_dir: Annotated[Path, typer.Option(help="Output directory")] = Path("./csv"),
+    watch: Annotated[bool, typer.Option(help="Keep running and check the list periodically")] = False,
+    interval: Annotated[int, typer.Option(help="Seconds between two checks in watch mode")] = 3600,
+    forge: Annotated[list[str], typer.Option(help="Self-hosted forge to enrich, as host=kind or base_url=kind with kind gitlab or gitea (repeatable)")] = None,
+    readmes: Annotated[bool, typer.Option(help="Store project READMEs in a compressed blob store, referenced by hash")] = False,
+    issue_metrics: Annotated[bool, typer.Option(help="Fetch issue and pull request counts with batched count-only GraphQL queries")] = False,
+    github_api_key: Annotated[str, typer.Option(envvar="GITHUB_API_KEY", help="GitHub API Key")] = None,
+):
+    """Only enrich the entries that changed since the last processed commit of the list."""
+    import time
+    from khc_cli.commands.sync import run_sync_pipeline
+    
+    output_dir.mkdir(parents=True, exist_ok=True)
+    forges = parse_forges(forge)
+    
+    while True:
+        try:
+            diff = run_sync_pipeline(
+                awesome_repo_url=awesome_repo_url,
+                awesome_readme_filename="README.md",
+                local_readme_path=output_dir / ".awesome-cache.md",
+                projects_csv_path=output_dir / "projects.csv",
+                orgs_csv_path=output_dir / "github_organizations.csv",
+                state_path=output_dir / ".khc-sync.json",
+                github_api_key=github_api_key,
+                snapshot_dir=output_dir / "snapshots",
+                repo_index_path=output_dir / "repo-index.json",
+                forges=forges,
+                readme_store_dir=output_dir / "readmes" if readmes else None,
+                issue_metrics=issue_metrics,
+                issue_stats_path=output_dir / "issue-metrics-stats.json",
+                forge_cache_path=output_dir / "forge-cache.json",
+            )
+        except Exception as e:
+            console.print(f"[red]Error during sync: {e}[/red]")
+            if not watch:
+                raise typer.Exit(1)
+            diff = None
+        else:
+            if diff is None:
+                console.print("[green]The list did not change since the last sync[/green]")
+            else:
+                console.print(
+                    f"[green]{len(diff['added'])} added, {len(diff['removed'])} removed, "
+                    f"{len(diff['moved'])} moved, {len(diff['changed'])} changed entries[/green]"
+                )
+                for failed_url in diff["failures"]:
+                    console.print(f"[yellow]  - failed: {failed_url}[/yellow]")
+        
+        if not watch:
+            break
+        time.sleep(interval)
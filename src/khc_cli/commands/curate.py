@@ -14,32 +14,74 @@ load_dotenv()
 @app.command()
 def validate(
     readme_path: Annotated[Path, typer.Argument(help="Path to the README.md file to validate")],
+    daemon: Annotated[bool, typer.Option(help="Route the validation through 'khc-cli serve' when it is running")] = True,
 ):
     """Validate the format of an Awesome list."""
-    from khc_cli.awesomecure.awesome2py import AwesomeList
+    from khc_cli.utils.daemon import call_daemon, list_summary
     
     if not readme_path.exists():
         console.print(f"[red]File {readme_path} does not exist[/red]")
         raise typer.Exit(1)
     
     try:
-        awesome_list = AwesomeList(str(readme_path))
-        rubrics_count = len(awesome_list.rubrics)
-        entries_count = sum(len(rubric.entries) for rubric in awesome_list.rubrics)
+        summary = call_daemon("/validate", {"path": str(readme_path.resolve())}) if daemon else None
+        if summary is None:
+            summary = list_summary(readme_path)
         
         console.print(f"[green]Awesome list is valid![/green]")
-        console.print(f"[green]Number of rubrics: {rubrics_count}[/green]")
-        console.print(f"[green]Number of entries: {entries_count}[/green]")
+        console.print(f"[green]Number of rubrics: {summary['rubrics']}[/green]")
+        console.print(f"[green]Number of entries: {summary['entries']}[/green]")
         
     except Exception as e:
         console.print(f"[red]Error during validation: {e}[/red]")
         raise typer.Exit(1)
 
+def suggest_rubrics(readme_path, projects_csv, index_path, description, topics=(), languages=(), top=3):
+    """Rank the sections of a list for a project, updating the similarity index when the list changed."""
+    from khc_cli.awesomecure.awesome2py import AwesomeList
+    from khc_cli.utils.rubric_index import RubricIndex
+    
+    index = RubricIndex(index_path)
+    index.update(lambda: AwesomeList(str(readme_path), lazy=True), readme_path, projects_csv)
+    return index.suggest(description, topics, languages, top)
+
+@app.command()
+def suggest_section(
+    description: Annotated[str, typer.Argument(help="Description of the project")],
+    readme_path: Annotated[Path, typer.Option(help="Path to the README.md")] = Path("README.md"),
+    topic: Annotated[list[str], typer.Option(help="Topic of the project (repeatable)")] = None,
+    language: Annotated[list[str], typer.Option(help="Language of the project (repeatable)")] = None,
+    top: Annotated[int, typer.Option(help="Number of sections suggested")] = 3,
+    projects_csv: Annotated[Path, typer.Option(help="ETL output whose topics and languages describe the sections")] = Path("./csv/projects.csv"),
+    index_path: Annotated[Path, typer.Option(help="Similarity index of the sections")] = Path(".khc-rubric-index.npz"),
+):
+    """Suggest the sections of an Awesome list that best fit a project."""
+    from rich.table import Table
+    
+    if not readme_path.exists():
+        console.print(f"[red]File {readme_path} does not exist[/red]")
+        raise typer.Exit(1)
+    
+    suggestions = suggest_rubrics(readme_path, projects_csv, index_path, description, topic or [], language or [], top)
+    if not suggestions:
+        console.print("[yellow]No section shares terms with this project[/yellow]")
+        return
+    
+    table = Table(title="Suggested sections")
+    table.add_column("Section", style="cyan")
+    table.add_column("Score", style="green")
+    for rubric, score in suggestions:
+        table.add_row(rubric, f"{score:.3f}")
+    console.print(table)
+
 @app.command()
 def add_project(
     repo_url: Annotated[str, typer.Argument(help="GitHub repository URL")],
     readme_path: Annotated[Path, typer.Option(help="Path to the README.md")] = Path("README.md"),
-    section: Annotated[str, typer.Option(help="Section where to add the project")] = None,
+    section: Annotated[str, typer.Option(help="Section where to add the project (end of the file when omitted)")] = None,
+    suggest: Annotated[bool, typer.Option(help="Without --section, add the project to the best suggested section")] = False,
+    projects_csv: Annotated[Path, typer.Option(help="ETL output whose topics and languages describe the sections")] = Path("./csv/projects.csv"),
+    index_path: Annotated[Path, typer.Option(help="Similarity index of the sections")] = Path(".khc-rubric-index.npz"),
     github_api_key: Annotated[str, typer.Option(envvar="GITHUB_API_KEY", help="GitHub API Key")] = None,
 ):
     """Add a project to an Awesome list."""
@@ -66,6 +108,21 @@ def add_project(
         console.print(f"[red]Repository {repo_path} not found[/red]")
         raise typer.Exit(1)
     
+    # Suggest the section from the description, topics and language of the repository
+    if not section and suggest:
+        suggestions = suggest_rubrics(
+            readme_path, projects_csv, index_path, repo.description or "", repo.topics or [],
+            [repo.language] if repo.language else [],
+        )
+        if suggestions:
+            section = suggestions[0][0]
+            others = ", ".join(f"{rubric} ({score:.2f})" for rubric, score in suggestions[1:])
+            console.print(f"[cyan]Suggested section: {section} ({suggestions[0][1]:.2f})"
+                          + (f"; alternatives: {others}" if others else "") + "[/cyan]")
+    elif not section:
+        console.print("[yellow]No section given: the project is added at the end of the file "
+                      "(use --section, or --suggest to pick the most similar section)[/yellow]")
+    
     # Build the new entry
     new_entry = f"* [{repo.name}]({repo_url}) - {repo.description or 'No description'}"
     
@@ -96,4 +153,184 @@ def add_project(
     with open(readme_path, "w", encoding="utf-8") as f:
         f.write(new_content)
     
-    console.print(f"[green]Project {repo.name} successfully added to {readme_path}[/green]")
\ No newline at end of file
+    console.print(f"[green]Project {repo.name} successfully added to {readme_path}[/green]")
+
+@app.command()
+def dedupe(
+    readme_path: Annotated[Path, typer.Argument(help="Path to the README.md file to check")],
+    threshold: Annotated[float, typer.Option(help="Minimum estimated similarity of near-duplicate entries (0-1)")] = 0.5,
+    bands: Annotated[int, typer.Option(help="Number of LSH bands (more bands find less similar pairs)")] = 16,
+    index_path: Annotated[Path, typer.Option(help="On-disk index of entry signatures")] = Path(".khc-dedupe-index.json"),
+    output_format: Annotated[str, typer.Option("--format", "-f", help="Output format: table, json")] = "table",
+):
+    """Report duplicate and near-duplicate entries of an Awesome list."""
+    from rich.table import Table
+    from khc_cli.awesomecure.awesome2py import AwesomeList
+    from khc_cli.utils.minhash import find_duplicate_clusters
+    
+    if not readme_path.exists():
+        console.print(f"[red]File {readme_path} does not exist[/red]")
+        raise typer.Exit(1)
+    
+    entries = [
+        {"name": entry.name, "text": entry.text, "url": entry.url, "rubric": rubric_key}
+        for rubric_key, entry, depth in AwesomeList(str(readme_path), lazy=True).iter_entries()
+    ]
+    try:
+        clusters, stats = find_duplicate_clusters(entries, threshold=threshold, bands=bands, index_path=index_path)
+    except ValueError as e:
+        console.print(f"[red]Error: {e}[/red]")
+        raise typer.Exit(1)
+    
+    if output_format == "json":
+        import json
+        console.print_json(json.dumps([[entries[i] for i in cluster] for cluster in clusters]))
+        return
+    
+    console.print(f"[green]{len(entries)} entries, {stats['hashed']} newly hashed, "
+                  f"{stats['candidate_pairs']} candidate pairs[/green]")
+    if not clusters:
+        console.print("[green]No duplicate found[/green]")
+        return
+    
+    table = Table(title=f"{len(clusters)} candidate duplicate clusters")
+    table.add_column("Cluster", style="cyan")
+    table.add_column("Rubric", style="cyan")
+    table.add_column("Name", style="green")
+    table.add_column("URL", style="green")
+    for number, cluster in enumerate(clusters, 1):
+        for i in cluster:
+            table.add_row(str(number), entries[i]["rubric"], entries[i]["name"], entries[i]["url"])
+        table.add_section()
+    console.print(table)
+
+@app.command()
+def discover(
+    readme_path: Annotated[Path, typer.Argument(help="Path to the README.md of the Awesome list")],
+    topic: Annotated[list[str], typer.Option(help="GitHub topic to search (repeatable)")] = None,
+    keyword: Annotated[list[str], typer.Option(help="Keyword searched in names, descriptions and topics (repeatable)")] = None,
+    language: Annotated[str, typer.Option(help="Restrict the search to a language")] = None,
+    min_stars: Annotated[int, typer.Option(help="Minimum number of stars")] = 10,
+    top: Annotated[int, typer.Option(help="Number of candidates reported")] = 50,
+    cache_path: Annotated[Path, typer.Option(help="Cache of the searches, for incremental runs")] = Path(".khc-discover-cache.json"),
+    repo_index_path: Annotated[Path, typer.Option(help="Repository index of the ETL, to recognize renamed repositories")] = Path("./csv/repo-index.json"),
+    full: Annotated[bool, typer.Option(help="Search everything again instead of repositories pushed since the last run")] = False,
+    workers: Annotated[int, typer.Option(help="Number of concurrent search requests")] = 4,
+    output_format: Annotated[str, typer.Option("--format", "-f", help="Output format: table, json, markdown")] = "table",
+    github_api_key: Annotated[str, typer.Option(envvar="GITHUB_API_KEY", help="GitHub API Key")] = None,
+):
+    """Search GitHub for candidate projects that are not in an Awesome list yet."""
+    from rich.table import Table
+    from khc_cli.awesomecure.awesome2py import AwesomeList
+    from khc_cli.utils.canonical import RepoIndex, entry_key
+    from khc_cli.utils.discovery import (
+        DiscoveryCache, build_queries, search_repositories, rank_candidates, candidate_entry
+    )
+    
+    if not readme_path.exists():
+        console.print(f"[red]File {readme_path} does not exist[/red]")
+        raise typer.Exit(1)
+    queries = build_queries(topic or [], keyword or [], language, min_stars)
+    if not queries:
+        console.print("[red]At least one --topic or --keyword is required[/red]")
+        raise typer.Exit(1)
+    
+    # Canonical keys of the repositories already listed
+    repo_index = RepoIndex(repo_index_path)
+    known_keys = {
+        entry_key(entry.url, repo_index).lower()
+        for rubric_key, entry, depth in AwesomeList(str(readme_path), lazy=True).iter_entries()
+    }
+    
+    cache = DiscoveryCache(cache_path)
+    try:
+        requests_sent = search_repositories(queries, github_api_key, cache, workers=workers, full=full)
+    except Exception as e:
+        console.print(f"[red]Error during the search: {e}[/red]")
+        raise typer.Exit(1)
+    cache.save()
+    candidates = rank_candidates(cache.candidates, known_keys, top=top)
+    
+    if output_format == "json":
+        import json
+        console.print_json(json.dumps(candidates))
+        return
+    if output_format == "markdown":
+        for candidate in candidates:
+            print(candidate_entry(candidate))
+        return
+    
+    console.print(f"[green]{len(queries)} queries, {requests_sent} search requests, "
+                  f"{len(cache.candidates)} cached candidates, {len(known_keys)} listed entries[/green]")
+    table = Table(title=f"Top {len(candidates)} candidates")
+    table.add_column("Repository", style="cyan")
+    table.add_column("Stars", style="green")
+    table.add_column("Last push", style="green")
+    table.add_column("Score", style="yellow")
+    table.add_column("Description")
+    for candidate in candidates:
+        table.add_row(
+            candidate["full_name"],
+            str(candidate.get("stargazers_count") or 0),
+            (candidate.get("pushed_at") or "")[:10],
+            f"{candidate['score']:.2f}",
+            (candidate.get("description") or "")[:80],
+        )
+    console.print(table)
+
+@app.command()
+def search(
+    query: Annotated[str, typer.Argument(help="Words to search, an FTS5 query, or a repository URL / owner/repo")],
+    readme_path: Annotated[Path, typer.Option(help="Path to the README.md of the Awesome list")] = Path("README.md"),
+    projects_csv: Annotated[Path, typer.Option(help="ETL output whose topics, languages and organizations are indexed")] = Path("./csv/projects.csv"),
+    index_path: Annotated[Path, typer.Option(help="SQLite file of the search index")] = Path(".khc-search.sqlite"),
+    limit: Annotated[int, typer.Option(help="Maximum number of results")] = 20,
+    output_format: Annotated[str, typer.Option("--format", "-f", help="Output format: table, json")] = "table",
+):
+    """Search the entries of an Awesome list and their enriched metadata."""
+    import re
+    from rich.markup import escape
+    from rich.table import Table
+    from khc_cli.awesomecure.awesome2py import AwesomeList
+    from khc_cli.utils.search_index import SearchIndex
+    
+    if not readme_path.exists():
+        console.print(f"[red]File {readme_path} does not exist[/red]")
+        raise typer.Exit(1)
+    
+    with SearchIndex(index_path) as index:
+        stats = index.update(lambda: AwesomeList(str(readme_path), lazy=True), readme_path, projects_csv)
+        if stats:
+            console.print(f"[cyan]Index updated: {stats['added']} added, {stats['updated']} updated, "
+                          f"{stats['removed']} removed[/cyan]")
+        
+        # A repository is looked up by its canonical URL before any full-text search
+        is_repository = "://" in query or re.fullmatch(r"[\w.-]+/[\w.-]+", query)
+        results = index.lookup(query if "://" in query else f"https://github.com/{query}") if is_repository else []
+        if is_repository and output_format != "json":
+            found = "[green]is already in the list[/green]" if results else "[yellow]is not in the list[/yellow]"
+            console.print(f"{query} {found}")
+        if not results:
+            try:
+                results = index.search(" ".join(re.findall(r"\w+", query)) if is_repository else query, limit)
+            except ValueError as e:
+                console.print(f"[red]Error: {e}[/red]")
+                raise typer.Exit(1)
+    
+    if output_format == "json":
+        import json
+        console.print_json(json.dumps(results))
+        return
+    
+    table = Table(title=f"{len(results)} results for '{query}'")
+    table.add_column("Name", style="cyan")
+    table.add_column("Rubric", style="cyan")
+    table.add_column("Match", style="green")
+    table.add_column("URL", style="green")
+    table.add_column("Score", style="yellow")
+    for result in results:
+        table.add_row(
+            escape(result["name"]), escape(result["rubric"]), escape(result.get("snippet") or result["text"][:80]),
+            escape(result["url"]), "" if result["score"] is None else f"{result['score']:.2f}",
+        )
+    console.print(table)
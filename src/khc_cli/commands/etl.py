@@ -5,20 +5,168 @@ import typer
 from rich.console import Console
 from rich.progress import Progress, BarColumn, TextColumn, TimeElapsedColumn, TimeRemainingColumn
 from pathlib import Path
+from datetime import datetime, timezone
 from dotenv import load_dotenv
 from typing_extensions import Annotated
 from urllib.parse import urlparse
 from termcolor import colored
 import traceback
+from collections import deque
 
 from khc_cli.github_client import GitHubClient
 from khc_cli.utils.helpers import fetch_awesome_readme_content, initialize_csv_writers, crawl_github_dependents
+from khc_cli.utils.snapshot import SnapshotWriter, load_snapshot, load_previous_records
+from khc_cli.utils.canonical import RepoIndex, canonicalize_repo_url, entry_key
+from khc_cli.utils.git_metrics import GitMetricsEngine
+from khc_cli.utils.scheduler import RefreshSchedule
+from khc_cli.utils.forges import ForgeBatcher, transform_forge_payload
+from khc_cli.utils.readme_store import ReadmeFetcher
+from khc_cli.utils.issue_metrics import IssueMetricsBatcher, transform_issue_metrics
 
 console = Console()
 LOGGER = logging.getLogger(__name__)
 # Load environment variables from .env file
 load_dotenv()
 
+def _parse_github_date(value):
+    """Parse an ISO 8601 date as returned by the GitHub REST API."""
+    if not value:
+        return None
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+def entry_record(entry, rubric_key):
+    """Serialize an Awesome list entry so it can be stored in a snapshot."""
+    return {
+        "name": entry.name,
+        "text": entry.text,
+        "url": entry.url,
+        "rubric": rubric_key,
+        "depth": entry.depth,
+    }
+
+def extract_github_payload(g, repo_path, organizations=None):
+    """
+    Fetch the raw GitHub API payloads needed to build a project row.
+    
+    Args:
+        g: Authenticated PyGithub client
+        repo_path: Repository path in the owner/repo format
+        organizations: Organization payloads already fetched, keyed by login; they are
+            reused instead of being fetched again
+        
+    Returns:
+        Tuple ``(payload, organization)``: the raw repository payload wrapped in a dict,
+        and the raw organization payload (None when the owner is a user).
+    """
+    repo = g.get_repo(repo_path)
+    payload = {"repo": repo.raw_data}
+    organization = None
+    owner = repo.raw_data.get("owner") or {}
+    if owner.get("type") == "Organization":
+        organization = (organizations or {}).get(owner["login"]) or g.get_organization(owner["login"]).raw_data
+    return payload, organization
+
+def extract_readme(readme_fetcher, repo_path, payload):
+    """Store the README of a repository and reference it in its payload; failures are only logged."""
+    try:
+        payload["readme"] = readme_fetcher.fetch(repo_path)
+    except Exception as e:
+        LOGGER.warning(f"README of {repo_path} could not be fetched: {e}")
+
+def transform_project(entry, payload, organizations, fetched_at=None):
+    """
+    Build a row of projects.csv from an entry and its raw API payloads.
+    
+    This function does not perform any network call, so it can be replayed from a snapshot.
+    
+    Args:
+        entry: Entry record as built by ``entry_record``
+        payload: Raw payloads fetched for the entry: ``repo`` (and ``issues`` counts) for
+            GitHub projects, ``forge`` for projects of other forges, empty otherwise
+        organizations: Mapping of organization logins to their raw payloads
+        fetched_at: ISO date of the extraction, used for age computations
+    """
+    platform, _ = canonicalize_repo_url(entry["url"])
+    text = entry["text"]
+    project_data = {
+        "project_name": entry["name"],
+        "oneliner": text[2:] if text.startswith("- ") else text,
+        "git_url": entry["url"],
+        "rubric": entry["rubric"],
+        "platform": platform,
+    }
+    
+    if payload.get("forge"):
+        project_data.update(transform_forge_payload(payload["forge"], fetched_at))
+        project_data.update(payload.get("git") or {})
+        return project_data
+    
+    repo = payload.get("repo")
+    if not repo:
+        return project_data
+    
+    owner = repo.get("owner") or {}
+    license_info = repo.get("license") or {}
+    created = _parse_github_date(repo.get("created_at"))
+    reference_date = _parse_github_date(fetched_at) or datetime.now(timezone.utc)
+    project_data.update({
+        "git_namespace": owner.get("login"),
+        "topics": ",".join(repo.get("topics") or []),
+        "last_commit_date": repo.get("pushed_at"),
+        "stargazers_count": repo.get("stargazers_count"),
+        "dominating_language": repo.get("language"),
+        "homepage": repo.get("homepage"),
+        "project_created": repo.get("created_at"),
+        "project_age_in_days": (reference_date - created).days if created else None,
+        "license": license_info.get("spdx_id"),
+        "open_issues": repo.get("open_issues_count"),
+    })
+    
+    # Exact issue and pull request counts; the REST open_issues_count also counts pull requests
+    issues = payload.get("issues")
+    if issues:
+        project_data.update(transform_issue_metrics(issues, fetched_at))
+    
+    # Only the hash of the README is kept, its content lives in the README blob store
+    readme = payload.get("readme")
+    if readme:
+        project_data["readme_content"] = readme["hash"]
+    
+    # Commit metrics computed from a local clone, when the git engine was used
+    git_metrics = payload.get("git")
+    if git_metrics:
+        project_data.update(git_metrics)
+    
+    organization = organizations.get(owner.get("login"))
+    if organization:
+        organization_row = transform_organization(organization, entry["rubric"])
+        del organization_row["organization_rubric"]
+        project_data["organization"] = organization_row["organization_name"]
+        project_data.update(organization_row)
+    return project_data
+
+def transform_organization(organization, rubric_key):
+    """Build a row of github_organizations.csv from a raw organization payload."""
+    return {
+        "organization_name": organization.get("name") or organization.get("login"),
+        "organization_user_name": organization.get("login"),
+        "organization_github_url": organization.get("html_url"),
+        "organization_website": organization.get("blog"),
+        "organization_location": organization.get("location"),
+        "organization_avatar": organization.get("avatar_url"),
+        "organization_public_repos": organization.get("public_repos"),
+        "organization_created": organization.get("created_at"),
+        "organization_last_update": organization.get("updated_at"),
+        "organization_rubric": rubric_key,
+    }
+
+def load_project(project_data, organization, rubric_key, writer_projects, writer_github_organizations, existing_orgs):
+    """Write a project row, and its organization row the first time it is seen."""
+    writer_projects.writerow(project_data)
+    if organization and organization.get("login") not in existing_orgs:
+        writer_github_organizations.writerow(transform_organization(organization, rubric_key))
+        existing_orgs.add(organization.get("login"))
+
 def run_etl_pipeline(
     awesome_repo_url: str,
     awesome_readme_filename: str,
@@ -26,6 +174,17 @@ def run_etl_pipeline(
     projects_csv_path: Path,
     orgs_csv_path: Path,
     github_api_key: str = None,
+    snapshot_dir: Path = None,
+    repo_index_path: Path = None,
+    git_cache_dir: Path = None,
+    git_processes: int = 4,
+    budget: int = None,
+    schedule_path: Path = None,
+    forges: dict = None,
+    readme_store_dir: Path = None,
+    issue_metrics: bool = False,
+    issue_stats_path: Path = None,
+    forge_cache_path: Path = None,
 ):
     """
     Run the ETL pipeline for an Awesome list.
@@ -37,14 +196,39 @@ def run_etl_pipeline(
         projects_csv_path: Path where to save the CSV file with projects information
         orgs_csv_path: Path where to save the CSV file with organizations information
         github_api_key: GitHub API key for authentication
+        snapshot_dir: Directory of the snapshot archive where raw API payloads are persisted
+        repo_index_path: Path of the persistent index of renamed/transferred repositories
+        git_cache_dir: Cache of partial clones; when set, commit metrics are computed locally
+        git_processes: Number of processes used by the git metrics engine
+        budget: Maximum number of requests sent to GitHub for repositories, all enabled
+            stages included; the most overdue and volatile ones are refreshed first, the
+            others reuse their payload from the latest snapshot segment, or are written
+            without enrichment when they have none
+        schedule_path: Path of the adaptive refresh schedule
+        forges: Additional forge instances, as a mapping of hosts or base URLs to forge
+            kinds (``gitlab`` or ``gitea``); gitlab.com and codeberg.org are always enriched
+        readme_store_dir: Directory of the README blob store; when set, READMEs of GitHub
+            projects are fetched and referenced by hash in the ``readme_content`` column
+        issue_metrics: Fetch issue and pull request counts of GitHub projects with batched,
+            count-only GraphQL queries
+        issue_stats_path: File where the measured cost of the GraphQL queries is saved
+        forge_cache_path: File where payloads of other forges are cached with their ETag
     """
     # Initialization
-    g = GitHubClient(github_api_key).client
+    github_client = GitHubClient(github_api_key)
+    g = github_client.client
+    repo_index = RepoIndex(repo_index_path)
+    schedule = RefreshSchedule(schedule_path)
+    forge_batcher = ForgeBatcher(forges, cache_path=forge_cache_path)
+    readme_fetcher = ReadmeFetcher(readme_store_dir, github_client.token) if readme_store_dir else None
+    issue_batcher = IssueMetricsBatcher(github_client.token, stats_path=issue_stats_path) if issue_metrics else None
     awesome_repo_path = urlparse(awesome_repo_url).path.strip("/")
     
     # Extraction
     try:
-        awesome_repo_data = fetch_awesome_readme_content(g, awesome_repo_path, awesome_readme_filename, local_readme_path)
+        awesome_repo_data = fetch_awesome_readme_content(
+            g, awesome_repo_path, awesome_readme_filename, local_readme_path, lazy=True
+        )
     except Exception as e:
         console.print(f"[red]Error extracting README: {e}[/red]")
         LOGGER.error(f"Error fetching or parsing Awesome README: {e}", exc_info=True)
@@ -62,8 +246,33 @@ def run_etl_pipeline(
     
     # Transformation and loading
     failures = []
+    duplicates = []
+    seen_keys = set()
+    deferred = []
     retry = False
-    total_entries = sum(len(rubric.entries) for rubric in awesome_repo_data.rubrics)
+    total_entries = awesome_repo_data.count_entries()
+    
+    # With a budget, choose up front which repositories are refreshed
+    previous_records, previous_organizations = {}, {}
+    refresh = None
+    if budget is not None:
+        previous_records, previous_organizations = load_previous_records(snapshot_dir)
+        keys = []
+        for _, entry, _ in awesome_repo_data.iter_entries():
+            platform, repo_path = canonicalize_repo_url(entry.url, forge_batcher.forges)
+            if platform == "github.com" and repo_path:
+                keys.append(entry_key(entry.url, repo_index, forge_batcher.forges))
+        # Every enabled stage is charged: metadata, README and clone per repository,
+        # organization per owner, and one GraphQL query per batch of issue metrics
+        refresh = schedule.select(
+            dict.fromkeys(keys), budget,
+            fetchable={
+                key for key in keys
+                if not (previous_records.get(key.lower()) or {}).get("payload", {}).get("repo")
+            },
+            per_repo=1 + bool(readme_fetcher) + bool(git_cache_dir),
+            batched=(issue_batcher.batch_size,) if issue_batcher else (),
+        )
     
     progress_columns = [
         TextColumn("[progress.description]{task.description}"),
@@ -76,43 +285,138 @@ def run_etl_pipeline(
     with Progress(*progress_columns, transient=False) as progress_bar:
         task = progress_bar.add_task("Processing projects...", total=total_entries)
         
-        # Main processing logic
-        # This function is simplified and focuses on the main structure
-        # The complete project processing code should be moved here
+        snapshot = SnapshotWriter(snapshot_dir) if snapshot_dir else None
+        git_engine = GitMetricsEngine(git_cache_dir, git_processes) if git_cache_dir else None
+        organizations = dict(previous_organizations)
+        # Organizations fetched during this run; carried ones may be outdated
+        fetched_organizations = {}
+        # Projects waiting for their git metrics, forge or issue batch, written in list order
+        pending = deque()
+        window = max(
+            2 * git_processes if git_engine else 0,
+            forge_batcher.batch_size,
+            issue_batcher.batch_size if issue_batcher else 0,
+        )
+        
+        def finish(record, key, payload, organization, fetched_at, git_future, forge_result=None, issue_result=None,
+                   refreshed=None):
+            try:
+                if forge_result:
+                    try:
+                        payload = {"forge": forge_result.result()}
+                    except Exception as e:
+                        LOGGER.warning(f"Forge lookup failed for {key}: {e}")
+                if issue_result:
+                    try:
+                        payload["issues"] = issue_result.result()
+                    except Exception as e:
+                        LOGGER.warning(f"Issue metrics failed for {key}: {e}")
+                if git_future:
+                    try:
+                        payload["git"] = git_future.result()
+                    except Exception as e:
+                        LOGGER.warning(f"Git metrics failed for {key}: {e}")
+                if refreshed:
+                    # Recorded once the latest release, fetched with the issue metrics, is known
+                    release = (payload.get("issues") or {}).get("last_release_tag_name")
+                    schedule.record(refreshed, payload["repo"], datetime.fromisoformat(fetched_at), release)
+                
+                if snapshot:
+                    snapshot.add_repo(key, record, payload, fetched_at)
+                    if organization:
+                        snapshot.add_organization(organization["login"], organization)
+                
+                project_data = transform_project(record, payload, organizations, fetched_at)
+                load_project(project_data, organization, record["rubric"],
+                             writer_projects, writer_github_organizations, existing_orgs)
+            except Exception as e:
+                console.print(colored(f"Failed to process {record['url']}: {e}", "red"))
+                failures.append(record["url"])
         
-        for r_idx, rubric in enumerate(awesome_repo_data.rubrics):
-            for entry_idx, entry in enumerate(rubric.entries):
-                progress_bar.update(task, advance=1, description=f"Processing: {entry.name[:30]}...")
-                LOGGER.info(f"Processing project: {entry.name} ({entry.url}) from rubric: {rubric.key}")
+        # Entries are parsed section by section while the previous ones are enriched
+        for rubric_key, entry, depth in awesome_repo_data.iter_entries():
+            progress_bar.update(task, advance=1, description=f"Processing: {entry.name[:30]}...")
+            LOGGER.info(f"Processing project: {entry.name} ({entry.url}) from rubric: {rubric_key}")
+            
+            try:
+                record = entry_record(entry, rubric_key)
+                fetched_at = datetime.now(timezone.utc).isoformat()
+                payload, organization, forge_result, issue_result, refreshed = {}, None, None, None, None
                 
-                # Project processing code here...
-                # This code is very simplified compared to the original
+                # Canonicalize the URL so that each repository is fetched only once
+                platform, repo_path = canonicalize_repo_url(entry.url, forge_batcher.forges)
+                key = entry_key(entry.url, repo_index, forge_batcher.forges)
+                if key.lower() in seen_keys:
+                    duplicates.append(entry.url)
+                    continue
+                seen_keys.add(key.lower())
                 
-                try:
-                    # Check the platform type (GitHub, GitLab, other)
-                    url_parts = urlparse(entry.url)
-                    platform = url_parts.netloc
-                    
-                    project_data = {
-                        "project_name": entry.name,
-                        "oneliner": entry.text[2:] if entry.text.startswith("- ") else entry.text,
-                        "git_url": entry.url,
-                        "rubric": rubric.key,
-                        "platform": platform
-                    }
-                    
-                    if platform == "github.com":
-                        # GitHub-specific processing
-                        repo_path = url_parts.path.strip("/")
-                        # Call to a function that would process GitHub repos
-                        # process_github_repo(g, repo_path, project_data, writer_github_organizations, existing_orgs)
-                    
-                    # Write project data
-                    writer_projects.writerow(project_data)
-                    
-                except Exception as e:
-                    console.print(colored(f"Failed to process {entry.url}: {e}", "red"))
-                    failures.append(entry.url)
+                previous = previous_records.get(key.lower())
+                carried = refresh is not None and key not in refresh
+                if platform == "github.com" and repo_path and carried:
+                    # Not due or over budget: reuse the payload of the previous run; without
+                    # one, the entry is written unenriched until a run has budget left for it
+                    if previous and previous["payload"].get("repo"):
+                        payload, fetched_at = previous["payload"], previous.get("fetched_at")
+                        owner = (payload.get("repo") or {}).get("owner") or {}
+                        organization = organizations.get(owner.get("login"))
+                    else:
+                        deferred.append(entry.url)
+                elif platform == "github.com" and repo_path:
+                    # Extraction of the raw GitHub payloads
+                    payload, organization = extract_github_payload(g, key, fetched_organizations)
+                    refreshed = key
+                    full_name = payload["repo"].get("full_name")
+                    repo_index.record(key, full_name)
+                    if full_name and full_name.lower() != key.lower():
+                        if full_name.lower() in seen_keys:
+                            duplicates.append(entry.url)
+                            continue
+                        seen_keys.add(full_name.lower())
+                        key = full_name
+                    if organization:
+                        organizations[organization["login"]] = organization
+                        fetched_organizations[organization["login"]] = organization
+                    if readme_fetcher:
+                        extract_readme(readme_fetcher, key, payload)
+                    if issue_batcher:
+                        issue_result = issue_batcher.submit(key)
+                elif forge_batcher.supports(platform) and repo_path:
+                    # Other forges are looked up in batches, resolved when the row is written
+                    forge_result = forge_batcher.submit(platform, repo_path)
+                
+                git_future = None
+                if git_engine and payload.get("repo") and not carried:
+                    clone_url = payload["repo"].get("clone_url") or f"https://github.com/{key}.git"
+                    git_future = git_engine.submit(key, clone_url)
+                elif git_engine and forge_result:
+                    git_future = git_engine.submit(key, forge_batcher.clone_url(platform, repo_path))
+                pending.append((record, key, payload, organization, fetched_at, git_future, forge_result, issue_result,
+                                refreshed))
+                
+            except Exception as e:
+                console.print(colored(f"Failed to process {entry.url}: {e}", "red"))
+                failures.append(entry.url)
+            
+            # Keep a bounded window of clones, forge and issue lookups in flight
+            while len(pending) > window:
+                finish(*pending.popleft())
+        
+        while pending:
+            finish(*pending.popleft())
+        
+        if git_engine:
+            git_engine.close()
+        forge_batcher.close()
+        if readme_fetcher:
+            readme_fetcher.close()
+        if issue_batcher:
+            issue_batcher.close()
+        if snapshot:
+            snapshot.close()
+    
+    repo_index.save()
+    schedule.save()
     
     # Close files
     csv_projects_file.close()
@@ -121,6 +425,24 @@ def run_etl_pipeline(
     # Final report
     console.print("------------------------")
     console.print(colored("ETL Processing finished.", "green"))
+    if readme_fetcher:
+        console.print(colored(
+            f"READMEs: {readme_fetcher.stats['fetched']} fetched, {readme_fetcher.stats['not_modified']} unchanged, "
+            f"{readme_fetcher.store.written} new blobs", "green"
+        ))
+    if issue_batcher:
+        console.print(colored(
+            f"Issue metrics: {issue_batcher.stats['repositories']} repositories in {issue_batcher.stats['queries']} "
+            f"GraphQL queries, {issue_batcher.stats['cost']} points spent", "green"
+        ))
+    if deferred:
+        console.print(colored(
+            f"{len(deferred)} new repositories did not fit in the budget and were written without enrichment", "yellow"
+        ))
+    if duplicates:
+        console.print(colored(f"Skipped {len(duplicates)} duplicate entries:", "yellow"))
+        for duplicate_url in duplicates:
+            console.print(f"  - {duplicate_url}")
     if failures:
         console.print(colored(f"Failed to process {len(failures)} projects:", "yellow"))
         for failed_url in failures:
@@ -128,4 +450,33 @@ def run_etl_pipeline(
     else:
         console.print(colored("All projects processed successfully.", "green"))
     
-    return failures
\ No newline at end of file
+    return failures
+
+def run_transform_from_snapshot(snapshot: Path, projects_csv_path: Path, orgs_csv_path: Path):
+    """
+    Rebuild the CSV outputs from a snapshot archive without any network call.
+    
+    Args:
+        snapshot: Snapshot segment file, or archive directory (the latest segment is used)
+        projects_csv_path: Path where to save the CSV file with projects information
+        orgs_csv_path: Path where to save the CSV file with organizations information
+        
+    Returns:
+        Number of project rows written.
+    """
+    repo_records, organizations = load_snapshot(snapshot)
+    writer_projects, writer_github_organizations, existing_orgs, csv_projects_file, csv_orgs_file = initialize_csv_writers(
+        projects_csv_path, orgs_csv_path
+    )
+    try:
+        for record in repo_records:
+            entry = record["entry"]
+            project_data = transform_project(entry, record["payload"], organizations, record.get("fetched_at"))
+            owner = (record["payload"].get("repo") or {}).get("owner") or {}
+            organization = organizations.get(owner.get("login"))
+            load_project(project_data, organization, entry["rubric"],
+                         writer_projects, writer_github_organizations, existing_orgs)
+    finally:
+        csv_projects_file.close()
+        csv_orgs_file.close()
+    return len(repo_records)
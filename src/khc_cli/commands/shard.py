@@ -0,0 +1,192 @@
+"""Sharded ETL: coordinator, workers and merge step sharing a SQLite work queue."""
+
+import logging
+import multiprocessing
+import os
+import socket
+import uuid
+from rich.console import Console
+from pathlib import Path
+from datetime import datetime, timezone
+from urllib.parse import urlparse
+
+from khc_cli.github_client import GitHubClient
+from khc_cli.commands.etl import entry_record, extract_github_payload, transform_project, load_project
+from khc_cli.utils.helpers import fetch_awesome_readme_content, initialize_csv_writers
+from khc_cli.utils.snapshot import SnapshotWriter
+from khc_cli.utils.work_queue import WorkQueue, DONE
+from khc_cli.utils.canonical import RepoIndex, canonicalize_repo_url, entry_key
+
+console = Console()
+LOGGER = logging.getLogger(__name__)
+
+def split_tokens(github_api_keys):
+    """Split a comma separated list of GitHub tokens."""
+    if not github_api_keys:
+        return [None]
+    return [token.strip() for token in github_api_keys.split(",") if token.strip()] or [None]
+
+def default_worker_id():
+    """Return a worker identifier unique across runs, hosts and containers sharing a hostname."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+def run_shard_coordinator(
+    awesome_repo_url: str,
+    awesome_readme_filename: str,
+    local_readme_path: Path,
+    queue_path: Path,
+    github_api_key: str = None,
+    repo_index_path: Path = None,
+):
+    """
+    Parse an Awesome list and split its entries into deduplicated work items.
+
+    Args:
+        awesome_repo_url: URL of the GitHub repository containing the Awesome list
+        awesome_readme_filename: Name of the README file (usually "README.md")
+        local_readme_path: Path where to save the local copy of the README
+        queue_path: Path of the SQLite work queue
+        github_api_key: GitHub API key for authentication
+        repo_index_path: Path of the persistent index of renamed/transferred repositories
+
+    Returns:
+        Number of enqueued items.
+    """
+    g = GitHubClient(split_tokens(github_api_key)[0]).client
+    awesome_repo_path = urlparse(awesome_repo_url).path.strip("/")
+    awesome_repo_data = fetch_awesome_readme_content(
+        g, awesome_repo_path, awesome_readme_filename, local_readme_path, lazy=True
+    )
+
+    repo_index = RepoIndex(repo_index_path)
+    items = []
+    seen_keys = set()
+    for rubric_key, entry, depth in awesome_repo_data.iter_entries():
+        key = entry_key(entry.url, repo_index)
+        if key.lower() in seen_keys:
+            LOGGER.info(f"Skipping duplicate entry {entry.url}")
+            continue
+        seen_keys.add(key.lower())
+        items.append((key, entry_record(entry, rubric_key)))
+
+    with WorkQueue(queue_path) as queue:
+        queue.reset()
+        queue.set_meta("awesome_repo_url", awesome_repo_url)
+        queue.enqueue(items)
+    LOGGER.info(f"{len(items)} work items enqueued in {queue_path}")
+    return len(items)
+
+def run_shard_worker(queue_path: Path, github_api_key: str = None, worker_id: str = None, batch_size: int = 10):
+    """
+    Claim work items and fetch their raw GitHub payloads until the queue is drained.
+
+    Args:
+        queue_path: Path of the SQLite work queue
+        github_api_key: GitHub API key used by this worker
+        worker_id: Identifier recorded on claimed items, unique among the workers of the
+            queue (defaults to ``default_worker_id()``)
+        batch_size: Number of items claimed per transaction
+
+    Returns:
+        Number of items processed by this worker.
+    """
+    worker_id = worker_id or default_worker_id()
+    github_client = GitHubClient(github_api_key)
+    g = github_client.client
+    processed = 0
+
+    with WorkQueue(queue_path) as queue:
+        while True:
+            batch = queue.claim(worker_id, batch_size)
+            if not batch:
+                break
+            github_client.check_rate_limit()
+            for item_id, key, entry in batch:
+                try:
+                    payload, organization = {}, None
+                    platform, repo_path = canonicalize_repo_url(entry["url"])
+                    if platform == "github.com" and repo_path:
+                        payload, organization = extract_github_payload(g, key)
+                    stored = queue.complete(item_id, worker_id, payload, organization, datetime.now(timezone.utc).isoformat())
+                except Exception as e:
+                    LOGGER.warning(f"Worker {worker_id} failed to process {entry['url']}: {e}")
+                    stored = queue.fail(item_id, worker_id, e)
+                if not stored:
+                    # Lease expired: the item belongs to another worker now, keep its result
+                    LOGGER.warning(f"Worker {worker_id} lost the lease of {entry['url']}, result discarded")
+                    continue
+                processed += 1
+    LOGGER.info(f"Worker {worker_id} processed {processed} items")
+    return processed
+
+def run_shard_workers(queue_path: Path, github_api_key: str = None, processes: int = 1, batch_size: int = 10):
+    """
+    Run ``processes`` local workers on the queue, spreading the given tokens between them.
+
+    Args:
+        queue_path: Path of the SQLite work queue
+        github_api_key: One GitHub API key, or several separated by commas
+        processes: Number of worker processes to start
+        batch_size: Number of items claimed per transaction
+    """
+    tokens = split_tokens(github_api_key)
+    if processes <= 1:
+        run_shard_worker(queue_path, tokens[0], batch_size=batch_size)
+        return
+
+    workers = [
+        multiprocessing.Process(
+            target=run_shard_worker,
+            args=(queue_path, tokens[i % len(tokens)]),
+            # Each process picks its own unique identifier: ownership checks of the queue rely on it
+            kwargs={"batch_size": batch_size},
+        )
+        for i in range(processes)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+def run_shard_merge(queue_path: Path, projects_csv_path: Path, orgs_csv_path: Path, snapshot_dir: Path = None):
+    """
+    Assemble the CSV outputs from the results stored in the queue, in list order.
+
+    Args:
+        queue_path: Path of the SQLite work queue
+        projects_csv_path: Path where to save the CSV file with projects information
+        orgs_csv_path: Path where to save the CSV file with organizations information
+        snapshot_dir: Directory of the snapshot archive where the merged payloads are persisted
+
+    Returns:
+        List of URLs of the entries that could not be processed.
+    """
+    failures = []
+    writer_projects, writer_github_organizations, existing_orgs, csv_projects_file, csv_orgs_file = initialize_csv_writers(
+        projects_csv_path, orgs_csv_path
+    )
+    snapshot = SnapshotWriter(snapshot_dir) if snapshot_dir else None
+    organizations = {}
+
+    try:
+        with WorkQueue(queue_path) as queue:
+            for key, entry, status, payload, organization, fetched_at, error in queue.iter_results():
+                if status != DONE:
+                    failures.append(entry["url"])
+                    continue
+                if organization:
+                    organizations[organization["login"]] = organization
+                if snapshot:
+                    snapshot.add_repo(key, entry, payload, fetched_at)
+                    if organization:
+                        snapshot.add_organization(organization["login"], organization)
+                project_data = transform_project(entry, payload, organizations, fetched_at)
+                load_project(project_data, organization, entry["rubric"],
+                             writer_projects, writer_github_organizations, existing_orgs)
+    finally:
+        csv_projects_file.close()
+        csv_orgs_file.close()
+        if snapshot:
+            snapshot.close()
+
+    return failures
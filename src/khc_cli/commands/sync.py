@@ -0,0 +1,257 @@
+"""Incremental synchronization of the ETL outputs with an Awesome list.
+
+The last processed commit of the list repository and the entries it contained
+are remembered in a state file. A sync run first checks, with a conditional
+request that does not consume API quota when nothing changed, whether the list
+moved. If so, the old and new entries are diffed and only added entries are
+enriched; rows of moved or edited entries are patched, and the other rows are
+copied unchanged.
+"""
+
+import csv
+import json
+import logging
+import requests
+from rich.console import Console
+from pathlib import Path
+from datetime import datetime, timezone
+from urllib.parse import urlparse
+
+from khc_cli.github_client import GitHubClient
+from khc_cli.commands.etl import entry_record, extract_github_payload, extract_readme, transform_project, load_project
+from khc_cli.utils.helpers import fetch_awesome_readme_content, initialize_csv_writers
+from khc_cli.utils.canonical import RepoIndex, canonicalize_repo_url, entry_key
+from khc_cli.utils.snapshot import SnapshotWriter, load_previous_records
+from khc_cli.utils.forges import ForgeBatcher
+from khc_cli.utils.readme_store import ReadmeFetcher
+from khc_cli.utils.issue_metrics import IssueMetricsBatcher
+
+console = Console()
+LOGGER = logging.getLogger(__name__)
+
+# Columns derived from the list entry itself, patched without any API call
+ENTRY_COLUMNS = ["project_name", "oneliner", "git_url", "rubric", "platform"]
+
+def load_sync_state(state_path):
+    state_path = Path(state_path)
+    if not state_path.exists():
+        return {}
+    with open(state_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def save_sync_state(state_path, state):
+    state_path = Path(state_path)
+    state_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(state_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+
+def fetch_head_sha(awesome_repo_path, github_api_key=None, etag=None):
+    """
+    Return the commit SHA of the default branch of a repository.
+
+    The request is conditional on ``etag``: a 304 answer does not count against the rate limit.
+
+    Returns:
+        Tuple ``(sha, etag)``; ``sha`` is None when the repository did not change.
+    """
+    headers = {"Accept": "application/vnd.github.sha"}
+    if github_api_key:
+        headers["Authorization"] = f"token {github_api_key}"
+    if etag:
+        headers["If-None-Match"] = etag
+    response = requests.get(f"https://api.github.com/repos/{awesome_repo_path}/commits/HEAD", headers=headers)
+    if response.status_code == 304:
+        return None, etag
+    response.raise_for_status()
+    return response.text.strip(), response.headers.get("ETag")
+
+def diff_entries(old_entries, new_entries):
+    """
+    Diff two ``{key: entry_record}`` mappings.
+
+    Keys are compared case-insensitively: a key takes the casing of the API full name
+    once its repository has been recorded in the index.
+
+    Returns:
+        Dict of key lists: ``added``, ``removed``, ``moved`` (rubric changed) and
+        ``changed`` (name, text or URL changed).
+    """
+    diff = {"added": [], "removed": [], "moved": [], "changed": []}
+    old_by_key = {key.lower(): entry for key, entry in old_entries.items()}
+    new_keys = {key.lower() for key in new_entries}
+    for key, entry in new_entries.items():
+        old = old_by_key.get(key.lower())
+        if old is None:
+            diff["added"].append(key)
+            continue
+        if old["rubric"] != entry["rubric"]:
+            diff["moved"].append(key)
+        if (old["name"], old["text"], old["url"]) != (entry["name"], entry["text"], entry["url"]):
+            diff["changed"].append(key)
+    diff["removed"] = [key for key in old_entries if key.lower() not in new_keys]
+    return diff
+
+def run_sync_pipeline(
+    awesome_repo_url: str,
+    awesome_readme_filename: str,
+    local_readme_path: Path,
+    projects_csv_path: Path,
+    orgs_csv_path: Path,
+    state_path: Path,
+    github_api_key: str = None,
+    snapshot_dir: Path = None,
+    repo_index_path: Path = None,
+    forges: dict = None,
+    readme_store_dir: Path = None,
+    issue_metrics: bool = False,
+    issue_stats_path: Path = None,
+    forge_cache_path: Path = None,
+):
+    """
+    Bring the ETL outputs up to date with the current version of an Awesome list.
+
+    Args:
+        awesome_repo_url: URL of the GitHub repository containing the Awesome list
+        awesome_readme_filename: Name of the README file (usually "README.md")
+        local_readme_path: Path where to save the local copy of the README
+        projects_csv_path: Path of the CSV file with projects information
+        orgs_csv_path: Path of the CSV file with organizations information
+        state_path: Path of the sync state (last processed commit and entries)
+        github_api_key: GitHub API key for authentication
+        snapshot_dir: Directory of the snapshot archive; payloads of unchanged entries are
+            carried over from its latest segment
+        repo_index_path: Path of the persistent index of renamed/transferred repositories
+        forges: Additional forge instances, as a mapping of hosts or base URLs to forge kinds
+        readme_store_dir: Directory of the README blob store, for the READMEs of added projects
+        issue_metrics: Fetch issue and pull request counts of added GitHub projects
+        issue_stats_path: File where the measured cost of the GraphQL queries is saved
+        forge_cache_path: File where payloads of other forges are cached with their ETag
+
+    Returns:
+        The diff that was applied, or None when the list did not change.
+    """
+    github_client = GitHubClient(github_api_key)
+    g = github_client.client
+    awesome_repo_path = urlparse(awesome_repo_url).path.strip("/")
+    if awesome_repo_path.startswith("repos/"):
+        # API URL such as https://api.github.com/repos/owner/repo/contents/README.md
+        awesome_repo_path = "/".join(awesome_repo_path.split("/")[1:3])
+    state = load_sync_state(state_path)
+
+    sha, etag = fetch_head_sha(awesome_repo_path, github_client.token, state.get("etag"))
+    unchanged = sha is None or sha == state.get("sha")
+    if unchanged and Path(projects_csv_path).exists() and not state.get("failed"):
+        LOGGER.info(f"{awesome_repo_path} did not change since {state.get('sha')}")
+        return None
+    # The list may be unchanged, with entries that failed last time left to retry
+    sha = sha or state.get("sha")
+
+    awesome_list = fetch_awesome_readme_content(
+        g, awesome_repo_path, awesome_readme_filename, local_readme_path, lazy=True
+    )
+    repo_index = RepoIndex(repo_index_path)
+    forge_batcher = ForgeBatcher(forges, cache_path=forge_cache_path)
+    readme_fetcher = ReadmeFetcher(readme_store_dir, github_client.token) if readme_store_dir else None
+    issue_batcher = IssueMetricsBatcher(github_client.token, stats_path=issue_stats_path) if issue_metrics else None
+    new_entries = {}
+    for rubric_key, entry, depth in awesome_list.iter_entries():
+        key = entry_key(entry.url, repo_index, forge_batcher.forges)
+        if key not in new_entries:
+            new_entries[key] = entry_record(entry, rubric_key)
+
+    old_entries = state.get("entries", {}) if Path(projects_csv_path).exists() else {}
+    diff = diff_entries(old_entries, new_entries)
+
+    # Rows and payloads of the previous run
+    existing_rows = {}
+    if Path(projects_csv_path).exists():
+        with open(projects_csv_path, "r", newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                existing_rows[entry_key(row["git_url"], repo_index, forge_batcher.forges).lower()] = row
+    previous_records, organizations = load_previous_records(snapshot_dir)
+
+    writer_projects, writer_github_organizations, existing_orgs, csv_projects_file, csv_orgs_file = initialize_csv_writers(
+        projects_csv_path, orgs_csv_path
+    )
+    snapshot = SnapshotWriter(snapshot_dir) if snapshot_dir else None
+    added = set(diff["added"])
+    failures = []
+    # Added entries of other forges, and issue counts of GitHub ones, are queued up front
+    # so that they are looked up in batches
+    forge_results, issue_results = {}, {}
+    for key in diff["added"]:
+        platform, repo_path = canonicalize_repo_url(new_entries[key]["url"], forge_batcher.forges)
+        if platform != "github.com" and forge_batcher.supports(platform) and repo_path:
+            forge_results[key] = forge_batcher.submit(platform, repo_path)
+        elif platform == "github.com" and repo_path and issue_batcher:
+            issue_results[key] = issue_batcher.submit(key)
+
+    try:
+        for key, record in new_entries.items():
+            row = existing_rows.get(key.lower())
+            previous = previous_records.get(key.lower())
+            if key not in added and row is not None:
+                # Unchanged row, with the columns coming from the entry patched in place
+                entry_columns = transform_project(record, {}, {})
+                row.update({column: entry_columns.get(column) for column in ENTRY_COLUMNS})
+                writer_projects.writerow(row)
+                if snapshot and previous:
+                    snapshot.add_repo(key, record, previous["payload"], previous.get("fetched_at"))
+                continue
+
+            try:
+                payload, organization = {}, None
+                fetched_at = datetime.now(timezone.utc).isoformat()
+                platform, repo_path = canonicalize_repo_url(record["url"], forge_batcher.forges)
+                if platform == "github.com" and repo_path:
+                    payload, organization = extract_github_payload(g, key)
+                    repo_index.record(key, payload["repo"].get("full_name"))
+                    if organization:
+                        organizations[organization["login"]] = organization
+                    if readme_fetcher:
+                        extract_readme(readme_fetcher, key, payload)
+                    if key in issue_results:
+                        try:
+                            payload["issues"] = issue_results[key].result()
+                        except Exception as e:
+                            LOGGER.warning(f"Issue metrics failed for {key}: {e}")
+                elif key in forge_results:
+                    try:
+                        payload = {"forge": forge_results[key].result()}
+                    except Exception as e:
+                        LOGGER.warning(f"Forge lookup failed for {key}: {e}")
+                if snapshot:
+                    snapshot.add_repo(key, record, payload, fetched_at)
+                project_data = transform_project(record, payload, organizations, fetched_at)
+                load_project(project_data, organization, record["rubric"],
+                             writer_projects, writer_github_organizations, existing_orgs)
+            except Exception as e:
+                console.print(f"[red]Failed to process {record['url']}: {e}[/red]")
+                failures.append(record["url"])
+
+        if snapshot:
+            for login, organization in organizations.items():
+                snapshot.add_organization(login, organization)
+    finally:
+        forge_batcher.close()
+        if readme_fetcher:
+            readme_fetcher.close()
+        if issue_batcher:
+            issue_batcher.close()
+        csv_projects_file.close()
+        csv_orgs_file.close()
+        if snapshot:
+            snapshot.close()
+
+    repo_index.save()
+    # Failed entries are kept out of the state, and listed so that the next sync retries
+    # them even when the list did not move
+    save_sync_state(state_path, {
+        "awesome_repo": awesome_repo_path,
+        "sha": sha,
+        "etag": etag,
+        "entries": {key: record for key, record in new_entries.items() if record["url"] not in failures},
+        "failed": [key for key, record in new_entries.items() if record["url"] in failures],
+    })
+    diff["failures"] = failures
+    return diff
@@ -42,6 +42,19 @@ class GitHubClient:
             "reset_time": datetime.fromtimestamp(reset_time)
         }
         
+    def get_rate_limits(self, buckets=("core", "graphql", "search")):
+        """Vérifie les limites de taux de chaque ressource de l'API (core, graphql, search...)."""
+        resources = self.client.get_rate_limit().raw_data.get("resources", {})
+        return {
+            bucket: {
+                "remaining": resources[bucket]["remaining"],
+                "total": resources[bucket]["limit"],
+                "reset_time": datetime.fromtimestamp(resources[bucket]["reset"]),
+            }
+            for bucket in buckets
+            if bucket in resources
+        }
+        
     def check_rate_limit(self, min_requests_remaining=100):
         """Vérifie si la limite de l'API est proche et attend si nécessaire."""
         limit_info = self.get_rate_limit()
@@ -4,6 +4,7 @@ import typer
 from rich.console import Console
 from rich.table import Table
 import logging
+from pathlib import Path
 from typing_extensions import Annotated
 
 from khc_cli.github_client import GitHubClient
@@ -40,15 +41,16 @@ def status(
     """Check the status of the GitHub API."""
     try:
         github_client = GitHubClient(github_api_key)
-        rate_limit = github_client.get_rate_limit()
+        rate_limits = github_client.get_rate_limits()
         
         table = Table(title="GitHub API Status")
-        table.add_column("Metric", style="cyan")
-        table.add_column("Value", style="green")
+        table.add_column("Bucket", style="cyan")
+        table.add_column("Remaining requests", style="green")
+        table.add_column("Total limit", style="green")
+        table.add_column("Reset at", style="green")
         
-        table.add_row("Remaining requests", str(rate_limit["remaining"]))
-        table.add_row("Total limit", str(rate_limit["total"]))
-        table.add_row("Reset at", str(rate_limit["reset_time"]))
+        for bucket, rate_limit in rate_limits.items():
+            table.add_row(bucket, str(rate_limit["remaining"]), str(rate_limit["total"]), str(rate_limit["reset_time"]))
         
         console.print(table)
         
@@ -56,10 +58,30 @@ def status(
         console.print(f"[red]Error: {e}[/red]")
         raise typer.Exit(1)
 
+@app.command()
+def serve(
+    host: Annotated[str, typer.Option(help="Address to listen on")] = "127.0.0.1",
+    port: Annotated[int, typer.Option(help="Port to listen on (0 picks a free port)")] = 8765,
+    ttl: Annotated[int, typer.Option(help="Seconds during which repository summaries are cached")] = 600,
+    github_api_key: Annotated[str, typer.Option(envvar="GITHUB_API_KEY", help="GitHub API Key")] = None,
+):
+    """Run a local daemon keeping clients and parsed data warm for fast lookups."""
+    from khc_cli.utils.daemon import serve as run_daemon
+    
+    try:
+        run_daemon(host, port, github_api_key, ttl,
+                   on_ready=lambda url: console.print(f"[green]Serving on {url}, press Ctrl+C to stop[/green]"))
+    except KeyboardInterrupt:
+        console.print("[yellow]Daemon stopped[/yellow]")
+    except OSError as e:
+        console.print(f"[red]Error: {e}[/red]")
+        raise typer.Exit(1)
+
 @app.callback(invoke_without_command=True)
 def main(
     ctx: typer.Context,
-    version: bool = typer.Option(False, "--version", "-v", help="Show the version of khc-cli")
+    version: bool = typer.Option(False, "--version", "-v", help="Show the version of khc-cli"),
+    profile: Path = typer.Option(None, "--profile", help="Profile the command and write pstats to this file (plus <file>.collapsed stacks)"),
 ):
     """
     KHC CLI - Tool for analyzing and curating Awesome lists
@@ -72,6 +94,17 @@ def main(
     if ctx.invoked_subcommand is None:
         typer.echo(ctx.get_help())
         raise typer.Exit()
+    if profile:
+        from khc_cli.utils.profiling import CommandProfiler
+        
+        profiler = CommandProfiler(profile)
+        profiler.start()
+        
+        def stop_profiler():
+            profiler.stop()
+            profiler.report(console)
+        
+        ctx.call_on_close(stop_profiler)
     
 
 def run(prog_name="khc-cli"):
@@ -0,0 +1,172 @@
+"""Canonicalization of repository URLs found in Awesome lists.
+
+Entries point to the same repository in many ways (``http://``, ``www.``,
+trailing ``.git``, ``/tree/main`` subpaths, mixed case...). Every entry is mapped
+to a canonical ``owner/repo`` before any network call so that each repository is
+fetched once. Renamed or transferred repositories are tracked in a persistent
+index, filled from the ``full_name`` returned by the API.
+"""
+
+import json
+import logging
+import re
+from pathlib import Path
+from urllib.parse import urlparse
+
+LOGGER = logging.getLogger(__name__)
+
+PLATFORM_ALIASES = {
+    "www.github.com": "github.com",
+    "www.gitlab.com": "gitlab.com",
+}
+
+# Well-known forges whose URLs are collapsed to a repository path: projects of GitLab
+# instances can be nested in (sub)groups, repositories of the others are owner/repo.
+# Self-hosted instances are passed explicitly as ``forges``; URLs of any other host
+# are only normalized, they may be documentation or websites.
+NESTED_PLATFORMS = {"gitlab.com", "framagit.org"}
+FLAT_PLATFORMS = {"github.com", "codeberg.org"}
+
+# First path segments of GitHub pages that are not repositories
+GITHUB_RESERVED = {
+    "about", "apps", "collections", "customer-stories", "enterprise", "events", "explore",
+    "features", "login", "marketplace", "notifications", "orgs", "pricing", "search",
+    "security", "settings", "site", "sponsors", "topics", "trending", "users",
+}
+
+SSH_URL = re.compile(r"^(?:ssh://)?git@(?P<host>[^:/]+)[:/](?P<path>.+)$")
+
+
+def _split_url(url):
+    url = url.strip()
+    ssh = SSH_URL.match(url)
+    if ssh:
+        return ssh.group("host"), ssh.group("path"), ""
+    if "://" not in url:
+        url = "https://" + url
+    parts = urlparse(url)
+    return parts.netloc, parts.path, parts.query
+
+
+def _platform(host):
+    host = host.lower().split("@")[-1].split(":")[0]
+    return PLATFORM_ALIASES.get(host, host)
+
+
+def _instance(platform, segments, forges):
+    """Match a URL against the forge instances served under a sub-path of their host."""
+    lowered = [segment.lower() for segment in segments]
+    for instance in forges or ():
+        host, _, prefix = instance.partition("/")
+        prefix = prefix.split("/") if prefix else []
+        if prefix and host == platform and lowered[:len(prefix)] == prefix:
+            return instance, segments[len(prefix):]
+    return platform, segments
+
+
+def canonicalize_repo_url(url, forges=None):
+    """
+    Map a repository URL to its platform and canonical repository path.
+
+    Args:
+        url: URL of a repository, as written in the list
+        forges: Additional forge instances, as a mapping of instances (``host`` or
+            ``host/sub/path``, lower-cased, without scheme) to forge kinds; projects of
+            ``gitlab`` instances can be nested in subgroups
+
+    Returns:
+        Tuple ``(platform, repo_path)`` where ``repo_path`` is the lower-cased
+        ``owner/repo`` (``group/subgroup/project`` on GitLab), or ``(platform, None)``
+        when the URL does not point to a repository of a known forge. The platform of
+        an instance served under a sub-path is that instance.
+    """
+    forges = forges or {}
+    host, path, _ = _split_url(url)
+    platform = _platform(host)
+
+    segments = [segment for segment in path.split("/") if segment]
+    platform, segments = _instance(platform, segments, forges)
+    if platform in NESTED_PLATFORMS or forges.get(platform) == "gitlab":
+        if "-" in segments:
+            # GitLab style subpaths: group/project/-/tree/main
+            segments = segments[:segments.index("-")]
+    elif platform in FLAT_PLATFORMS or platform in forges:
+        if platform == "github.com" and segments and segments[0].lower() in GITHUB_RESERVED:
+            return platform, None
+        segments = segments[:2]
+    else:
+        return platform, None
+    if len(segments) < 2:
+        return platform, None
+    if segments[-1].endswith(".git"):
+        segments[-1] = segments[-1][:-4]
+    if not all(segments):
+        return platform, None
+    return platform, "/".join(segments).lower()
+
+
+def normalize_url(url):
+    """Return ``url`` without its scheme, ``www.``, fragment, trailing slash and ``.git`` suffix."""
+    host, path, query = _split_url(url)
+    platform = _platform(host)
+    if platform.startswith("www."):
+        platform = platform[4:]
+    path = path.rstrip("/")
+    if path.endswith(".git"):
+        path = path[:-4]
+    return f"{platform}{path}" + (f"?{query}" if query else "")
+
+
+class RepoIndex:
+    """Persistent index of canonical repository paths to their current full name."""
+
+    def __init__(self, path=None):
+        self.path = Path(path) if path else None
+        self.names = {}
+        if self.path and self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.names = json.load(f)
+
+    def resolve(self, repo_path):
+        """Return the current full name of a repository, following known renames."""
+        seen = set()
+        current = repo_path.lower()
+        while current in self.names and current not in seen:
+            seen.add(current)
+            resolved = self.names[current]
+            if resolved.lower() == current:
+                return resolved
+            current = resolved.lower()
+        return self.names.get(current, current)
+
+    def record(self, repo_path, full_name):
+        """Remember the full name reported by the API for ``repo_path``."""
+        if not full_name:
+            return
+        if repo_path.lower() != full_name.lower():
+            LOGGER.info(f"Repository {repo_path} was renamed or transferred to {full_name}")
+        self.names[repo_path.lower()] = full_name
+        self.names[full_name.lower()] = full_name
+
+    def save(self):
+        if not self.path:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(self.names, f, indent=2, sort_keys=True)
+
+
+def entry_key(url, repo_index=None, forges=None):
+    """
+    Return the deduplication key of an entry URL.
+
+    GitHub repositories are keyed by their resolved ``owner/repo``, repositories of the
+    other known forges (and of ``forges``) by ``platform/repo_path``, and any other URL
+    by its normalized form.
+    """
+    platform, repo_path = canonicalize_repo_url(url, forges)
+    if repo_path is None:
+        return normalize_url(url)
+    if platform == "github.com":
+        return repo_index.resolve(repo_path) if repo_index else repo_path
+    return f"{platform}/{repo_path}"
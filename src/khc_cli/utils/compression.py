@@ -0,0 +1,60 @@
+"""Compression helpers shared by the on-disk stores of the CLI.
+
+Zstandard is used when the optional ``zstandard`` package is installed;
+otherwise the standard library ``gzip`` module is used instead.
+"""
+
+import gzip
+import io
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - depends on the environment
+    zstandard = None
+
+ZSTD_LEVEL = 10
+
+
+def default_extension():
+    """Return the file extension matching the available codec."""
+    return ".zst" if zstandard is not None else ".gz"
+
+
+def compress_bytes(data):
+    """Compress ``data`` with the best available codec."""
+    if zstandard is not None:
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return gzip.compress(data)
+
+
+def decompress_bytes(data):
+    """Decompress ``data`` produced by :func:`compress_bytes`."""
+    if data[:4] == b"\x28\xb5\x2f\xfd":
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read this data (pip install zstandard)")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+def open_compressed(path, mode="rt"):
+    """Open a compressed text file, choosing the codec from its extension.
+
+    Args:
+        path: Path of the file, ending with ``.zst`` or ``.gz``
+        mode: ``"rt"``, ``"wt"`` or ``"at"``
+
+    Returns:
+        A text file object.
+    """
+    path = str(path)
+    if path.endswith(".zst"):
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to open .zst files (pip install zstandard)")
+        if mode.startswith("r"):
+            raw = zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True)
+        else:
+            raw = zstandard.ZstdCompressor(level=ZSTD_LEVEL).stream_writer(
+                open(path, mode[0] + "b"), closefd=True
+            )
+        return io.TextIOWrapper(raw, encoding="utf-8")
+    return gzip.open(path, mode, encoding="utf-8")
@@ -0,0 +1,292 @@
+"""Long-running ``khc-cli serve`` daemon and its client.
+
+The daemon keeps an authenticated ``GitHubClient``, parsed Awesome lists and
+loaded project tables in memory, and answers lookups over a local HTTP API:
+
+- ``GET /health``
+- ``GET /repo?name=owner/repo``: summary of a repository, as ``analyze repo``
+- ``GET /validate?path=README.md``: rubrics and entries counts, as ``curate validate``
+- ``GET /list?output_dir=csv&by=rubric&stale_days=365&top=10``: report of ``analyze list``
+
+Parsed files are cached until their modification time changes; repository
+summaries are cached for ``ttl`` seconds. The address of the running daemon and
+a random access token are written to a state file, which commands read to route
+their lookups through the daemon instead of starting cold.
+"""
+
+import json
+import logging
+import os
+import secrets
+import signal
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlencode, urlparse
+
+import requests
+
+LOGGER = logging.getLogger(__name__)
+
+STATE_PATH = Path.home() / ".cache" / "khc-cli" / "serve.json"
+TOKEN_HEADER = "X-KHC-Token"
+
+
+def repo_summary(github_client, repo_name, dependents_pages=5):
+    """Collect the summary of a repository reported by ``analyze repo``."""
+    from khc_cli.utils.helpers import crawl_github_dependents
+
+    repo = github_client.client.get_repo(repo_name)
+    return {
+        "name": repo.name,
+        "stars": repo.stargazers_count,
+        "forks": repo.forks_count,
+        "language": repo.language,
+        "description": repo.description,
+        "last_update": repo.updated_at.isoformat() if repo.updated_at else None,
+        "dependents": len(crawl_github_dependents(repo_name, dependents_pages)),
+    }
+
+
+def list_summary(readme_path):
+    """Count the rubrics and entries of an Awesome list, as reported by ``curate validate``."""
+    from khc_cli.awesomecure.awesome2py import AwesomeList
+
+    awesome_list = AwesomeList(str(readme_path))
+    return {
+        "rubrics": len(awesome_list.rubrics),
+        "entries": sum(len(rubric.entries) for rubric in awesome_list.rubrics),
+    }
+
+
+class FileCache:
+    """Values computed from files, recomputed when one of the files changes."""
+
+    def __init__(self):
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def get(self, key, paths, compute):
+        signature = tuple(
+            (str(path), path.stat().st_mtime_ns, path.stat().st_size) if path.exists() else (str(path), None, None)
+            for path in paths
+        )
+        with self.lock:
+            cached = self.values.get(key)
+            if cached and cached[0] == signature:
+                return cached[1]
+        value = compute()
+        with self.lock:
+            self.values[key] = (signature, value)
+        return value
+
+
+class KhcService:
+    """Warm state shared by the requests of the daemon."""
+
+    def __init__(self, github_api_key=None, ttl=600):
+        self.github_api_key = github_api_key
+        self.ttl = ttl
+        self._github_client = None
+        self.repos = {}
+        self.files = FileCache()
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def github_client(self):
+        with self.lock:
+            if self._github_client is None:
+                from khc_cli.github_client import GitHubClient
+
+                self._github_client = GitHubClient(self.github_api_key)
+            return self._github_client
+
+    def repo(self, name):
+        key = name.strip("/").lower()
+        cached = self.repos.get(key)
+        if cached and time.time() - cached[0] < self.ttl:
+            self.hits += 1
+            return cached[1]
+        self.misses += 1
+        summary = repo_summary(self.github_client, name)
+        self.repos[key] = (time.time(), summary)
+        return summary
+
+    def validate(self, path):
+        path = Path(path)
+        if not path.exists():
+            raise FileNotFoundError(f"File {path} does not exist")
+        return self.files.get(("validate", str(path)), [path], lambda: list_summary(path))
+
+    def list_report(self, output_dir, by="rubric", stale_days=365, top=10):
+        from khc_cli.utils.project_table import GROUP_COLUMNS, load_project_table, project_report
+
+        output_dir = Path(output_dir)
+        projects_csv_path = output_dir / "projects.csv"
+        orgs_csv_path = output_dir / "github_organizations.csv"
+        if not projects_csv_path.exists():
+            raise FileNotFoundError(f"File {projects_csv_path} does not exist")
+        if by not in GROUP_COLUMNS:
+            raise ValueError(f"Cannot group by '{by}', use one of: {', '.join(GROUP_COLUMNS)}")
+        table = self.files.get(
+            ("table", str(output_dir)), [projects_csv_path, orgs_csv_path],
+            lambda: load_project_table(projects_csv_path, orgs_csv_path),
+        )
+        return project_report(table, by, stale_days, top)
+
+    def health(self):
+        return {
+            "pid": os.getpid(),
+            "uptime": round(time.time() - self.started, 1),
+            "cached_repos": len(self.repos),
+            "cached_files": len(self.files.values),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+def _make_handler(service, token):
+    routes = {
+        "/health": lambda params: service.health(),
+        "/repo": lambda params: service.repo(params["name"]),
+        "/validate": lambda params: service.validate(params["path"]),
+        "/list": lambda params: service.list_report(
+            params["output_dir"], params.get("by", "rubric"),
+            int(params.get("stale_days", 365)), int(params.get("top", 10)),
+        ),
+    }
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            LOGGER.debug(format % args)
+
+        def _send(self, status, body):
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if not secrets.compare_digest(self.headers.get(TOKEN_HEADER, ""), token):
+                return self._send(403, {"error": "Invalid token"})
+            url = urlparse(self.path)
+            route = routes.get(url.path)
+            if route is None:
+                return self._send(404, {"error": f"Unknown endpoint {url.path}"})
+            params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+            try:
+                self._send(200, route(params))
+            except KeyError as e:
+                self._send(400, {"error": f"Missing parameter {e}"})
+            except (FileNotFoundError, ValueError) as e:
+                self._send(400, {"error": str(e)})
+            except Exception as e:
+                LOGGER.error(f"{url.path} failed: {e}", exc_info=True)
+                self._send(500, {"error": str(e)})
+
+    return Handler
+
+
+def _stop(signum, frame):
+    raise KeyboardInterrupt
+
+
+def _read_state(state_path):
+    try:
+        with open(state_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def serve(host="127.0.0.1", port=8765, github_api_key=None, ttl=600, state_path=STATE_PATH, on_ready=None):
+    """
+    Run the daemon until interrupted; the state file is removed on exit.
+
+    Args:
+        on_ready: Called with the URL of the daemon once it listens (useful with ``port=0``)
+
+    Raises:
+        FileExistsError: When the state file points to a daemon that is still running
+    """
+    state_path = Path(state_path)
+    state = _read_state(state_path)
+    if state and _is_alive(state_path):
+        raise FileExistsError(f"A khc-cli daemon is already running on {state.get('url')} ({state_path})")
+    service = KhcService(github_api_key, ttl)
+    token = secrets.token_urlsafe(24)
+    server = ThreadingHTTPServer((host, port), _make_handler(service, token))
+    url = f"http://{host}:{server.server_port}"
+    state_path.parent.mkdir(parents=True, exist_ok=True)
+    # The token protects the API from other local users: keep the state file private
+    fd = os.open(state_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump({"url": url, "token": token, "pid": os.getpid()}, f)
+    LOGGER.info(f"khc-cli daemon listening on {url}")
+    # Stopped by a service manager: shut down like on Ctrl+C
+    in_main_thread = threading.current_thread() is threading.main_thread()
+    previous_handler = signal.signal(signal.SIGTERM, _stop) if in_main_thread else None
+    try:
+        if on_ready:
+            on_ready(url)
+        server.serve_forever()
+    finally:
+        server.server_close()
+        if in_main_thread:
+            signal.signal(signal.SIGTERM, previous_handler)
+        # Another daemon may have taken the state file over since: leave its file alone
+        if (_read_state(state_path) or {}).get("token") == token:
+            state_path.unlink(missing_ok=True)
+
+
+def _is_alive(state_path):
+    try:
+        return call_daemon("/health", state_path=state_path, timeout=5) is not None
+    except DaemonError:
+        # Something answered with the address and token of the file
+        return True
+
+
+class DaemonError(Exception):
+    """Error answered by the daemon for a well-formed request."""
+
+
+def call_daemon(endpoint, params=None, state_path=STATE_PATH, timeout=60):
+    """
+    Route a lookup through the running daemon.
+
+    Returns:
+        The decoded answer, or None when no daemon is running (the caller then does the work itself).
+
+    Raises:
+        DaemonError: When the daemon answered with an error
+    """
+    state_path = Path(state_path)
+    if not state_path.exists():
+        return None
+    try:
+        with open(state_path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        with requests.Session() as session:
+            # The daemon is local: never go through a proxy configured in the environment
+            session.trust_env = False
+            response = session.get(
+                f"{state['url']}{endpoint}?{urlencode(params or {})}",
+                headers={TOKEN_HEADER: state["token"]},
+                timeout=timeout,
+            )
+        # Not JSON: whatever answers on that address is not the daemon
+        body = response.json()
+    except (OSError, ValueError, KeyError, requests.RequestException) as e:
+        LOGGER.debug(f"khc-cli daemon unavailable: {e}")
+        return None
+    if response.status_code != 200:
+        error = body.get("error") if isinstance(body, dict) else None
+        raise DaemonError(error or f"HTTP {response.status_code}")
+    return body
@@ -0,0 +1,156 @@
+"""Discovery of candidate projects with the GitHub search API.
+
+Search queries (topics, keywords) are paginated concurrently under the search
+rate limit, which is separate from the core one (30 requests per minute when
+authenticated). Results are merged into an on-disk cache; subsequent runs with
+the same queries only ask for repositories pushed since the previous run.
+Candidates already in the list are filtered out with a set of canonical keys,
+and the rest are ranked by stars and recent activity.
+"""
+
+import json
+import logging
+import math
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+from khc_cli.utils.http import HttpClient, RateLimiter, github_headers
+
+LOGGER = logging.getLogger(__name__)
+
+SEARCH_URL = "https://api.github.com/search/repositories"
+PER_PAGE = 100
+# The search API never returns more than 1000 results per query
+MAX_RESULTS = 1000
+# Days after which the activity weight of a repository is halved
+ACTIVITY_HALF_LIFE_DAYS = 180
+CANDIDATE_FIELDS = ["full_name", "html_url", "description", "stargazers_count", "pushed_at", "language", "topics"]
+
+
+def build_queries(topics=(), keywords=(), language=None, min_stars=0):
+    """Return one search query per topic and per keyword, with the common qualifiers."""
+    qualifiers = ["fork:false", "archived:false"]
+    if language:
+        qualifiers.append(f"language:{language}")
+    if min_stars:
+        qualifiers.append(f"stars:>={min_stars}")
+    terms = [f"topic:{topic}" for topic in topics]
+    terms += [f'"{keyword}" in:name,description,topics' if " " in keyword else f"{keyword} in:name,description,topics"
+              for keyword in keywords]
+    return [" ".join([term] + qualifiers) for term in terms]
+
+
+class DiscoveryCache:
+    """Candidates found by previous runs, with the date of the last run per query."""
+
+    def __init__(self, path=None):
+        self.path = Path(path) if path else None
+        self.queries = {}
+        self.candidates = {}
+        if self.path and self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.queries = data.get("queries", {})
+            self.candidates = data.get("candidates", {})
+
+    def save(self):
+        if not self.path:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump({"queries": self.queries, "candidates": self.candidates}, f, indent=2, sort_keys=True)
+
+
+def search_repositories(queries, token=None, cache=None, workers=4, full=False):
+    """
+    Run search queries and merge their results into the cache.
+
+    The first page of each query gives its total count; the other pages are then fetched
+    concurrently. All calls share a limiter sized for the search rate limit.
+
+    Args:
+        queries: Search queries, as returned by ``build_queries``
+        token: GitHub token (the search limit is 10 requests per minute without it)
+        cache: ``DiscoveryCache`` to update
+        workers: Number of concurrent requests
+        full: Ignore the date of the previous run and search everything again
+
+    Returns:
+        Number of search requests sent.
+    """
+    cache = cache or DiscoveryCache()
+    limiter = RateLimiter(30 if token else 10, 60)
+    client = HttpClient(github_headers(token), pool_size=workers)
+    started = datetime.now(timezone.utc)
+    requests_sent = 0
+
+    def fetch(query, page):
+        return client.get_json(
+            SEARCH_URL,
+            params={"q": query, "sort": "updated", "order": "desc", "per_page": PER_PAGE, "page": page},
+            limiter=limiter,
+        )
+
+    def incremental(query):
+        last_run = cache.queries.get(query)
+        if last_run and not full:
+            return f"{query} pushed:>{last_run[:19]}Z"
+        return query
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            searches = [incremental(query) for query in queries]
+            first_pages = list(executor.map(lambda search: fetch(search, 1), searches))
+            requests_sent += len(searches)
+            pages = []
+            for search, first in zip(searches, first_pages):
+                total = min(first.get("total_count", 0), MAX_RESULTS)
+                pages.extend((search, page) for page in range(2, math.ceil(total / PER_PAGE) + 1))
+            other_pages = list(executor.map(lambda item: fetch(*item), pages))
+            requests_sent += len(pages)
+    finally:
+        client.close()
+
+    for result in first_pages + other_pages:
+        if result.get("incomplete_results"):
+            LOGGER.warning("GitHub search returned incomplete results")
+        for item in result.get("items", []):
+            cache.candidates[item["full_name"].lower()] = {field: item.get(field) for field in CANDIDATE_FIELDS}
+    for query in queries:
+        cache.queries[query] = started.isoformat()
+    return requests_sent
+
+
+def rank_candidates(candidates, known_keys, now=None, top=None):
+    """
+    Rank the candidates not in ``known_keys`` by stars weighted by recent activity.
+
+    Args:
+        candidates: Dict of candidate summaries keyed by lower-case full name
+        known_keys: Set of lower-case ``owner/repo`` keys already in the list
+        now: Reference date
+        top: Maximum number of candidates returned
+
+    Returns:
+        List of candidate dicts with a ``score``, best first.
+    """
+    now = now or datetime.now(timezone.utc)
+    ranked = []
+    for key, candidate in candidates.items():
+        if key in known_keys:
+            continue
+        pushed_at = candidate.get("pushed_at")
+        idle_days = (now - datetime.fromisoformat(pushed_at.replace("Z", "+00:00"))).days if pushed_at else 3650
+        activity = 0.5 ** (max(idle_days, 0) / ACTIVITY_HALF_LIFE_DAYS)
+        score = math.log1p(candidate.get("stargazers_count") or 0) * activity
+        ranked.append(dict(candidate, score=round(score, 3)))
+    ranked.sort(key=lambda candidate: candidate["score"], reverse=True)
+    return ranked[:top] if top else ranked
+
+
+def candidate_entry(candidate):
+    """Format a candidate as a list entry ready for review."""
+    description = (candidate.get("description") or "No description").strip()
+    name = candidate["full_name"].split("/")[-1]
+    return f"* [{name}]({candidate['html_url']}) - {description}"
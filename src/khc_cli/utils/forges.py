@@ -0,0 +1,367 @@
+"""Enrichment adapters for repositories hosted outside of GitHub.
+
+An adapter fetches the raw project payloads of one forge, as many at a time as
+the forge API allows, and a pure transform function maps those payloads onto the
+columns of ``projects.csv``. Raw payloads are stored in snapshots like GitHub
+ones, so offline transforms can replay them.
+
+- ``GitLabAdapter`` batches lookups with the GraphQL ``projects(fullPaths:)``
+  field (gitlab.com and self-hosted instances);
+- ``GiteaAdapter`` uses the REST API of Gitea and Forgejo instances (Codeberg).
+
+The adapters of a ``ForgeBatcher`` share one pooled ``HttpClient`` and one rate
+limiter per host. REST payloads are cached with their ETag, so that later runs only
+send conditional requests for them.
+"""
+
+import json
+import logging
+import os
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from pathlib import Path
+from urllib.parse import urlparse
+
+import requests
+
+from khc_cli.utils.canonical import normalize_url
+from khc_cli.utils.http import HttpClient, RateLimiter
+
+LOGGER = logging.getLogger(__name__)
+
+# Forge kind of the well-known hosts; other instances are passed to ``ForgeBatcher``
+DEFAULT_FORGES = {
+    "gitlab.com": "gitlab",
+    "framagit.org": "gitlab",
+    "codeberg.org": "gitea",
+}
+
+# Requests allowed per period (seconds) on a host, shared by the instances it serves
+HOST_RATE = 300
+HOST_PERIOD = 60.0
+
+GITLAB_PROJECTS_QUERY = """
+query($paths: [String!], $first: Int) {
+  projects(fullPaths: $paths, first: $first) {
+    nodes {
+      fullPath
+      name
+      description
+      webUrl
+      starCount
+      forksCount
+      openIssuesCount
+      createdAt
+      lastActivityAt
+      archived
+      topics
+      namespace { fullPath name }
+      group { fullName webUrl avatarUrl }
+      languages { name share }
+    }
+  }
+}
+"""
+
+
+def _parse_date(value):
+    if not value:
+        return None
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _age_in_days(created_at, fetched_at):
+    created = _parse_date(created_at)
+    reference_date = _parse_date(fetched_at) or datetime.now(timezone.utc)
+    return (reference_date - created).days if created else None
+
+
+def forge_instance(instance):
+    """
+    Return the platform and base URL of a forge instance.
+
+    Args:
+        instance: Host (``git.example.org``), host and sub-path, or base URL with its
+            scheme (``http://example.org/gitlab``); HTTPS is assumed without a scheme
+
+    Returns:
+        Tuple ``(platform, base_url)``; the platform is the instance without scheme, as
+        matched by ``canonicalize_repo_url``.
+    """
+    base_url = (instance if "://" in instance else f"https://{instance}").rstrip("/")
+    return normalize_url(base_url).lower(), base_url
+
+
+def forge_platforms(forges=None):
+    """Return the forge kind of each platform, as passed to ``canonicalize_repo_url``, well-known hosts included."""
+    return {forge_instance(instance)[0]: kind for instance, kind in dict(DEFAULT_FORGES, **(forges or {})).items()}
+
+
+class ForgeAdapter(ABC):
+    """Base class of the adapters; ``fetch`` returns raw payloads keyed by repository path."""
+
+    kind = None
+    batch_size = 1
+
+    def __init__(self, base_url, token=None, rate=HOST_RATE, period=HOST_PERIOD, client=None, limiter=None,
+                 cache=None):
+        self.base_url = base_url.rstrip("/")
+        self.token = token
+        self.limiter = limiter or RateLimiter(rate, period)
+        # A shared client is closed by its owner
+        self.owns_client = client is None
+        self.client = client or HttpClient()
+        # Mapping of URLs to their ``{"etag", "payload"}``, for conditional requests
+        self.cache = cache
+
+    def headers(self):
+        return {}
+
+    @abstractmethod
+    def fetch(self, repo_paths):
+        """Return the raw payload of each repository (None for repositories not found)."""
+
+    def close(self):
+        if self.owns_client:
+            self.client.close()
+
+
+class GitLabAdapter(ForgeAdapter):
+    kind = "gitlab"
+    # Maximum number of full paths GitLab accepts in one projects query
+    batch_size = 50
+
+    def headers(self):
+        return {"Authorization": f"Bearer {self.token}"} if self.token else {}
+
+    def fetch(self, repo_paths):
+        data = self.client.graphql(
+            f"{self.base_url}/api/graphql",
+            GITLAB_PROJECTS_QUERY,
+            {"paths": list(repo_paths), "first": len(repo_paths)},
+            limiter=self.limiter,
+            headers=self.headers(),
+        )
+        nodes = {node["fullPath"].lower(): node for node in (data.get("projects") or {}).get("nodes") or []}
+        return {repo_path: nodes.get(repo_path.lower()) for repo_path in repo_paths}
+
+
+class GiteaAdapter(ForgeAdapter):
+    kind = "gitea"
+
+    def headers(self):
+        return {"Authorization": f"token {self.token}"} if self.token else {}
+
+    def fetch(self, repo_paths):
+        payloads = {}
+        for repo_path in repo_paths:
+            url = f"{self.base_url}/api/v1/repos/{repo_path}"
+            known = self.cache.get(url) if self.cache is not None else None
+            headers = self.headers()
+            if known:
+                headers["If-None-Match"] = known["etag"]
+            try:
+                response = self.client.request("GET", url, limiter=self.limiter, headers=headers)
+            except requests.HTTPError as e:
+                if e.response is None or e.response.status_code != 404:
+                    raise
+                if self.cache is not None:
+                    self.cache.pop(url, None)
+                payloads[repo_path] = None
+                continue
+            if response.status_code == 304:
+                payloads[repo_path] = known["payload"]
+                continue
+            payloads[repo_path] = response.json()
+            if self.cache is not None and response.headers.get("ETag"):
+                self.cache[url] = {"etag": response.headers["ETag"], "payload": payloads[repo_path]}
+        return payloads
+
+
+ADAPTER_CLASSES = {"gitlab": GitLabAdapter, "gitea": GiteaAdapter}
+
+# Access tokens of the well-known hosts, read from the environment
+TOKEN_ENVVARS = {"gitlab.com": "GITLAB_API_KEY", "codeberg.org": "CODEBERG_API_KEY"}
+
+
+def transform_gitlab_project(project, fetched_at=None):
+    """Map a GitLab GraphQL project node onto the columns of projects.csv."""
+    languages = sorted(project.get("languages") or [], key=lambda language: language.get("share") or 0, reverse=True)
+    namespace = project.get("namespace") or {}
+    group = project.get("group") or {}
+    return {
+        "git_namespace": namespace.get("fullPath"),
+        "topics": ",".join(project.get("topics") or []),
+        "last_commit_date": project.get("lastActivityAt"),
+        "stargazers_count": project.get("starCount"),
+        "dominating_language": languages[0]["name"] if languages else None,
+        "languages": ",".join(language["name"] for language in languages),
+        "project_created": project.get("createdAt"),
+        "project_age_in_days": _age_in_days(project.get("createdAt"), fetched_at),
+        "open_issues": project.get("openIssuesCount"),
+        "project_active": not project.get("archived"),
+        "organization": group.get("fullName"),
+        "organization_name": group.get("fullName"),
+        "organization_user_name": namespace.get("fullPath", "").split("/")[0] if group else None,
+        "organization_github_url": group.get("webUrl"),
+        "organization_avatar": group.get("avatarUrl"),
+    }
+
+
+def transform_gitea_repo(repo, fetched_at=None):
+    """Map a Gitea/Forgejo repository payload onto the columns of projects.csv."""
+    owner = repo.get("owner") or {}
+    return {
+        "git_namespace": owner.get("login"),
+        "topics": ",".join(repo.get("topics") or []),
+        "last_commit_date": repo.get("updated_at"),
+        "stargazers_count": repo.get("stars_count"),
+        "dominating_language": repo.get("language") or None,
+        "homepage": repo.get("website") or None,
+        "project_created": repo.get("created_at"),
+        "project_age_in_days": _age_in_days(repo.get("created_at"), fetched_at),
+        "open_issues": repo.get("open_issues_count"),
+        "project_active": not repo.get("archived"),
+    }
+
+
+PAYLOAD_TRANSFORMS = {"gitlab": transform_gitlab_project, "gitea": transform_gitea_repo}
+
+
+def transform_forge_payload(forge_payload, fetched_at=None):
+    """Map a stored ``{"kind", "project"}`` forge payload onto the columns of projects.csv."""
+    transform = PAYLOAD_TRANSFORMS.get(forge_payload.get("kind"))
+    if not transform or not forge_payload.get("project"):
+        return {}
+    return transform(forge_payload["project"], fetched_at)
+
+
+class ForgeResult:
+    """Payload of a queued repository, fetched with its batch on first access."""
+
+    def __init__(self, batcher, platform, repo_path):
+        self.batcher = batcher
+        self.platform = platform
+        self.repo_path = repo_path
+        self.payload = None
+        self.error = None
+        self.done = False
+
+    def result(self):
+        if not self.done:
+            self.batcher.flush(self.platform)
+        if self.error:
+            raise self.error
+        return self.payload
+
+
+class ForgeBatcher:
+    """
+    Queue lookups per forge and fetch them in batches.
+
+    Args:
+        forges: Mapping of instances (see ``forge_instance``) to forge kinds, merged into
+            ``DEFAULT_FORGES``
+        tokens: Mapping of platforms to access tokens; tokens of the well-known hosts
+            default to their ``TOKEN_ENVVARS`` environment variable
+        client: ``HttpClient`` shared by the adapters; one is created (and closed) otherwise
+        cache_path: File where REST payloads are cached with their ETag between runs
+
+    Attributes:
+        forges: Mapping of platforms to forge kinds, to pass to ``canonicalize_repo_url``
+            and ``entry_key`` so that URLs of the instances are recognized
+    """
+
+    def __init__(self, forges=None, tokens=None, client=None, cache_path=None):
+        self.forges = {}
+        self.base_urls = {}
+        for instance, kind in dict(DEFAULT_FORGES, **(forges or {})).items():
+            if kind not in ADAPTER_CLASSES:
+                raise ValueError(f"Unknown forge kind '{kind}' for {instance} (expected one of {', '.join(ADAPTER_CLASSES)})")
+            platform, base_url = forge_instance(instance)
+            self.forges[platform] = kind
+            self.base_urls[platform] = base_url
+        self.tokens = {host: os.getenv(envvar) for host, envvar in TOKEN_ENVVARS.items()}
+        self.tokens.update(tokens or {})
+        self.owns_client = client is None
+        self.client = client or HttpClient()
+        self.limiters = {}
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.cache = {}
+        if self.cache_path and self.cache_path.exists():
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                self.cache = json.load(f)
+        self.adapters = {}
+        self.queued = {}
+        # Payloads fetched during this run, per platform: a repository is looked up once
+        self.fetched = {}
+
+    @property
+    def batch_size(self):
+        return max((ADAPTER_CLASSES[kind].batch_size for kind in self.forges.values()), default=1)
+
+    def supports(self, platform):
+        return platform in self.forges
+
+    def adapter(self, platform):
+        if platform not in self.adapters:
+            adapter_class = ADAPTER_CLASSES[self.forges[platform]]
+            base_url = self.base_urls[platform]
+            host = urlparse(base_url).netloc.lower()
+            if host not in self.limiters:
+                self.limiters[host] = RateLimiter(HOST_RATE, HOST_PERIOD)
+            self.adapters[platform] = adapter_class(
+                base_url, token=self.tokens.get(platform), client=self.client, limiter=self.limiters[host],
+                cache=self.cache,
+            )
+        return self.adapters[platform]
+
+    def clone_url(self, platform, repo_path):
+        return f"{self.base_urls[platform]}/{repo_path}.git"
+
+    def submit(self, platform, repo_path):
+        """Queue a repository; its batch is sent once full or when a result is needed."""
+        result = ForgeResult(self, platform, repo_path)
+        queue = self.queued.setdefault(platform, [])
+        queue.append(result)
+        if len(queue) >= self.adapter(platform).batch_size:
+            self.flush(platform)
+        return result
+
+    def flush(self, platform):
+        queue = self.queued.pop(platform, [])
+        if not queue:
+            return
+        adapter = self.adapter(platform)
+        fetched = self.fetched.setdefault(platform, {})
+        missing = [repo_path for repo_path in dict.fromkeys(result.repo_path for result in queue)
+                   if repo_path not in fetched]
+        error = None
+        if missing:
+            try:
+                fetched.update(adapter.fetch(missing))
+            except Exception as e:
+                error = e
+        for result in queue:
+            project = fetched.get(result.repo_path)
+            if result.repo_path not in fetched:
+                result.error = error or LookupError(f"Project {result.repo_path} not fetched from {platform}")
+            elif project is None:
+                result.error = LookupError(f"Project {result.repo_path} not found on {platform}")
+            else:
+                result.payload = {"kind": adapter.kind, "project": project}
+            result.done = True
+
+    def save(self):
+        if not self.cache_path:
+            return
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.cache_path, "w", encoding="utf-8") as f:
+            json.dump(self.cache, f, indent=2, sort_keys=True)
+
+    def close(self):
+        self.save()
+        for adapter in self.adapters.values():
+            adapter.close()
+        if self.owns_client:
+            self.client.close()
@@ -6,15 +6,43 @@ import base64
 import logging
 import requests
 import urllib.parse
-from bs4 import BeautifulSoup
 from urllib.parse import urlparse
 from pathlib import Path
 from rich.console import Console
 from datetime import datetime
 from khc_cli.awesomecure.awesome2py import AwesomeList
+from khc_cli.utils.scraping import parse_dependents_page, find_readme_container
 console = Console()
 LOGGER = logging.getLogger(__name__)
 
+# Schéma des fichiers CSV produits par le pipeline ETL
+CSV_FIELDNAMES = [
+    "project_name", "oneliner", "git_namespace", "git_url", "platform",
+    "topics", "rubric", "last_commit_date", "stargazers_count",
+    "number_of_dependents", "stars_last_year", "project_active",
+    "dominating_language", "organization", "organization_user_name",
+    "languages", "homepage", "readme_content", "refs", "project_created",
+    "project_age_in_days", "license", "total_commits_last_year",
+    "total_number_of_commits", "last_issue_closed", "open_issues",
+    "closed_pullrequests", "closed_issues", "issues_closed_last_year",
+    "days_until_last_issue_closed", "open_pullrequests", "reviews_per_pr",
+    "development_distribution_score", "last_released_date",
+    "last_release_tag_name", "good_first_issue", "contributors",
+    "accepts_donations", "donation_platforms", "code_of_conduct",
+    "contribution_guide", "dependents_repos", "organization_name",
+    "organization_github_url", "organization_website",
+    "organization_location", "organization_country", "organization_form",
+    "organization_avatar", "organization_public_repos",
+    "organization_created", "organization_last_update",
+]
+
+CSV_GITHUB_ORGANIZATIONS_FIELDNAMES = [
+    "organization_name", "organization_user_name", "organization_github_url",
+    "organization_website", "organization_location", "organization_country",
+    "organization_form", "organization_avatar", "organization_public_repos",
+    "organization_created", "organization_last_update", "organization_rubric"
+]
+
 def countdown(t):
     """Compte à rebours visuel dans la console."""
     while t:
@@ -34,17 +62,8 @@ def crawl_github_dependents(repo, page_num):
     for i in range(page_num):
         try:
             r = requests.get(url)
-            soup = BeautifulSoup(r.content, "html.parser")
-
-            page_data = []
-            for t in soup.findAll("div", {"class": "Box-row"}):
-                repo_owner_elem = t.find('a', {"data-repository-hovercards-enabled":""})
-                repo_name_elem = t.find('a', {"data-hovercard-type":"repository"})
-                
-                # Vérifier que les deux éléments existent avant d'accéder à leur attribut text
-                if repo_owner_elem and repo_name_elem:
-                    dependent = "{}/{}".format(repo_owner_elem.text, repo_name_elem.text)
-                    page_data.append(dependent)
+            # Analyse ciblée: seuls les blocs Box-row et paginate-container sont construits
+            page_data, next_url = parse_dependents_page(r.content)
             
             for dependent in page_data:
                 if dependent in dependents_data:
@@ -56,31 +75,9 @@ def crawl_github_dependents(repo, page_num):
                 dependents_data.extend(page_data)
             
             # Traitement de la pagination
-            paginationContainer = None
-            try:
-                pagination_div = soup.find("div", {"class":"paginate-container"})
-                if pagination_div:
-                    paginationContainer = pagination_div.find_all('a')
-            except Exception as e:
-                LOGGER.debug(f"Erreur lors de la récupération de la pagination: {e}")
-                break
-            
-            if not paginationContainer:
-                break
-                
-            try:
-                if len(paginationContainer) > 1:
-                    paginationContainer = paginationContainer[1]
-                else:
-                    paginationContainer = paginationContainer[0]
-            except Exception as e:
-                LOGGER.debug(f"Erreur lors du traitement de la pagination: {e}")
-                break
-            
-            if paginationContainer and "href" in paginationContainer.attrs:
-                url = paginationContainer["href"]
-            else:
+            if not next_url:
                 break
+            url = next_url
                 
         except Exception as e:
             LOGGER.warning(f"Erreur lors de la récupération des dépendants pour {repo}: {e}")
@@ -88,8 +85,11 @@ def crawl_github_dependents(repo, page_num):
         
     return dependents_data
 
-def fetch_awesome_readme_content(github_client, awesome_repo_path, readme_filename, local_readme_path):
-    """Récupère le contenu du README d'une liste Awesome."""
+def fetch_awesome_readme_content(github_client, awesome_repo_path, readme_filename, local_readme_path, lazy=False):
+    """Récupère le contenu du README d'une liste Awesome.
+
+    Avec ``lazy=True``, la liste retournée n'est analysée qu'au fil de ``iter_entries()``.
+    """
     
     awesome_repo = github_client.get_repo(awesome_repo_path)
     if not awesome_repo:
@@ -169,12 +169,11 @@ def fetch_awesome_readme_content(github_client, awesome_repo_path, readme_filena
             response = requests.get(html_url, headers=headers)
             
             if response.status_code == 200:
-                soup = BeautifulSoup(response.content, "html.parser")
-                
-                # Différentes tentatives pour extraire le contenu du README
-                readme_div = soup.find("div", {"id": "readme"})
+                # Analyse ciblée des seuls conteneurs du README
+                container_kind, container = find_readme_container(response.content)
                 
-                if readme_div:
+                if container_kind == "readme":
+                    readme_div = container
                     # Tentative 1: Chercher l'article dans le div readme
                     readme_content = readme_div.find("article")
                     
@@ -203,19 +202,15 @@ def fetch_awesome_readme_content(github_client, awesome_repo_path, readme_filena
                     # Tentative 3: Chercher le contenu du markdown principal
                     LOGGER.warning("Division du README non trouvée, recherche d'alternatives...")
                     
-                    # Essayer de trouver le contenu Markdown dans un autre élément
-                    markdown_container = soup.find("div", {"class": "markdown-body"})
-                    if markdown_container:
+                    if container_kind == "markdown-body":
                         LOGGER.info("Contenu Markdown trouvé dans un conteneur alternatif")
-                        awesome_content = str(markdown_container).encode('utf-8')
-                    else:
+                        awesome_content = str(container).encode('utf-8')
+                    elif container_kind == "main":
                         # Dernier recours: prendre le contenu du body principal
-                        main_content = soup.find("main", {"id": "js-repo-pjax-container"})
-                        if main_content:
-                            LOGGER.info("Utilisation du contenu principal de la page")
-                            awesome_content = str(main_content).encode('utf-8')
-                        else:
-                            LOGGER.warning("Aucun conteneur de contenu trouvé")
+                        LOGGER.info("Utilisation du contenu principal de la page")
+                        awesome_content = str(container).encode('utf-8')
+                    else:
+                        LOGGER.warning("Aucun conteneur de contenu trouvé")
                 
                 if awesome_content:
                     LOGGER.info("Contenu récupéré avec succès via le HTML de la page GitHub")
@@ -254,7 +249,7 @@ def fetch_awesome_readme_content(github_client, awesome_repo_path, readme_filena
     with open(local_readme_path, "w", encoding="utf-8") as filehandle:
         filehandle.write(awesome_content.decode("utf-8", errors="replace"))
     LOGGER.info(f"Awesome README saved to {local_readme_path}")
-    return AwesomeList(str(local_readme_path))
+    return AwesomeList(str(local_readme_path), lazy=lazy)
 
 def initialize_csv_writers(projects_csv_path, orgs_csv_path):
     """Initialise les écrivains CSV pour les projets et les organisations."""
@@ -267,35 +262,8 @@ def initialize_csv_writers(projects_csv_path, orgs_csv_path):
     projects_csv_path.parent.mkdir(parents=True, exist_ok=True)
     orgs_csv_path.parent.mkdir(parents=True, exist_ok=True)
 
-    csv_fieldnames = [
-        "project_name", "oneliner", "git_namespace", "git_url", "platform",
-        "topics", "rubric", "last_commit_date", "stargazers_count",
-        "number_of_dependents", "stars_last_year", "project_active",
-        "dominating_language", "organization", "organization_user_name",
-        "languages", "homepage", "readme_content", "refs", "project_created",
-        "project_age_in_days", "license", "total_commits_last_year",
-        "total_number_of_commits", "last_issue_closed", "open_issues",
-        "closed_pullrequests", "closed_issues", "issues_closed_last_year",
-        "days_until_last_issue_closed", "open_pullrequests", "reviews_per_pr",
-        "development_distribution_score", "last_released_date",
-        "last_release_tag_name", "good_first_issue", "contributors",
-        "accepts_donations", "donation_platforms", "code_of_conduct",
-        "contribution_guide", "dependents_repos", "organization_name",
-        "organization_github_url", "organization_website",
-        "organization_location", "organization_country", "organization_form",
-        "organization_avatar", "organization_public_repos",
-        "organization_created", "organization_last_update",
-    ]
-
-    csv_github_organizations_fieldnames = [
-        "organization_name", "organization_user_name", "organization_github_url",
-        "organization_website", "organization_location", "organization_country",
-        "organization_form", "organization_avatar", "organization_public_repos",
-        "organization_created", "organization_last_update", "organization_rubric"
-    ]
-
     csv_projects_file = open(projects_csv_path, "w", newline="", encoding="utf-8")
-    writer_projects = csv.DictWriter(csv_projects_file, fieldnames=csv_fieldnames)
+    writer_projects = csv.DictWriter(csv_projects_file, fieldnames=CSV_FIELDNAMES)
     writer_projects.writeheader()
 
     existing_orgs = set()
@@ -307,7 +275,7 @@ def initialize_csv_writers(projects_csv_path, orgs_csv_path):
                     existing_orgs.add(entry['organization_user_name'])
 
     csv_orgs_file = open(orgs_csv_path, "a", newline="", encoding="utf-8")
-    writer_github_organizations = csv.DictWriter(csv_orgs_file, fieldnames=csv_github_organizations_fieldnames)
+    writer_github_organizations = csv.DictWriter(csv_orgs_file, fieldnames=CSV_GITHUB_ORGANIZATIONS_FIELDNAMES)
     # Write header only if file is new/empty
     if orgs_csv_path.stat().st_size == 0:
         writer_github_organizations.writeheader()
@@ -0,0 +1,134 @@
+"""Shared HTTP transport for the REST and GraphQL APIs of code hosting platforms.
+
+A ``HttpClient`` keeps a pooled ``requests`` session so that concurrent calls
+reuse their TCP/TLS connections, throttles calls through an optional
+``RateLimiter`` and waits for the reset of the rate limit when a platform
+answers 403/429 because it was exhausted.
+"""
+
+import logging
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+LOGGER = logging.getLogger(__name__)
+
+# Answers worth retrying after a pause
+RETRY_STATUS = {429, 502, 503, 504}
+
+
+class RateLimiter:
+    """Thread-safe token bucket allowing ``rate`` calls per ``period`` seconds."""
+
+    def __init__(self, rate, period=60.0):
+        self.rate = rate
+        self.period = period
+        self.tokens = float(rate)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate / self.period)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) * self.period / self.rate
+            time.sleep(wait)
+
+    def drain(self, until):
+        """Block the bucket until the ``until`` timestamp, after an exhausted rate limit."""
+        with self.lock:
+            self.tokens = -self.rate * max(until - time.time(), 0) / self.period
+
+
+class HttpClient:
+    """
+    Pooled HTTP session.
+
+    Args:
+        headers: Headers sent with every request (authentication, API version...)
+        pool_size: Maximum number of connections kept open per host
+        max_retries: Number of retries of throttled or failed requests
+        timeout: Timeout of each request, in seconds
+    """
+
+    def __init__(self, headers=None, pool_size=8, max_retries=3, timeout=30):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update(headers or {})
+        self.max_retries = max_retries
+        self.timeout = timeout
+
+    def request(self, method, url, limiter=None, **kwargs):
+        """
+        Send a request, throttled by ``limiter`` and retried while the platform throttles it.
+
+        Returns:
+            The ``requests.Response``; 304 answers to conditional requests are returned as is.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        for attempt in range(self.max_retries + 1):
+            if limiter:
+                limiter.acquire()
+            response = self.session.request(method, url, **kwargs)
+            wait = _throttle_delay(response)
+            if wait is None or attempt == self.max_retries:
+                break
+            LOGGER.warning(f"{url} throttled ({response.status_code}), retrying in {wait:.0f}s")
+            if limiter:
+                limiter.drain(time.time() + wait)
+            else:
+                time.sleep(wait)
+        response.raise_for_status()
+        return response
+
+    def get_json(self, url, params=None, limiter=None, headers=None):
+        return self.request("GET", url, limiter=limiter, params=params, headers=headers).json()
+
+    def graphql(self, url, query, variables=None, limiter=None, headers=None):
+        """
+        Run a GraphQL query.
+
+        Raises:
+            RuntimeError: When the answer only contains errors
+        """
+        body = self.request(
+            "POST", url, limiter=limiter, headers=headers, json={"query": query, "variables": variables or {}}
+        ).json()
+        if body.get("errors") and not body.get("data"):
+            raise RuntimeError("; ".join(error.get("message", str(error)) for error in body["errors"]))
+        for error in body.get("errors") or []:
+            LOGGER.warning(f"GraphQL partial error: {error.get('message', error)}")
+        return body.get("data") or {}
+
+    def close(self):
+        self.session.close()
+
+
+def _throttle_delay(response):
+    """Return the number of seconds to wait before retrying ``response``, or None."""
+    retry_after = response.headers.get("Retry-After")
+    if response.status_code in (403, 429) and response.headers.get("X-RateLimit-Remaining") == "0":
+        reset = response.headers.get("X-RateLimit-Reset")
+        if reset:
+            return max(float(reset) - time.time(), 0) + 1
+    if response.status_code in (403, 429) and retry_after:
+        return float(retry_after)
+    if response.status_code in RETRY_STATUS:
+        return float(retry_after) if retry_after else 5.0
+    return None
+
+
+def github_headers(token=None):
+    headers = {"Accept": "application/vnd.github+json", "X-GitHub-Api-Version": "2022-11-28"}
+    if token:
+        headers["Authorization"] = f"token {token}"
+    return headers
@@ -0,0 +1,214 @@
+"""Issue and pull request metrics from count-only GraphQL queries.
+
+Paging through the issues of a large project costs one request per hundred
+issues. The counts of ``projects.csv`` only need ``totalCount`` (connections)
+and ``issueCount`` (searches), so each metric costs the same whatever the size
+of the project, and one GraphQL query carries the metrics of a batch of
+repositories, one aliased ``repository`` field per repository.
+
+Every query also asks for its ``rateLimit``: the cost and remaining points are
+accounted for, and the batcher waits for the reset of the GraphQL bucket
+instead of letting queries fail. The measured cost per query is saved for the
+cost planner.
+
+Issues cannot be ordered by closing date: the date of the last closed issue is
+the latest ``closedAt`` of the most recently updated closed issues. An issue is
+updated when it is closed, so the result is exact unless more than
+``LAST_CLOSED_SAMPLE`` closed issues were updated after the last closing.
+"""
+
+import json
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from khc_cli.utils.forges import ForgeResult
+from khc_cli.utils.http import HttpClient, RateLimiter, github_headers
+
+LOGGER = logging.getLogger(__name__)
+
+GRAPHQL_URL = "https://api.github.com/graphql"
+# Repositories per query; each one adds seven count-only fields and its latest release
+BATCH_SIZE = 20
+GOOD_FIRST_ISSUE_LABELS = ["good first issue", "good-first-issue", "Good First Issue"]
+# Most recently updated closed issues among which the last closing date is taken
+LAST_CLOSED_SAMPLE = 10
+
+REPOSITORY_FIELDS = """
+    openIssues: issues(states: OPEN) { totalCount }
+    closedIssues: issues(states: CLOSED) { totalCount }
+    openPullRequests: pullRequests(states: OPEN) { totalCount }
+    closedPullRequests: pullRequests(states: [CLOSED, MERGED]) { totalCount }
+    goodFirstIssues: issues(states: OPEN, labels: %s) { totalCount }
+    lastClosed: issues(states: CLOSED, first: %d, orderBy: {field: UPDATED_AT, direction: DESC}) { nodes { closedAt } }
+    latestRelease { tagName publishedAt }
+"""
+
+
+def build_query(repo_paths, since):
+    """
+    Build the GraphQL query of a batch of repositories.
+
+    Args:
+        repo_paths: Repository paths in the owner/repo format
+        since: Date from which closed issues are counted in ``issues_closed_last_year``
+    """
+    fields = REPOSITORY_FIELDS % (json.dumps(GOOD_FIRST_ISSUE_LABELS), LAST_CLOSED_SAMPLE)
+    parts = []
+    for i, repo_path in enumerate(repo_paths):
+        owner, name = repo_path.split("/", 1)
+        search = f"repo:{repo_path} is:issue is:closed closed:>={since:%Y-%m-%d}"
+        parts.append(
+            f"r{i}: repository(owner: {json.dumps(owner)}, name: {json.dumps(name)}) {{{fields}}}\n"
+            f"s{i}: search(query: {json.dumps(search)}, type: ISSUE, first: 1) {{ issueCount }}"
+        )
+    return "query {\n  rateLimit { cost remaining resetAt }\n  " + "\n  ".join(parts) + "\n}"
+
+
+def transform_issue_metrics(metrics, fetched_at=None):
+    """Map the raw metrics of a repository onto the columns of projects.csv."""
+    if not metrics:
+        return {}
+    last_closed = metrics.get("last_issue_closed")
+    days_since = None
+    if last_closed:
+        reference_date = (
+            datetime.fromisoformat(fetched_at.replace("Z", "+00:00")) if fetched_at else datetime.now(timezone.utc)
+        )
+        days_since = (reference_date - datetime.fromisoformat(last_closed.replace("Z", "+00:00"))).days
+    return {
+        "open_issues": metrics.get("open_issues"),
+        "closed_issues": metrics.get("closed_issues"),
+        "issues_closed_last_year": metrics.get("issues_closed_last_year"),
+        "open_pullrequests": metrics.get("open_pullrequests"),
+        "closed_pullrequests": metrics.get("closed_pullrequests"),
+        "good_first_issue": metrics.get("good_first_issue"),
+        "last_issue_closed": last_closed,
+        "days_until_last_issue_closed": days_since,
+        "last_release_tag_name": metrics.get("last_release_tag_name"),
+        "last_released_date": metrics.get("last_released_date"),
+    }
+
+
+def _count(node, field):
+    return ((node or {}).get(field) or {}).get("totalCount")
+
+
+def _last_closed(node):
+    closed = [issue["closedAt"] for issue in ((node or {}).get("lastClosed") or {}).get("nodes") or []
+              if issue and issue.get("closedAt")]
+    # ISO 8601 dates in UTC sort chronologically as strings
+    return max(closed, default=None)
+
+
+def load_query_stats(path):
+    """Return the GraphQL stats saved by the last run (``queries``, ``cost``...), or None."""
+    path = Path(path) if path else None
+    if not path or not path.exists():
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        LOGGER.warning(f"Cannot read GraphQL stats {path}: {e}")
+        return None
+
+
+class IssueMetricsBatcher:
+    """
+    Queue repositories and fetch their issue metrics in batched GraphQL queries.
+
+    Args:
+        github_api_key: GitHub API key (GraphQL requires authentication)
+        batch_size: Repositories per query
+        min_remaining: GraphQL points kept in reserve before waiting for the reset
+        stats_path: File where the query count and measured cost are saved on close
+    """
+
+    def __init__(self, github_api_key, batch_size=BATCH_SIZE, min_remaining=50, stats_path=None):
+        self.batch_size = batch_size
+        self.min_remaining = min_remaining
+        self.stats_path = Path(stats_path) if stats_path else None
+        self.client = HttpClient(github_headers(github_api_key))
+        # Bursts of queries are spread out, the hourly budget is tracked from rateLimit
+        self.limiter = RateLimiter(60, 60)
+        self.queued = []
+        self.stats = {"queries": 0, "repositories": 0, "cost": 0, "remaining": None}
+
+    def submit(self, repo_path):
+        result = ForgeResult(self, "github.com", repo_path)
+        self.queued.append(result)
+        if len(self.queued) >= self.batch_size:
+            self.flush()
+        return result
+
+    def flush(self, platform=None):
+        queue, self.queued = self.queued, []
+        if not queue:
+            return
+        repo_paths = list(dict.fromkeys(result.repo_path for result in queue))
+        try:
+            metrics = self.fetch(repo_paths)
+        except Exception as e:
+            metrics, error = {}, e
+        else:
+            error = None
+        for result in queue:
+            if error:
+                result.error = error
+            elif metrics.get(result.repo_path) is None:
+                result.error = LookupError(f"No issue metrics for {result.repo_path}")
+            else:
+                result.payload = metrics[result.repo_path]
+            result.done = True
+
+    def fetch(self, repo_paths):
+        """Return the raw metrics of each repository (None for repositories not found)."""
+        since = datetime.now(timezone.utc) - timedelta(days=365)
+        data = self.client.graphql(GRAPHQL_URL, build_query(repo_paths, since), limiter=self.limiter)
+        self._account(data.get("rateLimit"))
+        self.stats["queries"] += 1
+
+        metrics = {}
+        for i, repo_path in enumerate(repo_paths):
+            node = data.get(f"r{i}")
+            if node is None:
+                metrics[repo_path] = None
+                continue
+            metrics[repo_path] = {
+                "open_issues": _count(node, "openIssues"),
+                "closed_issues": _count(node, "closedIssues"),
+                "open_pullrequests": _count(node, "openPullRequests"),
+                "closed_pullrequests": _count(node, "closedPullRequests"),
+                "good_first_issue": _count(node, "goodFirstIssues"),
+                "issues_closed_last_year": (data.get(f"s{i}") or {}).get("issueCount"),
+                "last_issue_closed": _last_closed(node),
+                "last_release_tag_name": (node.get("latestRelease") or {}).get("tagName"),
+                "last_released_date": (node.get("latestRelease") or {}).get("publishedAt"),
+            }
+            self.stats["repositories"] += 1
+        return metrics
+
+    def _account(self, rate_limit):
+        if not rate_limit:
+            return
+        self.stats["cost"] += rate_limit.get("cost") or 0
+        self.stats["remaining"] = rate_limit.get("remaining")
+        remaining = rate_limit.get("remaining")
+        if remaining is not None and remaining < self.min_remaining and rate_limit.get("resetAt"):
+            reset = datetime.fromisoformat(rate_limit["resetAt"].replace("Z", "+00:00")).timestamp()
+            LOGGER.warning(f"GraphQL rate limit almost exhausted ({remaining} points left), "
+                           f"waiting {max(reset - time.time(), 0):.0f}s for its reset")
+            self.limiter.drain(reset + 1)
+
+    def save_stats(self):
+        if not self.stats_path or not self.stats["queries"]:
+            return
+        self.stats_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.stats_path, "w", encoding="utf-8") as f:
+            json.dump(dict(self.stats, batch_size=self.batch_size), f, indent=2)
+
+    def close(self):
+        self.save_stats()
+        self.client.close()
@@ -0,0 +1,177 @@
+"""Near-duplicate detection of list entries with MinHash and locality-sensitive hashing.
+
+Each entry is reduced to a set of features (word shingles of its normalized text,
+its name and its canonical repository). MinHash signatures estimate the Jaccard
+similarity of these sets, and LSH banding only compares entries sharing at least
+one band, which keeps the search sub-quadratic. Signatures are cached on disk,
+keyed by the hash of the entry features, so repeated runs only hash new entries.
+"""
+
+import hashlib
+import json
+import logging
+import re
+from collections import defaultdict
+from pathlib import Path
+
+from khc_cli.utils.canonical import canonicalize_repo_url
+
+LOGGER = logging.getLogger(__name__)
+
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+SHINGLE_SIZE = 3
+WORD = re.compile(r"[a-z0-9]+")
+
+
+def normalize_text(text):
+    """Lower-case the text and keep only its alphanumeric words."""
+    return WORD.findall(text.lower())
+
+
+def entry_features(name, text, url):
+    """Return the feature set of an entry."""
+    words = normalize_text(text)
+    features = {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(max(len(words) - SHINGLE_SIZE + 1, 1))}
+    features.add("name:" + " ".join(normalize_text(name)))
+    platform, repo_path = canonicalize_repo_url(url)
+    if repo_path:
+        features.add(f"repo:{platform}/{repo_path}")
+        features.add("repo-name:" + repo_path.split("/")[-1])
+    else:
+        features.add("url:" + url.strip().lower().rstrip("/"))
+    features.discard("")
+    return features
+
+
+def _hash_feature(feature):
+    return int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=4).digest(), "big")
+
+
+class MinHasher:
+    """Computes MinHash signatures with ``num_perm`` universal hash permutations."""
+
+    def __init__(self, num_perm=64, seed=1):
+        self.num_perm = num_perm
+        self.seed = seed
+        permutations = []
+        state = seed
+        for _ in range(num_perm):
+            state = (state * 6364136223846793005 + 1442695040888963407) % (1 << 64)
+            a = state % (MERSENNE_PRIME - 1) + 1
+            state = (state * 6364136223846793005 + 1442695040888963407) % (1 << 64)
+            b = state % MERSENNE_PRIME
+            permutations.append((a, b))
+        self.permutations = permutations
+
+    def signature(self, features):
+        hashes = [_hash_feature(feature) for feature in features]
+        return [
+            min(((a * h + b) % MERSENNE_PRIME) & MAX_HASH for h in hashes)
+            for a, b in self.permutations
+        ]
+
+
+def estimated_similarity(signature_a, signature_b):
+    """Estimate the Jaccard similarity of two sets from their signatures."""
+    equal = sum(1 for x, y in zip(signature_a, signature_b) if x == y)
+    return equal / len(signature_a)
+
+
+class SignatureIndex:
+    """On-disk cache of MinHash signatures, keyed by the hash of the entry features."""
+
+    def __init__(self, path, hasher):
+        self.path = Path(path) if path else None
+        self.hasher = hasher
+        self.params = {"num_perm": hasher.num_perm, "seed": hasher.seed, "shingle_size": SHINGLE_SIZE}
+        self.signatures = {}
+        self.hashed = 0
+        if self.path and self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("params") == self.params:
+                self.signatures = data.get("signatures", {})
+
+    def get(self, features):
+        key = hashlib.sha1("\n".join(sorted(features)).encode("utf-8")).hexdigest()
+        if key not in self.signatures:
+            self.signatures[key] = self.hasher.signature(features)
+            self.hashed += 1
+        return key, self.signatures[key]
+
+    def save(self, used_keys=None):
+        if not self.path:
+            return
+        signatures = self.signatures
+        if used_keys is not None:
+            # Forget the signatures of entries removed from the list
+            signatures = {key: value for key, value in signatures.items() if key in used_keys}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump({"params": self.params, "signatures": signatures}, f)
+
+
+def find_duplicate_clusters(entries, threshold=0.5, bands=16, index_path=None, num_perm=64):
+    """
+    Report clusters of duplicate or near-duplicate entries.
+
+    Args:
+        entries: List of dicts with ``name``, ``text``, ``url`` and ``rubric``
+        threshold: Minimum estimated Jaccard similarity of two entries of a cluster
+        bands: Number of LSH bands; ``num_perm`` must be a multiple of it
+        index_path: Path of the on-disk signature index
+        num_perm: Number of MinHash permutations
+
+    Returns:
+        Tuple ``(clusters, stats)``: lists of entry indexes sorted by size, and the number
+        of ``hashed`` and ``candidate_pairs`` for reporting.
+    """
+    if num_perm % bands:
+        raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+    rows = num_perm // bands
+    index = SignatureIndex(index_path, MinHasher(num_perm))
+
+    signatures = []
+    used_keys = set()
+    buckets = defaultdict(list)
+    for i, entry in enumerate(entries):
+        key, signature = index.get(entry_features(entry["name"], entry["text"], entry["url"]))
+        used_keys.add(key)
+        signatures.append(signature)
+        for band in range(bands):
+            buckets[(band, tuple(signature[band * rows:(band + 1) * rows]))].append(i)
+    index.save(used_keys)
+
+    parent = list(range(len(entries)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    # Entries pointing to the same repository are duplicates whatever their text
+    by_repo = defaultdict(list)
+    for i, entry in enumerate(entries):
+        platform, repo_path = canonicalize_repo_url(entry["url"])
+        if repo_path:
+            by_repo[(platform, repo_path)].append(i)
+    for members in by_repo.values():
+        for j in members[1:]:
+            parent[find(members[0])] = find(j)
+
+    candidates = set()
+    for members in buckets.values():
+        for position, i in enumerate(members):
+            for j in members[position + 1:]:
+                candidates.add((i, j))
+    for i, j in candidates:
+        if estimated_similarity(signatures[i], signatures[j]) >= threshold:
+            parent[find(i)] = find(j)
+
+    groups = defaultdict(list)
+    for i in range(len(entries)):
+        groups[find(i)].append(i)
+    clusters = sorted((members for members in groups.values() if len(members) > 1), key=len, reverse=True)
+    return clusters, {"hashed": index.hashed, "candidate_pairs": len(candidates)}
@@ -0,0 +1,204 @@
+"""Cost planner for ETL runs.
+
+Estimates, without enriching anything, how many requests an ``analyze etl`` run
+will send to each rate limit bucket (core REST, GraphQL, search, HTML scraping)
+and projects its wall-clock time for a number of tokens and parallel workers.
+The GraphQL bucket is counted in points, not requests: the cost per query
+measured by the previous run is used when it is known.
+"""
+
+import json
+import math
+from datetime import datetime
+from pathlib import Path
+
+from khc_cli.utils.canonical import canonicalize_repo_url, entry_key
+from khc_cli.utils.forges import ADAPTER_CLASSES, forge_platforms
+from khc_cli.utils.git_metrics import mirror_path
+from khc_cli.utils.readme_store import INDEX_NAME
+from khc_cli.utils.issue_metrics import BATCH_SIZE as ISSUE_BATCH_SIZE, load_query_stats
+
+# Hourly quota of one token per bucket, and length of the quota window in seconds
+BUCKET_LIMITS = {
+    "core": (5000, 3600),
+    "graphql": (5000, 3600),
+    "search": (30, 60),
+    "scrape": (None, None),
+}
+
+DEFAULT_LATENCY = 0.5
+# Points of one issue metrics query before any was measured (GitHub charges at least 1)
+ISSUE_QUERY_POINTS = 1.0
+CLONE_SECONDS = 20.0
+FETCH_SECONDS = 2.0
+
+
+def scan_entries(awesome_list, repo_index=None, forges=None):
+    """
+    Deduplicate the entries of a list the same way the ETL does.
+
+    Args:
+        awesome_list: Parsed list
+        repo_index: Index of renamed repositories
+        forges: Additional forge instances, as passed to ``run_etl_pipeline``
+
+    Returns:
+        Dict with the number of ``entries``, ``unique`` entries, unique ``github`` repository
+        paths, ``other`` (non GitHub) entries, distinct GitHub ``owners``, and the ``forges``
+        enriched by the ETL, as a mapping of platforms to their ``kind`` and entry ``keys``.
+    """
+    platforms = forge_platforms(forges)
+    seen = set()
+    github = []
+    forge_keys = {}
+    other = 0
+    entries = 0
+    for _, entry, _ in awesome_list.iter_entries():
+        entries += 1
+        key = entry_key(entry.url, repo_index, platforms)
+        if key.lower() in seen:
+            continue
+        seen.add(key.lower())
+        platform, repo_path = canonicalize_repo_url(entry.url, platforms)
+        if platform == "github.com" and repo_path:
+            github.append(key)
+            continue
+        other += 1
+        if platform in platforms and repo_path:
+            forge_keys.setdefault(platform, []).append(key)
+    return {
+        "entries": entries,
+        "unique": len(seen),
+        "github": github,
+        "other": other,
+        "owners": len({key.split("/")[0].lower() for key in github}),
+        "forges": {platform: {"kind": platforms[platform], "keys": keys} for platform, keys in forge_keys.items()},
+    }
+
+
+def estimate_stages(scan, readme_requests=2, git_cache_dir=None, readme_store_dir=None, issue_metrics=False,
+                    issue_stats_path=None):
+    """
+    Estimate the requests sent by each stage of the ETL.
+
+    Args:
+        scan: Result of ``scan_entries``
+        readme_requests: Requests needed to download the list itself (0 for a local file)
+        git_cache_dir: Cache of partial clones when commit metrics are computed locally
+        readme_store_dir: README blob store when project READMEs are fetched; READMEs it
+            already knows are fetched conditionally and do not count against the rate limit
+        issue_metrics: Whether issue and pull request counts are fetched, in batched GraphQL queries
+        issue_stats_path: GraphQL stats saved by the previous run, for the measured cost per query
+
+    Returns:
+        List of stage dicts with ``name``, ``bucket`` and ``requests`` (and ``cost`` in quota
+        units when it differs from the number of requests, ``seconds`` for stages that do
+        not hit the API).
+    """
+    github = scan["github"]
+    stages = [
+        {"name": "List README", "bucket": "core", "requests": readme_requests},
+        {"name": "Repository metadata", "bucket": "core", "requests": len(github)},
+        {"name": "Organizations (upper bound)", "bucket": "core", "requests": scan["owners"]},
+    ]
+    if readme_store_dir:
+        index_path = Path(readme_store_dir) / INDEX_NAME
+        known = set()
+        if index_path.exists():
+            with open(index_path, "r", encoding="utf-8") as f:
+                known = set(json.load(f))
+        stored = sum(1 for key in github if key.lower() in known)
+        stages.append({
+            "name": f"Project READMEs ({stored} conditional)",
+            "bucket": "core",
+            "requests": len(github) - stored,
+        })
+    if issue_metrics:
+        stats = load_query_stats(issue_stats_path) or {}
+        points, measured = ISSUE_QUERY_POINTS, False
+        if stats.get("queries") and stats.get("cost"):
+            points, measured = stats["cost"] / stats["queries"], True
+        queries = math.ceil(len(github) / ISSUE_BATCH_SIZE)
+        stages.append({
+            "name": f"Issue metrics (GraphQL, {ISSUE_BATCH_SIZE} repositories per query, "
+                    f"{points:g} points per query {'measured' if measured else 'estimated'})",
+            "bucket": "graphql",
+            "requests": queries,
+            "cost": math.ceil(queries * points),
+        })
+    # Other forges have no shared quota: each one is its own bucket
+    forge_repos = []
+    for platform, forge in scan.get("forges", {}).items():
+        batch_size = ADAPTER_CLASSES[forge["kind"]].batch_size
+        stages.append({
+            "name": f"Forge projects ({forge['kind']}, {len(forge['keys'])} projects, {batch_size} per request)",
+            "bucket": platform,
+            "requests": math.ceil(len(forge["keys"]) / batch_size),
+        })
+        forge_repos.extend(forge["keys"])
+    if git_cache_dir:
+        # Projects of other forges are cloned too
+        cloned = github + forge_repos
+        cached = sum(1 for key in cloned if (mirror_path(git_cache_dir, key) / "HEAD").exists())
+        stages.append({
+            "name": f"Commit metrics (git, {cached} cached clones)",
+            "bucket": "git",
+            "requests": 0,
+            "seconds": cached * FETCH_SECONDS + (len(cloned) - cached) * CLONE_SECONDS,
+        })
+    return stages
+
+
+def project_runtime(stages, rate_limits=None, tokens=1, concurrency=1, latency=DEFAULT_LATENCY, git_processes=4):
+    """
+    Project the wall-clock time of a run.
+
+    Args:
+        stages: Result of ``estimate_stages``
+        rate_limits: Live limits per bucket as returned by ``GitHubClient.get_rate_limits``
+            (for one token); the full quota is assumed when missing
+        tokens: Number of GitHub tokens sharing the work
+        concurrency: Number of parallel workers
+        latency: Mean duration of one request, in seconds
+        git_processes: Processes used by the git metrics engine
+
+    Returns:
+        Tuple ``(buckets, seconds)``: per bucket summaries and the projected total duration.
+        The quota is checked against the ``cost`` of each bucket, the duration of the
+        requests against their number.
+    """
+    rate_limits = rate_limits or {}
+    now = datetime.now()
+    buckets = {}
+    for stage in stages:
+        bucket = buckets.setdefault(stage["bucket"], {"requests": 0, "cost": 0, "seconds": 0.0})
+        bucket["requests"] += stage["requests"]
+        bucket["cost"] += stage.get("cost", stage["requests"])
+        bucket["seconds"] += stage.get("seconds", 0.0)
+
+    api_seconds = 0.0
+    git_seconds = 0.0
+    for name, bucket in buckets.items():
+        if name == "git":
+            # Clones run in their own process pool, alongside the API calls
+            bucket["seconds"] = bucket["seconds"] / max(git_processes, 1)
+            git_seconds = bucket["seconds"]
+            continue
+
+        limit, window = BUCKET_LIMITS.get(name, (None, None))
+        live = rate_limits.get(name)
+        bucket["limit"] = live["total"] if live else limit
+        bucket["remaining"] = live["remaining"] if live else limit
+        wait = 0.0
+        if limit and bucket["remaining"] is not None:
+            available = bucket["remaining"] * tokens
+            if bucket["cost"] > available:
+                # Requests beyond the remaining quota wait for the next windows
+                reset_in = (live["reset_time"] - now).total_seconds() if live else window
+                extra_windows = math.ceil((bucket["cost"] - available) / (bucket["limit"] * tokens))
+                wait = max(reset_in, 0) + (extra_windows - 1) * window
+        bucket["fits"] = wait == 0
+        bucket["wait"] = wait
+        bucket["seconds"] = max(bucket["requests"] * latency / max(concurrency, 1), wait)
+        api_seconds += bucket["seconds"]
+    return buckets, max(api_seconds, git_seconds)
@@ -0,0 +1,112 @@
+"""Profiling of CLI commands.
+
+Two profilers run together on the main thread:
+
+- ``cProfile`` gives exact call counts and times, saved as a pstats file;
+- a sampling thread records the main thread stack every few milliseconds, along
+  with the CPU time that thread consumed since the previous sample. Wall time not
+  spent on CPU is attributed to I/O wait (network, disk, sleeps, locks). Samples
+  are saved as collapsed stacks, the input format of flamegraph tools.
+"""
+
+import cProfile
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+from rich.table import Table
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f"{Path(code.co_filename).name}:{code.co_name}:{frame.f_lineno}"
+
+
+class CommandProfiler:
+    """Profile the main thread between ``start()`` and ``stop()``."""
+
+    def __init__(self, output_path, interval=0.005, top=20):
+        self.output_path = Path(output_path)
+        self.interval = interval
+        self.top = top
+        self.profile = cProfile.Profile()
+        self.stacks = Counter()
+        self.cpu_by_leaf = Counter()
+        self.wait_by_leaf = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+        self._main_ident = threading.main_thread().ident
+        self._cpu_clock = None
+        if hasattr(time, "pthread_getcpuclockid"):
+            try:
+                self._cpu_clock = time.pthread_getcpuclockid(self._main_ident)
+            except OSError:
+                self._cpu_clock = None
+
+    def _main_cpu_time(self):
+        if self._cpu_clock is not None:
+            return time.clock_gettime(self._cpu_clock)
+        return None
+
+    def _sample(self):
+        last_wall = time.perf_counter()
+        last_cpu = self._main_cpu_time()
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._main_ident)
+            wall = time.perf_counter()
+            cpu = self._main_cpu_time()
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            leaf = stack[0].rsplit(":", 1)[0]
+            self.stacks[";".join(reversed(stack))] += 1
+
+            elapsed = wall - last_wall
+            used = min(cpu - last_cpu, elapsed) if cpu is not None else 0.0
+            self.cpu_by_leaf[leaf] += used
+            self.wait_by_leaf[leaf] += elapsed - used
+            last_wall, last_cpu = wall, cpu
+
+    def start(self):
+        self._wall_start = time.perf_counter()
+        self._cpu_start = time.process_time()
+        self._thread = threading.Thread(target=self._sample, name="khc-profiler", daemon=True)
+        self._thread.start()
+        self.profile.enable()
+
+    def stop(self):
+        """Stop profiling and write ``<output>`` (pstats) and ``<output>.collapsed``."""
+        self.profile.disable()
+        self._stop.set()
+        self._thread.join()
+        self.wall = time.perf_counter() - self._wall_start
+        self.cpu = time.process_time() - self._cpu_start
+
+        self.output_path.parent.mkdir(parents=True, exist_ok=True)
+        self.profile.dump_stats(str(self.output_path))
+        with open(f"{self.output_path}.collapsed", "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+    def report(self, console):
+        """Print the top hotspots, split into CPU time and I/O wait."""
+        console.print(
+            f"[cyan]Profile: {self.wall:.2f}s wall, {self.cpu:.2f}s CPU, "
+            f"{max(self.wall - self.cpu, 0):.2f}s waiting (I/O, sleeps, locks)[/cyan]"
+        )
+        table = Table(title=f"Top {self.top} sampled hotspots (self time)")
+        table.add_column("Function", style="cyan")
+        table.add_column("CPU (s)", style="green")
+        table.add_column("I/O wait (s)", style="yellow")
+        hotspots = Counter({leaf: self.cpu_by_leaf[leaf] + self.wait_by_leaf[leaf] for leaf in self.cpu_by_leaf})
+        for leaf, _ in hotspots.most_common(self.top):
+            table.add_row(leaf, f"{self.cpu_by_leaf[leaf]:.3f}", f"{self.wait_by_leaf[leaf]:.3f}")
+        console.print(table)
+        if self._cpu_clock is None:
+            console.print("[yellow]Per thread CPU clocks are not available: sampled time is reported as I/O wait[/yellow]")
+        console.print(f"[cyan]pstats written to {self.output_path}, collapsed stacks to {self.output_path}.collapsed[/cyan]")
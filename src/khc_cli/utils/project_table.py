@@ -0,0 +1,186 @@
+"""Columnar view of the ETL outputs and vectorized aggregates over it.
+
+``projects.csv`` and ``github_organizations.csv`` are read once into typed NumPy
+columns; group-bys are computed with ``np.unique`` and ``np.bincount`` so reports
+stay fast on tens of thousands of rows.
+"""
+
+import csv
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+from khc_cli.utils.canonical import entry_key
+
+NUMERIC_COLUMNS = ["stargazers_count", "project_age_in_days", "open_issues", "total_commits_last_year", "contributors"]
+DATE_COLUMNS = ["last_commit_date", "project_created"]
+GROUP_COLUMNS = ["rubric", "organization_country", "dominating_language"]
+
+
+def _to_float(values):
+    column = np.full(len(values), np.nan)
+    for i, value in enumerate(values):
+        if value not in ("", None):
+            try:
+                column[i] = float(value)
+            except ValueError:
+                pass
+    return column
+
+
+def _to_datetime(values):
+    # ISO 8601 dates converted to UTC (dates without offset are read as UTC), to the second
+    column = np.full(len(values), np.datetime64("NaT"), dtype="datetime64[s]")
+    for i, value in enumerate(values):
+        if not value:
+            continue
+        try:
+            parsed = datetime.fromisoformat(value)
+        except ValueError:
+            continue
+        if parsed.tzinfo:
+            parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+        column[i] = np.datetime64(parsed.replace(microsecond=0), "s")
+    return column
+
+
+def load_project_table(projects_csv_path, orgs_csv_path=None):
+    """
+    Load the ETL outputs into typed columns.
+
+    Missing ``organization_country`` values of projects are filled from the organizations table.
+
+    Returns:
+        Dict mapping column names to NumPy arrays of the same length.
+    """
+    with open(projects_csv_path, "r", newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        rows = list(reader)
+    raw = {name: [row[i] if i < len(row) else "" for row in rows] for i, name in enumerate(header)}
+
+    if orgs_csv_path and Path(orgs_csv_path).exists() and "organization_user_name" in raw:
+        with open(orgs_csv_path, "r", newline="", encoding="utf-8") as f:
+            countries = {
+                org.get("organization_user_name"): org.get("organization_country") or ""
+                for org in csv.DictReader(f)
+            }
+        raw["organization_country"] = [
+            country or countries.get(login, "")
+            for country, login in zip(raw.get("organization_country", [""] * len(rows)), raw["organization_user_name"])
+        ]
+
+    table = {}
+    for name, values in raw.items():
+        if name in NUMERIC_COLUMNS:
+            table[name] = _to_float(values)
+        elif name in DATE_COLUMNS:
+            table[name] = _to_datetime(values)
+        else:
+            table[name] = np.array(values, dtype=object)
+    return table
+
+
+def project_enrichments(projects_csv_path):
+    """
+    Read the descriptive columns of projects.csv, keyed by canonical repository.
+
+    Returns:
+        Dict mapping lower-cased entry keys to their ``topics`` and ``languages`` (space
+        separated) and ``organization``; empty when the file does not exist.
+    """
+    enrichments = {}
+    if not projects_csv_path or not Path(projects_csv_path).exists():
+        return enrichments
+    with open(projects_csv_path, "r", newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            languages = row.get("languages") or row.get("dominating_language") or ""
+            enrichments[entry_key(row.get("git_url") or "").lower()] = {
+                "topics": (row.get("topics") or "").replace(",", " "),
+                "languages": languages.replace(",", " "),
+                "organization": row.get("organization_name") or row.get("organization") or "",
+            }
+    return enrichments
+
+
+def group_aggregates(table, by, stale_days=365, now=None):
+    """
+    Compute per group aggregates.
+
+    Args:
+        table: Result of ``load_project_table``
+        by: Column to group by
+        stale_days: Projects without commit for more days are counted as stale
+        now: Reference date (``numpy.datetime64``), defaults to the current time
+
+    Returns:
+        List of dicts sorted by total stars: ``group``, ``projects``, ``stars``, ``mean_stars``,
+        ``active_ratio`` and ``stale``.
+    """
+    keys = np.where(table[by] == "", "(unknown)", table[by]).astype(str)
+    groups, inverse = np.unique(keys, return_inverse=True)
+    counts = np.bincount(inverse, minlength=len(groups))
+
+    stars = np.nan_to_num(table["stargazers_count"])
+    star_sums = np.bincount(inverse, weights=stars, minlength=len(groups))
+
+    stale = stale_mask(table, stale_days, now)
+    active = ~stale & ~np.isnat(table["last_commit_date"])
+    active_counts = np.bincount(inverse, weights=active, minlength=len(groups))
+    stale_counts = np.bincount(inverse, weights=stale, minlength=len(groups))
+
+    order = np.argsort(-star_sums, kind="stable")
+    return [
+        {
+            "group": str(groups[i]),
+            "projects": int(counts[i]),
+            "stars": int(star_sums[i]),
+            "mean_stars": round(float(star_sums[i] / counts[i]), 1),
+            "active_ratio": round(float(active_counts[i] / counts[i]), 3),
+            "stale": int(stale_counts[i]),
+        }
+        for i in order
+    ]
+
+
+def stale_mask(table, stale_days=365, now=None):
+    """Return a boolean mask of projects whose last commit is older than ``stale_days``."""
+    now = now if now is not None else np.datetime64("now", "s")
+    last_commit = table["last_commit_date"]
+    age = now - last_commit
+    return ~np.isnat(last_commit) & (age > np.timedelta64(stale_days, "D"))
+
+
+def value_distribution(table, column, top=10):
+    """Return the ``top`` most frequent values of a column with their counts."""
+    values = table[column][table[column] != ""].astype(str)
+    if not len(values):
+        return []
+    uniques, counts = np.unique(values, return_counts=True)
+    order = np.argsort(-counts, kind="stable")[:top]
+    return [{"value": str(uniques[i]), "projects": int(counts[i])} for i in order]
+
+
+def project_report(table, by="rubric", stale_days=365, top=10):
+    """
+    Build the summary report of the projects table.
+
+    Returns:
+        Dict with the number of ``projects``, the ``groups`` aggregates, the ``languages``
+        and ``licenses`` distributions and the ``top`` oldest ``stale_projects``.
+    """
+    stale = stale_mask(table, stale_days)
+    stale_order = table["last_commit_date"].argsort()
+    stale_order = stale_order[stale[stale_order]][:top]
+    return {
+        "projects": len(table["project_name"]),
+        "groups": group_aggregates(table, by, stale_days),
+        "languages": value_distribution(table, "dominating_language", top),
+        "licenses": value_distribution(table, "license", top),
+        "stale_projects": [
+            {"project_name": table["project_name"][i], "git_url": table["git_url"][i],
+             "last_commit_date": str(table["last_commit_date"][i])}
+            for i in stale_order
+        ],
+    }
@@ -0,0 +1,126 @@
+"""Content-addressed storage of project READMEs.
+
+README bodies are not embedded in ``projects.csv``: each one is compressed and
+stored once under the SHA-256 of its content, and the ``readme_content`` column
+only holds that hash. Blobs are read back on demand. Fetches are conditional:
+the ETag and git blob SHA of each repository README are remembered, so an
+unchanged README costs a 304 answer (not counted against the rate limit) and is
+never rewritten.
+"""
+
+import base64
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+
+import requests
+
+from khc_cli.utils.compression import compress_bytes, decompress_bytes
+from khc_cli.utils.http import HttpClient, github_headers
+
+LOGGER = logging.getLogger(__name__)
+
+INDEX_NAME = "readme-index.json"
+
+
+class BlobStore:
+    """Deduplicated, compressed blobs stored under ``<root>/<hash[:2]>/<hash[2:]>``."""
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self.written = 0
+
+    def path(self, digest):
+        return self.root / digest[:2] / digest[2:]
+
+    def put(self, content):
+        """Store ``content`` (text or bytes) unless it is already present, and return its hash."""
+        data = content.encode("utf-8") if isinstance(content, str) else content
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path(digest)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Written aside then renamed, so that concurrent writers never expose a partial blob
+            temporary = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            temporary.write_bytes(compress_bytes(data))
+            os.replace(temporary, path)
+            self.written += 1
+        return digest
+
+    def get_bytes(self, digest):
+        """Return the bytes stored under ``digest``, or None when it is missing."""
+        if digest not in self:
+            return None
+        return decompress_bytes(self.path(digest).read_bytes())
+
+    def get(self, digest):
+        """Return the text stored under ``digest`` (invalid UTF-8 replaced), or None when it is missing."""
+        data = self.get_bytes(digest)
+        return None if data is None else data.decode("utf-8", errors="replace")
+
+    def __contains__(self, digest):
+        return bool(digest) and self.path(digest).exists()
+
+
+class ReadmeFetcher:
+    """
+    Fetch repository READMEs into a ``BlobStore``, conditionally on their previous version.
+
+    Args:
+        store_dir: Directory of the blob store and of its index
+        github_api_key: GitHub API key for authentication
+    """
+
+    def __init__(self, store_dir, github_api_key=None):
+        self.store = BlobStore(store_dir)
+        self.index_path = Path(store_dir) / INDEX_NAME
+        self.index = {}
+        if self.index_path.exists():
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                self.index = json.load(f)
+        self.client = HttpClient(github_headers(github_api_key))
+        self.stats = {"fetched": 0, "not_modified": 0}
+
+    def fetch(self, repo_path):
+        """
+        Fetch the README of a GitHub repository.
+
+        Returns:
+            Dict with the ``hash`` of the README content and its git blob ``sha``, or
+            None when the repository has no README.
+        """
+        key = repo_path.lower()
+        known = self.index.get(key)
+        headers = {}
+        if known and known.get("etag") and known.get("hash") in self.store:
+            headers["If-None-Match"] = known["etag"]
+        try:
+            response = self.client.request("GET", f"https://api.github.com/repos/{repo_path}/readme", headers=headers)
+        except requests.HTTPError as e:
+            if e.response is not None and e.response.status_code == 404:
+                self.index.pop(key, None)
+                return None
+            raise
+        if response.status_code == 304:
+            self.stats["not_modified"] += 1
+            return {"hash": known["hash"], "sha": known.get("sha")}
+        self.stats["fetched"] += 1
+
+        body = response.json()
+        if known and known.get("sha") == body.get("sha") and known.get("hash") in self.store:
+            digest = known["hash"]
+        else:
+            digest = self.store.put(base64.b64decode(body.get("content") or ""))
+        self.index[key] = {"etag": response.headers.get("ETag"), "sha": body.get("sha"), "hash": digest}
+        return {"hash": digest, "sha": body.get("sha")}
+
+    def save(self):
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.index_path, "w", encoding="utf-8") as f:
+            json.dump(self.index, f, indent=2, sort_keys=True)
+
+    def close(self):
+        self.save()
+        self.client.close()
@@ -0,0 +1,194 @@
+"""Rubric suggestion for new projects with a TF-IDF similarity index.
+
+Every rubric of the list is described by the terms of its entries: words of
+their name and text, plus the topics and languages found for them in
+``projects.csv`` (as ``topic:`` and ``lang:`` terms). Rubric vectors are TF-IDF
+weighted, L2-normalized and stored as a CSR sparse matrix (``data``, ``indices``,
+``indptr`` NumPy arrays). A new project is scored against all rubrics in one
+vectorized pass.
+
+The index is rebuilt only when the list or the ETL output changed, and the
+terms of each entry are cached by a hash of its fields, so a rebuild only
+tokenizes new or edited entries.
+"""
+
+import hashlib
+import json
+import logging
+import zipfile
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+
+from khc_cli.utils.canonical import entry_key
+from khc_cli.utils.minhash import normalize_text
+from khc_cli.utils.project_table import project_enrichments
+
+LOGGER = logging.getLogger(__name__)
+
+STOP_WORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "into", "is", "it", "its",
+    "of", "on", "or", "that", "the", "this", "to", "with", "using", "used", "based", "can", "your",
+    "tool", "tools", "library", "package", "open", "source", "project", "framework", "software",
+}
+# Weight of topic and language terms relative to words of the description
+TOPIC_WEIGHT = 2
+LANGUAGE_WEIGHT = 1
+
+
+def project_terms(text, topics=(), languages=()):
+    """Return the weighted terms of a project description, topics and languages."""
+    terms = Counter(word for word in normalize_text(text) if word not in STOP_WORDS and len(word) > 2)
+    for topic in topics:
+        terms[f"topic:{topic.lower()}"] += TOPIC_WEIGHT
+        terms.update({word: 1 for word in normalize_text(topic.replace("-", " ")) if word not in STOP_WORDS})
+    for language in languages:
+        terms[f"lang:{language.lower()}"] += LANGUAGE_WEIGHT
+    return terms
+
+
+def _signature(path):
+    path = Path(path) if path else None
+    if not path or not path.exists():
+        return "missing"
+    stat = path.stat()
+    return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+
+class RubricIndex:
+    """
+    TF-IDF index of the rubrics of a list, stored in a ``.npz`` file.
+
+    Attributes:
+        rubrics: Rubric names, one per matrix row
+        vocabulary: Mapping of terms to matrix columns
+        data, indices, indptr: CSR arrays of the normalized rubric vectors
+        idf: Inverse document frequency of each term
+    """
+
+    def __init__(self, path=None):
+        self.path = Path(path) if path else None
+        self.rubrics = []
+        self.vocabulary = {}
+        self.data = np.zeros(0)
+        self.indices = np.zeros(0, dtype=np.int64)
+        self.indptr = np.zeros(1, dtype=np.int64)
+        self.idf = np.zeros(0)
+        self.signature = None
+        self.entry_terms = {}
+        if self.path and self.path.exists():
+            try:
+                self._load()
+            except (OSError, ValueError, KeyError, TypeError, zipfile.BadZipFile) as e:
+                # Corrupt or older index: left empty, so that the next update rebuilds it
+                LOGGER.warning(f"Cannot load the rubric index {self.path}, it will be rebuilt: {e}")
+
+    def _load(self):
+        with np.load(self.path, allow_pickle=False) as arrays:
+            meta = json.loads(str(arrays["meta"]))
+            data, indices, indptr, idf = arrays["data"], arrays["indices"], arrays["indptr"], arrays["idf"]
+        vocabulary = {term: i for i, term in enumerate(meta["vocabulary"])}
+        rubrics, signature, entry_terms = meta["rubrics"], meta["signature"], meta["entry_terms"]
+        self.data, self.indices, self.indptr, self.idf = data, indices, indptr, idf
+        self.rubrics, self.vocabulary, self.signature, self.entry_terms = rubrics, vocabulary, signature, entry_terms
+
+    def save(self):
+        if not self.path:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        meta = {
+            "rubrics": self.rubrics,
+            "vocabulary": sorted(self.vocabulary, key=self.vocabulary.get),
+            "signature": self.signature,
+            "entry_terms": self.entry_terms,
+        }
+        with open(self.path, "wb") as f:
+            np.savez_compressed(
+                f, data=self.data, indices=self.indices, indptr=self.indptr, idf=self.idf, meta=np.array(json.dumps(meta))
+            )
+
+    def update(self, awesome_list_factory, readme_path, projects_csv_path=None):
+        """
+        Rebuild the index if the list or the ETL output changed since it was built.
+
+        Args:
+            awesome_list_factory: Callable returning the parsed list, only called when it changed
+            readme_path: Path of the list
+            projects_csv_path: Path of the ETL output providing topics and languages
+
+        Returns:
+            Number of entries tokenized for the rebuild, or None when the index was up to date.
+        """
+        signature = {"readme": _signature(readme_path), "projects": _signature(projects_csv_path)}
+        if signature == self.signature:
+            return None
+
+        enrichments = project_enrichments(projects_csv_path)
+        rubric_terms = {}
+        entry_terms = {}
+        tokenized = 0
+        for rubric_key, entry, depth in awesome_list_factory().iter_entries():
+            enrichment = enrichments.get(entry_key(entry.url).lower(), {})
+            fields = [entry.name, entry.text, enrichment.get("topics", ""), enrichment.get("languages", "")]
+            digest = hashlib.sha1("\x1f".join(fields).encode("utf-8")).hexdigest()
+            terms = self.entry_terms.get(digest)
+            if terms is None:
+                terms = project_terms(f"{entry.name} {entry.text}", fields[2].split(), fields[3].split())
+                tokenized += 1
+            entry_terms[digest] = terms
+            rubric_terms.setdefault(rubric_key, Counter()).update(terms)
+
+        self._build(rubric_terms)
+        self.entry_terms = entry_terms
+        self.signature = signature
+        self.save()
+        LOGGER.info(f"Rubric index rebuilt: {len(self.rubrics)} rubrics, {tokenized} entries tokenized")
+        return tokenized
+
+    def _build(self, rubric_terms):
+        self.rubrics = list(rubric_terms)
+        vocabulary = {}
+        rows, columns, counts = [], [], []
+        for row, terms in enumerate(rubric_terms.values()):
+            for term, count in terms.items():
+                rows.append(row)
+                columns.append(vocabulary.setdefault(term, len(vocabulary)))
+                counts.append(count)
+        rows, columns, counts = np.array(rows, dtype=np.int64), np.array(columns, dtype=np.int64), np.array(counts, dtype=float)
+
+        # Sublinear term frequency, smoothed inverse document frequency
+        document_frequency = np.bincount(columns, minlength=len(vocabulary))
+        self.idf = np.log((1 + len(self.rubrics)) / (1 + document_frequency)) + 1
+        weights = (1 + np.log(counts)) * self.idf[columns] if len(counts) else counts
+        norms = np.sqrt(np.bincount(rows, weights=weights ** 2, minlength=len(self.rubrics)))
+        weights = weights / norms[rows] if len(weights) else weights
+
+        # Entries were generated row by row, so they are already in CSR order
+        self.data = weights
+        self.indices = columns
+        self.indptr = np.concatenate([[0], np.cumsum(np.bincount(rows, minlength=len(self.rubrics)))])
+        self.vocabulary = vocabulary
+
+    def suggest(self, text, topics=(), languages=(), top=3):
+        """
+        Rank the rubrics for a new project.
+
+        Returns:
+            List of ``(rubric, score)`` tuples, best first, with a cosine similarity score.
+        """
+        if not self.rubrics:
+            return []
+        query = np.zeros(len(self.vocabulary))
+        for term, count in project_terms(text, topics, languages).items():
+            column = self.vocabulary.get(term)
+            if column is not None:
+                query[column] = (1 + np.log(count)) * self.idf[column]
+        norm = np.linalg.norm(query)
+        if not norm:
+            return []
+        # Sparse matrix-vector product over all rubrics at once
+        row_of_value = np.repeat(np.arange(len(self.rubrics)), np.diff(self.indptr))
+        scores = np.bincount(row_of_value, weights=self.data * query[self.indices], minlength=len(self.rubrics)) / norm
+        best = np.argsort(-scores, kind="stable")[:top]
+        return [(self.rubrics[i], round(float(scores[i]), 4)) for i in best if scores[i] > 0]
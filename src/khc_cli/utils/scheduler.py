@@ -0,0 +1,146 @@
+"""Adaptive refresh scheduling of repositories.
+
+Each repository gets a refresh interval that adapts to how often it is observed
+changing: the interval is halved when a fetch shows a change (new push, star
+delta, update, new release) and grows when nothing changed, between ``MIN_INTERVAL_HOURS``
+and ``MAX_INTERVAL_HOURS``. An ETL run with a request budget then spends it on
+the most overdue and most volatile repositories first.
+"""
+
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+LOGGER = logging.getLogger(__name__)
+
+MIN_INTERVAL_HOURS = 6
+MAX_INTERVAL_HOURS = 24 * 30
+DEFAULT_INTERVAL_HOURS = 24
+# Weight of the latest observation in the change rate moving average
+CHANGE_RATE_ALPHA = 0.3
+# Relative star delta considered as a change
+STAR_DELTA = 0.01
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+class RefreshSchedule:
+    """Persistent refresh state of the repositories, stored as JSON."""
+
+    def __init__(self, path=None):
+        self.path = Path(path) if path else None
+        self.repos = {}
+        if self.path and self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.repos = json.load(f)
+
+    def save(self):
+        if not self.path:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(self.repos, f, indent=2, sort_keys=True)
+
+    def record(self, key, repo, fetched_at=None, release=None):
+        """
+        Record a fetch of ``key`` and adapt its refresh interval.
+
+        Args:
+            key: Repository path
+            repo: Raw repository payload returned by the API
+            fetched_at: Date of the fetch
+            release: Tag of the latest release, when it was fetched; the previous one is
+                kept otherwise
+        """
+        fetched_at = fetched_at or _now()
+        state = self.repos.get(key.lower())
+        stars = repo.get("stargazers_count") or 0
+        observation = {"pushed_at": repo.get("pushed_at"), "updated_at": repo.get("updated_at"), "stars": stars,
+                       "release": release or (state or {}).get("release")}
+
+        if state is None:
+            interval = DEFAULT_INTERVAL_HOURS
+            change_rate = 0.5
+        else:
+            previous_stars = state.get("stars") or 0
+            changed = (
+                observation["pushed_at"] != state.get("pushed_at")
+                or observation["updated_at"] != state.get("updated_at")
+                or abs(stars - previous_stars) > max(previous_stars * STAR_DELTA, 1)
+                # States recorded before releases were tracked have no release to compare
+                or ("release" in state and observation["release"] != state["release"])
+            )
+            interval = state["interval_hours"] / 2 if changed else state["interval_hours"] * 1.5
+            interval = min(max(interval, MIN_INTERVAL_HOURS), MAX_INTERVAL_HOURS)
+            change_rate = (1 - CHANGE_RATE_ALPHA) * state["change_rate"] + CHANGE_RATE_ALPHA * (1.0 if changed else 0.0)
+
+        self.repos[key.lower()] = dict(
+            observation,
+            last_fetch=fetched_at.isoformat(),
+            interval_hours=interval,
+            change_rate=round(change_rate, 4),
+            next_due=(fetched_at + timedelta(hours=interval)).isoformat(),
+        )
+
+    def priority(self, key, now=None):
+        """
+        Return the refresh priority of a repository (higher first), or None when it is not due.
+
+        Never fetched repositories come first; the others are ranked by how overdue they
+        are, relative to their interval, weighted by their change rate.
+        """
+        now = now or _now()
+        state = self.repos.get(key.lower())
+        if state is None:
+            return float("inf")
+        overdue = (now - datetime.fromisoformat(state["next_due"])).total_seconds() / 3600
+        if overdue < 0:
+            return None
+        return (1 + overdue / state["interval_hours"]) * (0.5 + state["change_rate"])
+
+    def select(self, keys, budget, fetchable=None, now=None, per_repo=1, per_owner=1, batched=()):
+        """
+        Choose the repositories to refresh within a request budget.
+
+        Every enabled stage is charged: ``per_repo`` requests for each repository
+        (metadata, README, clone...), ``per_owner`` for the organization of an owner no
+        other selected repository shares, and one request per started batch of each
+        stage sending its lookups in batches.
+
+        Args:
+            keys: Candidate repository paths
+            budget: Maximum number of requests
+            fetchable: Repositories having no previous payload; they are due whatever
+                the schedule says
+            now: Reference date
+            per_repo: Requests sent for each repository
+            per_owner: Requests sent for each distinct owner
+            batched: Batch sizes of the batched stages
+
+        Returns:
+            Set of the repository paths to refresh.
+        """
+        now = now or _now()
+        fetchable = fetchable or set()
+        ranked = []
+        for key in keys:
+            priority = float("inf") if key in fetchable else self.priority(key, now)
+            if priority is not None:
+                ranked.append((priority, key))
+        ranked.sort(key=lambda item: item[0], reverse=True)
+
+        selected, owners, spent = set(), set(), 0
+        for _, key in ranked:
+            owner = key.split("/")[0].lower()
+            cost = per_repo + (0 if owner in owners else per_owner)
+            cost += sum(1 for size in batched if len(selected) % size == 0)
+            if spent + cost > budget:
+                continue
+            selected.add(key)
+            owners.add(owner)
+            spent += cost
+        LOGGER.info(f"{len(selected)} of {len(ranked)} due repositories selected for a budget of {budget} requests")
+        return selected
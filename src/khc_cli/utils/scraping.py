@@ -0,0 +1,104 @@
+"""Targeted HTML extraction for the GitHub pages scraped by the CLI.
+
+GitHub pages are very heavy and only a few nodes are needed from them, so the
+pages are parsed with a ``SoupStrainer`` that only builds the matching subtrees.
+The C-backed ``lxml`` parser is used when installed, ``html.parser`` otherwise.
+"""
+
+import logging
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = "lxml"
+except ImportError:  # pragma: no cover - depends on the environment
+    HTML_PARSER = "html.parser"
+
+LOGGER = logging.getLogger(__name__)
+
+# Shared selectors, as (tag, attributes) pairs usable with BeautifulSoup.find()
+DEPENDENT_ROW = ("div", {"class": "Box-row"})
+DEPENDENT_OWNER = ("a", {"data-repository-hovercards-enabled": ""})
+DEPENDENT_NAME = ("a", {"data-hovercard-type": "repository"})
+PAGINATION = ("div", {"class": "paginate-container"})
+README = ("div", {"id": "readme"})
+MARKDOWN_BODY = (["article", "div"], {"class": "markdown-body"})
+REPO_CONTAINER = ("main", {"id": "js-repo-pjax-container"})
+
+
+def _has_class(*names):
+    """Build an attribute filter matching elements having one of the given classes."""
+    wanted = set(names)
+
+    def match(value):
+        if value is None:
+            return False
+        classes = value.split() if isinstance(value, str) else value
+        return bool(wanted & set(classes))
+
+    return match
+
+
+def _has_id(*ids):
+    wanted = set(ids)
+    return lambda value: value in wanted
+
+
+DEPENDENTS_STRAINER = SoupStrainer("div", attrs={"class": _has_class("Box-row", "paginate-container")})
+# The repository container wraps almost the whole page: it is only parsed as a last resort
+README_STRAINER = SoupStrainer("div", attrs={"id": _has_id("readme")})
+MARKDOWN_BODY_STRAINER = SoupStrainer(["article", "div"], attrs={"class": _has_class("markdown-body")})
+REPO_CONTAINER_STRAINER = SoupStrainer("main", attrs={"id": _has_id("js-repo-pjax-container")})
+
+
+def parse_html(content, strainer=None, parser=None):
+    """Parse ``content``, building only the subtrees matched by ``strainer``."""
+    return BeautifulSoup(content, parser or HTML_PARSER, parse_only=strainer)
+
+
+def parse_dependents_page(content, parser=None):
+    """
+    Extract the dependents listed on a ``/network/dependents`` page.
+
+    Returns:
+        Tuple ``(dependents, next_url)``: the ``owner/repo`` names found on the page,
+        and the URL of the next page (None on the last page).
+    """
+    soup = parse_html(content, DEPENDENTS_STRAINER, parser)
+
+    dependents = []
+    for row in soup.find_all(*DEPENDENT_ROW):
+        owner = row.find(*DEPENDENT_OWNER)
+        name = row.find(*DEPENDENT_NAME)
+        if owner and name:
+            dependents.append("{}/{}".format(owner.text, name.text))
+
+    next_url = None
+    pagination = soup.find(*PAGINATION)
+    links = pagination.find_all("a") if pagination else []
+    if links:
+        link = links[1] if len(links) > 1 else links[0]
+        next_url = link.attrs.get("href")
+    return dependents, next_url
+
+
+def find_readme_container(content, parser=None):
+    """
+    Find the rendered README of a repository home page.
+
+    Returns:
+        Tuple ``(kind, element)`` where ``kind`` is ``"readme"``, ``"markdown-body"`` or
+        ``"main"`` depending on the container found, or ``(None, None)``.
+    """
+    readme_div = parse_html(content, README_STRAINER, parser).find(*README)
+    if readme_div:
+        return "readme", readme_div
+
+    markdown_container = parse_html(content, MARKDOWN_BODY_STRAINER, parser).find(*MARKDOWN_BODY)
+    if markdown_container:
+        return "markdown-body", markdown_container
+
+    main_content = parse_html(content, REPO_CONTAINER_STRAINER, parser).find(*REPO_CONTAINER)
+    if main_content:
+        return "main", main_content
+    return None, None
@@ -0,0 +1,177 @@
+"""Full-text search over list entries and their enriched metadata (SQLite FTS5).
+
+Each entry of the list is indexed with its name, text, URL and rubric, plus the
+topics, languages and organization found for it in ``projects.csv``. The index
+is updated incrementally: nothing is read when neither the list nor the ETL
+output changed since the last update, and otherwise only documents whose fields
+changed are rewritten. Results are ranked with BM25, names weighing most.
+"""
+
+import hashlib
+import logging
+import re
+import sqlite3
+from pathlib import Path
+
+from khc_cli.utils.canonical import entry_key
+from khc_cli.utils.project_table import project_enrichments
+
+LOGGER = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    canonical TEXT NOT NULL,
+    digest TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS docs_canonical ON docs (canonical);
+CREATE VIRTUAL TABLE IF NOT EXISTS entries USING fts5(
+    name, text, url, rubric, topics, languages, organization,
+    tokenize = 'porter unicode61'
+);
+CREATE TABLE IF NOT EXISTS sources (
+    path TEXT PRIMARY KEY,
+    signature TEXT NOT NULL
+);
+"""
+
+FIELDS = ["name", "text", "url", "rubric", "topics", "languages", "organization"]
+# BM25 weights of the fields, in the order of FIELDS
+WEIGHTS = [10.0, 4.0, 3.0, 2.0, 3.0, 1.0, 1.0]
+TOKEN = re.compile(r"\w+", re.UNICODE)
+# Queries using these are passed to FTS5 as written
+FTS_SYNTAX = re.compile(r'["*:()^]|\b(AND|OR|NOT|NEAR)\b')
+
+
+def _signature(path):
+    path = Path(path) if path else None
+    if not path or not path.exists():
+        return "missing"
+    stat = path.stat()
+    return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def fts_query(query):
+    """Turn a free text query into an FTS5 query: all words must match, the last one as a prefix."""
+    if FTS_SYNTAX.search(query):
+        return query
+    words = TOKEN.findall(query)
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words[:-1]] + [f'"{words[-1]}"*']
+    return " ".join(terms)
+
+
+class SearchIndex:
+    """FTS5 index of the entries of one list, stored in a SQLite file."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def update(self, awesome_list_factory, readme_path, projects_csv_path=None):
+        """
+        Bring the index up to date with the list and the ETL output.
+
+        Args:
+            awesome_list_factory: Callable returning the parsed list, only called when it changed
+            readme_path: Path of the list, whose modification is checked
+            projects_csv_path: Path of the ETL output, whose modification is checked
+
+        Returns:
+            Dict with the number of ``added``, ``updated`` and ``removed`` documents, or
+            None when the sources did not change.
+        """
+        signatures = {"readme": _signature(readme_path), "projects": _signature(projects_csv_path)}
+        known = dict(self.conn.execute("SELECT path, signature FROM sources"))
+        if known == signatures:
+            return None
+
+        enrichments = project_enrichments(projects_csv_path)
+        existing = {key: (doc_id, digest) for doc_id, key, digest in self.conn.execute("SELECT id, key, digest FROM docs")}
+        seen = set()
+        stats = {"added": 0, "updated": 0, "removed": 0}
+        with self.conn:
+            for rubric_key, entry, depth in awesome_list_factory().iter_entries():
+                canonical = entry_key(entry.url).lower()
+                key = f"{rubric_key}\x1f{canonical}"
+                if key in seen:
+                    continue
+                seen.add(key)
+                text = entry.text[2:] if entry.text.startswith("- ") else entry.text
+                values = [entry.name, text, entry.url, rubric_key] + [
+                    enrichments.get(canonical, {}).get(field, "") for field in FIELDS[4:]
+                ]
+                digest = hashlib.sha1("\x1f".join(values).encode("utf-8")).hexdigest()
+                previous = existing.get(key)
+                if previous and previous[1] == digest:
+                    continue
+                if previous:
+                    doc_id = previous[0]
+                    self.conn.execute("DELETE FROM entries WHERE rowid = ?", (doc_id,))
+                    self.conn.execute("UPDATE docs SET digest = ? WHERE id = ?", (digest, doc_id))
+                    stats["updated"] += 1
+                else:
+                    doc_id = self.conn.execute(
+                        "INSERT INTO docs (key, canonical, digest) VALUES (?, ?, ?)", (key, canonical, digest)
+                    ).lastrowid
+                    stats["added"] += 1
+                self.conn.execute(
+                    f"INSERT INTO entries (rowid, {', '.join(FIELDS)}) VALUES (?{', ?' * len(FIELDS)})",
+                    [doc_id] + values,
+                )
+            for key, (doc_id, _) in existing.items():
+                if key not in seen:
+                    self.conn.execute("DELETE FROM entries WHERE rowid = ?", (doc_id,))
+                    self.conn.execute("DELETE FROM docs WHERE id = ?", (doc_id,))
+                    stats["removed"] += 1
+            self.conn.execute("DELETE FROM sources")
+            self.conn.executemany("INSERT INTO sources (path, signature) VALUES (?, ?)", signatures.items())
+        LOGGER.info(f"Search index updated: {stats}")
+        return stats
+
+    def lookup(self, url):
+        """Return the entries pointing to the same repository as ``url``."""
+        canonical = entry_key(url).lower()
+        rows = self.conn.execute(
+            f"SELECT {', '.join('e.' + field for field in FIELDS)} FROM docs d JOIN entries e ON e.rowid = d.id "
+            "WHERE d.canonical = ?",
+            (canonical,),
+        )
+        return [dict(zip(FIELDS, row), score=None) for row in rows]
+
+    def search(self, query, limit=20):
+        """
+        Return the best matching entries, best first.
+
+        Raises:
+            ValueError: When the query is not a valid FTS5 query
+        """
+        match = fts_query(query)
+        if not match:
+            return []
+        try:
+            rows = self.conn.execute(
+                f"SELECT {', '.join(FIELDS)}, bm25(entries, {', '.join(map(str, WEIGHTS))}) AS score, "
+                "snippet(entries, 1, '[', ']', '...', 12) FROM entries WHERE entries MATCH ? "
+                "ORDER BY score LIMIT ?",
+                (match, limit),
+            ).fetchall()
+        except sqlite3.OperationalError as e:
+            raise ValueError(f"Invalid search query '{query}': {e}")
+        return [
+            dict(zip(FIELDS, row[:len(FIELDS)]), score=round(-row[len(FIELDS)], 3), snippet=row[-1])
+            for row in rows
+        ]
@@ -0,0 +1,137 @@
+"""Raw API response snapshots for the ETL pipeline.
+
+The extraction stage stores the raw per-repository payloads in a snapshot
+archive so that the transformation stage can be re-run offline. An archive is a
+directory holding one compressed JSONL segment per run. Each line is a record:
+
+    {"kind": "repo", "key": "owner/repo", "id": "<sha256>", "fetched_at": "...", "entry": {...}, "payload": {...}}
+    {"kind": "organization", "key": "login", "id": "<sha256>", "payload": {...}}
+
+``id`` is the SHA-256 of the canonical JSON payload. Payloads already written to
+the segment (e.g. an organization shared by many projects) are stored once.
+"""
+
+import hashlib
+import json
+import logging
+from datetime import datetime, timezone
+from pathlib import Path
+
+from khc_cli.utils.compression import default_extension, open_compressed
+
+LOGGER = logging.getLogger(__name__)
+
+SEGMENT_PREFIX = "segment-"
+
+
+def payload_id(payload):
+    """Return the content address of a JSON payload."""
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class SnapshotWriter:
+    """Append raw payloads of one ETL run to a new segment of the archive."""
+
+    def __init__(self, archive_dir, run_id=None):
+        self.archive_dir = Path(archive_dir)
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        run_id = run_id or datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+        self.path = self.archive_dir / f"{SEGMENT_PREFIX}{run_id}.jsonl{default_extension()}"
+        self._file = open_compressed(self.path, "wt")
+        self._written = set()
+
+    def _write(self, record):
+        self._file.write(json.dumps(record, separators=(",", ":"), default=str) + "\n")
+
+    def add_repo(self, key, entry, payload, fetched_at=None):
+        """Record the raw payloads fetched for one list entry."""
+        self._write({
+            "kind": "repo",
+            "key": key,
+            "id": payload_id(payload),
+            "fetched_at": fetched_at,
+            "entry": entry,
+            "payload": payload,
+        })
+
+    def add_organization(self, login, payload):
+        """Record an organization payload once per segment."""
+        content_id = payload_id(payload)
+        if (login, content_id) in self._written:
+            return
+        self._written.add((login, content_id))
+        self._write({"kind": "organization", "key": login, "id": content_id, "payload": payload})
+
+    def close(self):
+        self._file.close()
+        LOGGER.info(f"Snapshot segment written to {self.path}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def list_segments(archive_dir):
+    """Return the segments of an archive, oldest first."""
+    archive_dir = Path(archive_dir)
+    if not archive_dir.is_dir():
+        return []
+    return sorted(p for p in archive_dir.iterdir() if p.name.startswith(SEGMENT_PREFIX))
+
+
+def resolve_segment(snapshot):
+    """Return the segment to read for ``snapshot`` (a segment file or an archive directory)."""
+    snapshot = Path(snapshot)
+    if snapshot.is_file():
+        return snapshot
+    segments = list_segments(snapshot)
+    if not segments:
+        raise FileNotFoundError(f"No snapshot segment found in {snapshot}")
+    return segments[-1]
+
+
+def iter_records(segment_path):
+    """Yield the records of a segment in the order they were written."""
+    with open_compressed(segment_path, "rt") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def load_snapshot(snapshot):
+    """Load a snapshot segment.
+
+    Args:
+        snapshot: Path of a segment file, or of an archive directory (latest segment is used)
+
+    Returns:
+        Tuple ``(repo_records, organizations)``: the repo records in list order, and a
+        dict mapping organization logins to their payloads.
+    """
+    repo_records = []
+    organizations = {}
+    for record in iter_records(resolve_segment(snapshot)):
+        if record["kind"] == "repo":
+            repo_records.append(record)
+        elif record["kind"] == "organization":
+            organizations[record["key"]] = record["payload"]
+    return repo_records, organizations
+
+
+def load_previous_records(archive_dir):
+    """
+    Load the latest segment of an archive, if any, for carrying payloads over to a new run.
+
+    Returns:
+        Tuple ``(records, organizations)``: repo records keyed by lower-cased repository
+        key (keys gain the casing of the API full name once a repository is in the
+        index), and organization payloads keyed by login. Both are empty when there is
+        no segment.
+    """
+    if not archive_dir or not list_segments(archive_dir):
+        return {}, {}
+    repo_records, organizations = load_snapshot(archive_dir)
+    return {record["key"].lower(): record for record in repo_records}, organizations
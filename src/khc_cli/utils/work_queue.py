@@ -0,0 +1,169 @@
+"""Durable work queue backed by a SQLite file, used by the sharded ETL.
+
+The coordinator enqueues one item per list entry, workers (processes or hosts
+sharing the file) claim items in batches and store the raw payloads they fetched,
+and the merge step reads the results back in list order.
+
+Claims are leases: an item claimed by a worker that died is handed out again
+once ``lease_seconds`` have elapsed, until it was claimed ``max_attempts`` times;
+an item that keeps killing or hanging its workers is then marked as failed.
+"""
+
+import json
+import sqlite3
+import time
+from pathlib import Path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL,
+    entry TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    worker TEXT,
+    claimed_at REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    fetched_at TEXT,
+    payload TEXT,
+    organization TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS items_status ON items (status, id);
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+PENDING = "pending"
+CLAIMED = "claimed"
+DONE = "done"
+FAILED = "failed"
+
+
+class WorkQueue:
+    """SQLite work queue shared by the coordinator, the workers and the merge step."""
+
+    def __init__(self, path, lease_seconds=600, max_attempts=3):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.conn = sqlite3.connect(str(self.path), timeout=60, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def set_meta(self, name, value):
+        self.conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)", (name, value))
+
+    def get_meta(self, name, default=None):
+        row = self.conn.execute("SELECT value FROM meta WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else default
+
+    def reset(self):
+        """Remove every item from the queue."""
+        self.conn.execute("DELETE FROM items")
+
+    def enqueue(self, items):
+        """Append ``(key, entry)`` pairs to the queue, keeping their order."""
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            self.conn.executemany(
+                "INSERT INTO items (key, entry) VALUES (?, ?)",
+                ((key, json.dumps(entry)) for key, entry in items),
+            )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+
+    def claim(self, worker, batch_size=10):
+        """
+        Claim up to ``batch_size`` items for ``worker``.
+
+        Returns:
+            List of ``(item_id, key, entry)`` tuples, empty when nothing is left to claim.
+        """
+        now = time.time()
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            self.conn.execute(
+                "UPDATE items SET status = ?, error = ? WHERE status = ? AND claimed_at < ? AND attempts >= ?",
+                (FAILED, "lease expired", CLAIMED, now - self.lease_seconds, self.max_attempts),
+            )
+            rows = self.conn.execute(
+                "SELECT id, key, entry FROM items "
+                "WHERE status = ? OR (status = ? AND claimed_at < ?) "
+                "ORDER BY id LIMIT ?",
+                (PENDING, CLAIMED, now - self.lease_seconds, batch_size),
+            ).fetchall()
+            self.conn.executemany(
+                "UPDATE items SET status = ?, worker = ?, claimed_at = ?, attempts = attempts + 1 "
+                "WHERE id = ?",
+                ((CLAIMED, worker, now, row[0]) for row in rows),
+            )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return [(item_id, key, json.loads(entry)) for item_id, key, entry in rows]
+
+    def complete(self, item_id, worker, payload, organization, fetched_at):
+        """
+        Store the raw payloads fetched for an item claimed by ``worker``.
+
+        Returns:
+            False when the lease of ``worker`` expired or the item was handed to another
+            worker; the result is then discarded.
+        """
+        cursor = self.conn.execute(
+            "UPDATE items SET status = ?, payload = ?, organization = ?, fetched_at = ?, error = NULL "
+            "WHERE id = ? AND worker = ? AND status = ? AND claimed_at >= ?",
+            (DONE, json.dumps(payload, default=str),
+             json.dumps(organization, default=str) if organization else None, fetched_at,
+             item_id, worker, CLAIMED, time.time() - self.lease_seconds),
+        )
+        return cursor.rowcount == 1
+
+    def fail(self, item_id, worker, error):
+        """
+        Record a failure; the item is retried until ``max_attempts`` is reached.
+
+        Returns:
+            False when ``worker`` no longer holds the lease of the item.
+        """
+        cursor = self.conn.execute(
+            "UPDATE items SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END, error = ? "
+            "WHERE id = ? AND worker = ? AND status = ? AND claimed_at >= ?",
+            (self.max_attempts, FAILED, PENDING, str(error),
+             item_id, worker, CLAIMED, time.time() - self.lease_seconds),
+        )
+        return cursor.rowcount == 1
+
+    def counts(self):
+        """Return the number of items per status."""
+        return dict(self.conn.execute("SELECT status, COUNT(*) FROM items GROUP BY status").fetchall())
+
+    def iter_results(self):
+        """Yield ``(key, entry, status, payload, organization, fetched_at, error)`` in list order."""
+        for key, entry, status, payload, organization, fetched_at, error in self.conn.execute(
+            "SELECT key, entry, status, payload, organization, fetched_at, error FROM items ORDER BY id"
+        ):
+            yield (
+                key,
+                json.loads(entry),
+                status,
+                json.loads(payload) if payload else {},
+                json.loads(organization) if organization else None,
+                fetched_at,
+                error,
+            )
@@ -0,0 +1,74 @@
+from pathlib import Path
+
+import pytest
+
+from khc_cli.awesomecure.awesome2py import AwesomeList
+
+TEMPLATE = Path(__file__).parents[1] / "src" / "khc_cli" / "resources" / "awesome_list_template.md"
+
+NESTED_LIST = """# Awesome Test
+
+## Contents
+
+- [Energy](#energy)
+    - [Solar](#solar)
+    - [Wind](#wind)
+- [Water](#water)
+    - [Hydrology](#hydrology)
+
+## Energy
+
+### Solar
+
+- [pvlib](https://github.com/pvlib/pvlib-python) - Solar modeling.
+    - [pvanalytics](https://github.com/pvlib/pvanalytics) - Quality control.
+
+### Wind
+
+- [windpowerlib](https://github.com/wind-python/windpowerlib) - Wind turbines.
+
+### Unlisted
+
+- [orphan](https://github.com/owner/orphan) - Not in the table of contents.
+
+## Water
+
+### Hydrology
+
+- [pastas](https://github.com/pastas/pastas) - Groundwater time series.
+"""
+
+
+def entries(awesome_list):
+    return [(rubric, entry.name, entry.url, entry.text, depth) for rubric, entry, depth in awesome_list.iter_entries()]
+
+
+@pytest.fixture
+def nested_list(tmp_path):
+    path = tmp_path / "README.md"
+    path.write_text(NESTED_LIST, encoding="utf-8")
+    return path
+
+
+def test_lazy_and_eager_parsing_yield_the_same_entries(nested_list):
+    eager = entries(AwesomeList(str(nested_list)))
+    assert entries(AwesomeList(str(nested_list), lazy=True)) == eager
+    assert [(rubric, name, depth) for rubric, name, _, _, depth in eager] == [
+        ("Solar", "pvlib", 0),
+        ("Solar", "pvanalytics", 1),
+        ("Wind", "windpowerlib", 0),
+        ("Hydrology", "pastas", 0),
+    ]
+
+
+def test_lazy_count_matches_the_entries_yielded(nested_list):
+    lazy = AwesomeList(str(nested_list), lazy=True)
+    assert lazy.rubrics == []
+    assert lazy.count_entries() == AwesomeList(str(nested_list)).count_entries() == 4
+
+
+def test_lazy_and_eager_parsing_agree_on_the_template():
+    eager = entries(AwesomeList(str(TEMPLATE)))
+    lazy = entries(AwesomeList(str(TEMPLATE), lazy=True))
+    assert len(eager) > 1000
+    assert lazy == eager
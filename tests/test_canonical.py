@@ -0,0 +1,91 @@
+from pathlib import Path
+
+import pytest
+
+from khc_cli.awesomecure.awesome2py import AwesomeList
+from khc_cli.utils.canonical import RepoIndex, canonicalize_repo_url, entry_key
+
+TEMPLATE = Path(__file__).parents[1] / "src" / "khc_cli" / "resources" / "awesome_list_template.md"
+
+
+@pytest.mark.parametrize("url", [
+    "https://github.com/Owner/Repo",
+    "http://www.github.com/owner/repo/",
+    "https://github.com/owner/repo.git",
+    "https://github.com/owner/repo/tree/main/docs",
+    "github.com/owner/repo#readme",
+    "git@github.com:owner/repo.git",
+])
+def test_github_url_variants_share_one_key(url):
+    assert canonicalize_repo_url(url) == ("github.com", "owner/repo")
+    assert entry_key(url) == "owner/repo"
+
+
+@pytest.mark.parametrize("url", [
+    "https://github.com/topics/energy",
+    "https://github.com/orgs/some-org/repositories",
+    "https://github.com/sponsors/someone",
+    "https://github.com/owner",
+])
+def test_github_pages_that_are_not_repositories(url):
+    assert canonicalize_repo_url(url) == ("github.com", None)
+
+
+def test_gitlab_keeps_full_namespaces():
+    assert canonicalize_repo_url("https://gitlab.com/group/sub/project/-/tree/main") == ("gitlab.com", "group/sub/project")
+    assert entry_key("https://gitlab.com/group/sub/project.git") == "gitlab.com/group/sub/project"
+    assert entry_key("https://gitlab.com/group/sub/other") != entry_key("https://gitlab.com/group/sub/project")
+
+
+@pytest.mark.parametrize("first, second", [
+    # Self-hosted GitLab projects sharing their first two path segments
+    ("https://git.rwth-aachen.de/acs/public/villas/node",
+     "https://git.rwth-aachen.de/acs/public/simulation/DistAIXFramework/distaix"),
+    ("https://gitlab.jsc.fz-juelich.de/esde/machine-learning/ambs",
+     "https://gitlab.jsc.fz-juelich.de/esde/machine-learning/mlair"),
+    # Documentation and websites
+    ("https://example.org/docs/a/guide", "https://example.org/docs/a/reference"),
+    ("https://github.com/topics/solar", "https://github.com/topics/wind"),
+])
+def test_distinct_urls_of_unknown_hosts_do_not_collide(first, second):
+    assert canonicalize_repo_url(first)[1] is None
+    assert entry_key(first) != entry_key(second)
+
+
+def test_urls_of_unknown_hosts_are_normalized():
+    assert entry_key("https://www.example.org/project/") == entry_key("http://example.org/project")
+    assert entry_key("https://example.org/page?id=1#top") == "example.org/page?id=1"
+    assert entry_key("https://example.org/page?id=1") != entry_key("https://example.org/page?id=2")
+
+
+def test_renamed_repositories_resolve_through_the_index(tmp_path):
+    index = RepoIndex(tmp_path / "repo-index.json")
+    index.record("old-owner/repo", "New-Owner/Repo")
+    index.save()
+
+    reloaded = RepoIndex(tmp_path / "repo-index.json")
+    assert entry_key("https://github.com/old-owner/repo", reloaded) == "New-Owner/Repo"
+    assert entry_key("https://github.com/new-owner/repo", reloaded) == "New-Owner/Repo"
+
+
+def test_template_entries_only_collapse_when_they_point_to_the_same_repository():
+    keys = {}
+    for _, entry, _ in AwesomeList(str(TEMPLATE)).iter_entries():
+        keys.setdefault(entry_key(entry.url).lower(), set()).add(entry.url)
+    collisions = {key: urls for key, urls in keys.items() if len(urls) > 1}
+    for key, urls in collisions.items():
+        platform, repo_path = canonicalize_repo_url(next(iter(urls)))
+        assert platform == "github.com" and repo_path == key, urls
+
+
+def test_self_hosted_forges_are_passed_explicitly():
+    forges = {"git.example.org": "gitlab", "example.org/gitea": "gitea"}
+    url = "https://git.example.org/group/sub/project/-/tree/main"
+    assert canonicalize_repo_url(url) == ("git.example.org", None)
+    assert canonicalize_repo_url(url, forges) == ("git.example.org", "group/sub/project")
+    assert canonicalize_repo_url("http://example.org/gitea/Owner/Repo/src/branch/main", forges) == (
+        "example.org/gitea", "owner/repo"
+    )
+    assert entry_key("http://example.org/gitea/owner/repo", forges=forges) == "example.org/gitea/owner/repo"
+    # Other pages of the same host are not repositories of the instance
+    assert canonicalize_repo_url("http://example.org/blog/post", forges) == ("example.org", None)
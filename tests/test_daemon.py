@@ -0,0 +1,159 @@
+import json
+import os
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from khc_cli.utils import daemon
+from khc_cli.utils.daemon import DaemonError, FileCache, KhcService, call_daemon
+
+LIST = """# Awesome Test
+
+## Contents
+
+- [Climate](#climate)
+
+## Climate
+
+- [E3SM](https://github.com/e3sm-project/e3sm) - Earth system model.
+- [pastas](https://github.com/pastas/pastas) - Groundwater time series.
+"""
+
+
+@pytest.fixture
+def running(tmp_path):
+    """A daemon serving in a thread, with its state file."""
+    service = KhcService(ttl=600)
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), daemon._make_handler(service, "secret"))
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    state_path = tmp_path / "serve.json"
+    state_path.write_text(json.dumps({"url": f"http://127.0.0.1:{httpd.server_port}", "token": "secret"}))
+    yield service, state_path
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_file_cache_recomputes_when_a_file_changes(tmp_path):
+    path = tmp_path / "list.md"
+    path.write_text("a")
+    cache = FileCache()
+    calls = []
+    compute = lambda: calls.append(path.read_text()) or len(calls)
+
+    assert cache.get("key", [path], compute) == 1
+    assert cache.get("key", [path], compute) == 1
+    path.write_text("ab")
+    os.utime(path, ns=(0, 0))
+    assert cache.get("key", [path], compute) == 2
+    assert calls == ["a", "ab"]
+
+
+def test_validate_is_answered_from_the_warm_cache(running, tmp_path):
+    service, state_path = running
+    readme = tmp_path / "README.md"
+    readme.write_text(LIST, encoding="utf-8")
+
+    for _ in range(2):
+        assert call_daemon("/validate", {"path": str(readme)}, state_path) == {"rubrics": 1, "entries": 2}
+    assert len(service.files.values) == 1
+    assert call_daemon("/health", state_path=state_path)["cached_files"] == 1
+
+
+def test_repository_summaries_are_cached_for_the_ttl(running, monkeypatch):
+    service, state_path = running
+    calls = []
+    monkeypatch.setattr(daemon, "repo_summary", lambda client, name: calls.append(name) or {"name": name})
+    monkeypatch.setattr(KhcService, "github_client", None)
+
+    assert call_daemon("/repo", {"name": "Owner/Repo"}, state_path) == {"name": "Owner/Repo"}
+    assert call_daemon("/repo", {"name": "owner/repo/"}, state_path) == {"name": "Owner/Repo"}
+    assert calls == ["Owner/Repo"]
+    assert (service.hits, service.misses) == (1, 1)
+
+
+def test_errors_are_raised_by_the_client(running, tmp_path):
+    _, state_path = running
+    with pytest.raises(DaemonError, match="does not exist"):
+        call_daemon("/validate", {"path": str(tmp_path / "missing.md")}, state_path)
+    with pytest.raises(DaemonError, match="Missing parameter"):
+        call_daemon("/validate", state_path=state_path)
+    with pytest.raises(DaemonError, match="Unknown endpoint"):
+        call_daemon("/unknown", state_path=state_path)
+
+
+def test_requests_without_the_token_are_refused(running, tmp_path):
+    _, state_path = running
+    state = json.loads(state_path.read_text())
+    forged = tmp_path / "forged.json"
+    forged.write_text(json.dumps(dict(state, token="guess")))
+    with pytest.raises(DaemonError, match="Invalid token"):
+        call_daemon("/health", state_path=forged)
+
+
+def test_no_daemon_falls_back_to_local_work(tmp_path):
+    assert call_daemon("/health", state_path=tmp_path / "serve.json") is None
+    # Stale state file of a daemon that is not running anymore
+    stale = tmp_path / "stale.json"
+    stale.write_text(json.dumps({"url": "http://127.0.0.1:9", "token": "secret"}))
+    assert call_daemon("/health", state_path=stale, timeout=5) is None
+
+
+def test_answers_that_are_not_json_fall_back_to_local_work(tmp_path):
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), SimpleHTTPRequestHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    state_path = tmp_path / "serve.json"
+    state_path.write_text(json.dumps({"url": f"http://127.0.0.1:{httpd.server_port}", "token": "secret"}))
+    try:
+        assert call_daemon("/health", state_path=state_path) is None
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+
+
+def test_serve_refuses_to_start_next_to_a_live_daemon(running):
+    _, state_path = running
+    state = state_path.read_text()
+    with pytest.raises(FileExistsError, match="already running"):
+        daemon.serve(port=0, state_path=state_path)
+    assert state_path.read_text() == state
+
+
+def _stop_when_ready(urls, then=lambda url: None):
+    def on_ready(url):
+        urls.append(url)
+        then(url)
+        raise KeyboardInterrupt
+    return on_ready
+
+
+def test_serve_removes_only_its_own_state_file(tmp_path):
+    state_path = tmp_path / "serve.json"
+    # Stale file of a daemon that is not running anymore: taken over
+    state_path.write_text(json.dumps({"url": "http://127.0.0.1:9", "token": "old"}))
+    urls = []
+    with pytest.raises(KeyboardInterrupt):
+        daemon.serve(port=0, state_path=state_path, on_ready=_stop_when_ready(urls))
+    assert not urls[0].endswith(":0") and not state_path.exists()
+
+    # Another daemon wrote its own state file meanwhile: it is kept
+    other = {"url": "http://127.0.0.1:9", "token": "other"}
+    with pytest.raises(KeyboardInterrupt):
+        daemon.serve(port=0, state_path=state_path,
+                     on_ready=_stop_when_ready(urls, lambda url: state_path.write_text(json.dumps(other))))
+    assert json.loads(state_path.read_text()) == other
+
+
+def test_serve_command_prints_the_bound_port(tmp_path, monkeypatch):
+    from typer.testing import CliRunner
+    from khc_cli.main import app
+
+    serve = daemon.serve
+    monkeypatch.setattr(daemon, "serve", lambda host, port, key, ttl, on_ready: serve(
+        host, port, key, ttl, tmp_path / "serve.json", _stop_when_ready([], on_ready)))
+    result = CliRunner().invoke(app, ["serve", "--port", "0"])
+    assert result.exit_code == 0
+    assert "Serving on http://127.0.0.1:" in result.output and ":0," not in result.output
+    assert "Daemon stopped" in result.output
@@ -0,0 +1,91 @@
+import json
+from datetime import datetime, timezone
+
+import requests
+
+from khc_cli.utils import discovery
+from khc_cli.utils.discovery import (
+    DiscoveryCache, build_queries, candidate_entry, rank_candidates, search_repositories
+)
+
+NOW = datetime(2024, 6, 1, tzinfo=timezone.utc)
+
+
+def test_build_queries_quotes_multi_word_keywords():
+    queries = build_queries(["climate-change"], ["carbon footprint", "pvlib"], language="Python", min_stars=10)
+    qualifiers = "fork:false archived:false language:Python stars:>=10"
+    assert queries == [
+        f"topic:climate-change {qualifiers}",
+        f'"carbon footprint" in:name,description,topics {qualifiers}',
+        f"pvlib in:name,description,topics {qualifiers}",
+    ]
+
+
+class FakeSearch:
+    """Answers search requests with ``total`` results, one page of 100 at a time."""
+
+    def __init__(self, monkeypatch, total):
+        self.total = total
+        self.sent = []
+        monkeypatch.setattr(requests.Session, "request", lambda session, *args, **kwargs: self.http(*args, **kwargs))
+
+    def http(self, method, url, params=None, **kwargs):
+        self.sent.append(dict(params))
+        start = (params["page"] - 1) * params["per_page"]
+        items = [
+            {"full_name": f"Owner/repo{i}", "html_url": f"https://github.com/Owner/repo{i}",
+             "stargazers_count": i, "pushed_at": "2024-05-01T00:00:00Z", "private": False}
+            for i in range(start, min(start + params["per_page"], self.total))
+        ]
+        response = requests.Response()
+        response.status_code = 200
+        response.url = url
+        response._content = json.dumps({"total_count": self.total, "items": items}).encode()
+        return response
+
+
+def test_search_fetches_every_page_and_caches_candidates(monkeypatch, tmp_path):
+    search = FakeSearch(monkeypatch, total=250)
+    cache = DiscoveryCache(tmp_path / "cache.json")
+
+    assert search_repositories(["topic:energy"], "token", cache) == 3
+    assert sorted(params["page"] for params in search.sent) == [1, 2, 3]
+    assert len(cache.candidates) == 250
+    assert set(cache.candidates["owner/repo7"]) == set(discovery.CANDIDATE_FIELDS)
+
+    cache.save()
+    assert DiscoveryCache(tmp_path / "cache.json").candidates == cache.candidates
+
+
+def test_next_search_only_asks_for_repositories_pushed_since(monkeypatch):
+    search = FakeSearch(monkeypatch, total=5)
+    cache = DiscoveryCache()
+    search_repositories(["topic:energy"], "token", cache)
+    search_repositories(["topic:energy"], "token", cache)
+    search_repositories(["topic:energy"], "token", cache, full=True)
+
+    assert [params["q"].split(" pushed:")[0] for params in search.sent] == ["topic:energy"] * 3
+    assert [" pushed:>" in params["q"] for params in search.sent] == [False, True, False]
+
+
+def test_search_stops_at_the_api_result_cap(monkeypatch):
+    search = FakeSearch(monkeypatch, total=5000)
+    assert search_repositories(["topic:energy"], "token", DiscoveryCache()) == discovery.MAX_RESULTS // discovery.PER_PAGE
+
+
+def test_rank_skips_listed_repositories_and_favours_recent_activity():
+    candidates = {
+        "a/listed": {"full_name": "a/listed", "stargazers_count": 5000, "pushed_at": "2024-05-01T00:00:00Z"},
+        "b/idle": {"full_name": "b/idle", "stargazers_count": 1000, "pushed_at": "2019-01-01T00:00:00Z"},
+        "c/active": {"full_name": "c/active", "stargazers_count": 100, "pushed_at": "2024-05-20T00:00:00Z"},
+        "d/never": {"full_name": "d/never", "stargazers_count": 100, "pushed_at": None},
+    }
+    ranked = rank_candidates(candidates, {"a/listed"}, now=NOW)
+    assert [candidate["full_name"] for candidate in ranked] == ["c/active", "b/idle", "d/never"]
+    assert [candidate["full_name"] for candidate in rank_candidates(candidates, set(), now=NOW, top=1)] == ["a/listed"]
+
+
+def test_candidate_entry():
+    candidate = {"full_name": "owner/tool", "html_url": "https://github.com/owner/tool", "description": " Solar. "}
+    assert candidate_entry(candidate) == "* [tool](https://github.com/owner/tool) - Solar."
+    assert candidate_entry(dict(candidate, description=None)).endswith("- No description")
@@ -0,0 +1,109 @@
+import base64
+import csv
+import json
+import re
+from types import SimpleNamespace
+
+import pytest
+import requests
+from github import Github
+
+from khc_cli.awesomecure.awesome2py import AwesomeList
+from khc_cli.commands import etl
+
+# Ten repositories of five organizations
+LIST = "# Awesome Test\n\n## Contents\n\n- [Energy](#energy)\n\n## Energy\n\n" + "".join(
+    f"- [repo{i}](https://github.com/org{i // 2}/repo{i}) - Project {i}.\n" for i in range(10)
+)
+
+
+class FakeGitHub:
+    """Stands in for the GitHub REST and GraphQL APIs and counts the requests sent."""
+
+    def __init__(self, monkeypatch, tmp_path):
+        self.readme = tmp_path / "list.md"
+        self.readme.write_text(LIST, encoding="utf-8")
+        self.requests = []
+        monkeypatch.setenv("GITHUB_API_KEY", "token")
+        monkeypatch.setattr(etl, "fetch_awesome_readme_content", self.fetch_list)
+        monkeypatch.setattr(Github, "get_repo", lambda g, repo_path: self.get_repo(repo_path))
+        monkeypatch.setattr(Github, "get_organization", lambda g, login: self.get_organization(login))
+        monkeypatch.setattr(requests.Session, "request", lambda session, *args, **kwargs: self.http(*args, **kwargs))
+
+    def fetch_list(self, g, awesome_repo_path, readme_filename, local_readme_path, lazy=False):
+        return AwesomeList(str(self.readme), lazy=lazy)
+
+    def get_repo(self, repo_path):
+        self.requests.append(("repo", repo_path))
+        owner = repo_path.split("/")[0]
+        return SimpleNamespace(raw_data={
+            "full_name": repo_path, "owner": {"login": owner, "type": "Organization"},
+            "stargazers_count": 10, "pushed_at": "2024-05-01T00:00:00Z", "updated_at": "2024-05-01T00:00:00Z",
+        })
+
+    def get_organization(self, login):
+        self.requests.append(("organization", login))
+        return SimpleNamespace(raw_data={"login": login, "name": login, "html_url": f"https://github.com/{login}"})
+
+    def http(self, method, url, **kwargs):
+        self.requests.append((method, url))
+        if url.endswith("/graphql"):
+            repos = re.findall(r"(r\d+): repository", kwargs["json"]["query"])
+            body = {"data": {"rateLimit": {"cost": 1, "remaining": 4999, "resetAt": "2030-01-01T00:00:00Z"},
+                             **{alias: {"openIssues": {"totalCount": 3}, "latestRelease": {"tagName": "v1"}} for alias in repos}}}
+        else:
+            body = {"sha": url, "content": base64.b64encode(f"# {url}".encode()).decode()}
+        response = requests.Response()
+        response.status_code = 200
+        response.url = url
+        response._content = json.dumps(body).encode()
+        return response
+
+
+@pytest.fixture
+def github(monkeypatch, tmp_path):
+    return FakeGitHub(monkeypatch, tmp_path)
+
+
+def run(tmp_path, budget):
+    etl.run_etl_pipeline(
+        "https://github.com/owner/list", "README.md", tmp_path / "cache.md",
+        tmp_path / "projects.csv", tmp_path / "orgs.csv", None,
+        snapshot_dir=tmp_path / "snapshots", repo_index_path=tmp_path / "repo-index.json",
+        budget=budget, schedule_path=tmp_path / "schedule.json",
+        readme_store_dir=tmp_path / "readmes", issue_metrics=True,
+    )
+    with open(tmp_path / "projects.csv", newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def test_budget_bounds_the_requests_of_every_stage(github, tmp_path):
+    rows = run(tmp_path, budget=10)
+
+    assert len(github.requests) <= 10
+    fetched = [path for kind, path in github.requests if kind == "repo"]
+    # Two repositories of org0 (4 + 2 requests), one of org1 (3 requests)
+    assert fetched == ["org0/repo0", "org0/repo1", "org1/repo2"]
+    assert [kind for kind, _ in github.requests].count("POST") == 1
+
+    # All entries are written, the deferred ones without enrichment
+    assert len(rows) == 10
+    enriched = {row["project_name"] for row in rows if row["stargazers_count"]}
+    assert enriched == {"repo0", "repo1", "repo2"}
+    assert all(row["open_issues"] == "3" for row in rows if row["project_name"] in enriched)
+    assert all(row["last_release_tag_name"] == "v1" for row in rows if row["project_name"] in enriched)
+    schedule = json.loads((tmp_path / "schedule.json").read_text())
+    assert sorted(schedule) == ["org0/repo0", "org0/repo1", "org1/repo2"]
+    assert {state["release"] for state in schedule.values()} == {"v1"}
+
+
+def test_deferred_repositories_come_first_in_the_next_run(github, tmp_path):
+    run(tmp_path, budget=10)
+    github.requests.clear()
+    rows = run(tmp_path, budget=10)
+
+    fetched = [path for kind, path in github.requests if kind == "repo"]
+    assert fetched == ["org1/repo3", "org2/repo4", "org2/repo5"]
+    assert len(github.requests) <= 10
+    # Repositories refreshed by the first run keep their payload
+    assert sum(1 for row in rows if row["stargazers_count"]) == 6
@@ -0,0 +1,180 @@
+import csv
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from khc_cli.awesomecure.awesome2py import AwesomeList
+from khc_cli.commands import etl
+from khc_cli.utils import canonical
+from khc_cli.utils.forges import (
+    ForgeAdapter, ForgeBatcher, GiteaAdapter, GitLabAdapter, forge_instance, transform_forge_payload
+)
+
+GITLAB_PROJECTS = {
+    "group/sub/project": {
+        "fullPath": "group/sub/project", "starCount": 12, "createdAt": "2020-01-01T00:00:00Z",
+        "lastActivityAt": "2024-05-01T00:00:00Z", "archived": False, "topics": ["energy"],
+        "namespace": {"fullPath": "group/sub"}, "group": {"fullName": "Group / Sub", "webUrl": "u"},
+        "languages": [{"name": "C", "share": 20.0}, {"name": "Python", "share": 80.0}],
+    },
+}
+GITEA_REPOS = {
+    "owner/repo": {"owner": {"login": "owner"}, "stars_count": 3, "created_at": "2021-01-01T00:00:00Z",
+                   "topics": ["solar"], "archived": False},
+}
+
+
+class ForgeHandler(BaseHTTPRequestHandler):
+    """A GitLab instance under /gitlab and a Gitea instance under /gitea."""
+
+    requests = []
+    not_modified = 0
+
+    def log_message(self, *args):
+        pass
+
+    def answer(self, status, body, etag=None):
+        content = json.dumps(body).encode()
+        self.send_response(status)
+        if etag:
+            self.send_header("ETag", etag)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.requests.append(("POST", self.path, body["variables"]))
+        if self.path != "/gitlab/api/graphql":
+            return self.answer(404, {})
+        nodes = [GITLAB_PROJECTS[path] for path in body["variables"]["paths"] if path in GITLAB_PROJECTS]
+        self.answer(200, {"data": {"projects": {"nodes": nodes}}})
+
+    def do_GET(self):
+        self.requests.append(("GET", self.path, self.headers.get("Authorization")))
+        repo_path = self.path.removeprefix("/gitea/api/v1/repos/")
+        if repo_path in GITEA_REPOS:
+            etag = f'"{repo_path}"'
+            if self.headers.get("If-None-Match") == etag:
+                ForgeHandler.not_modified += 1
+                self.send_response(304)
+                self.end_headers()
+                return
+            return self.answer(200, GITEA_REPOS[repo_path], etag)
+        self.answer(404, {"message": "Not found"})
+
+
+@pytest.fixture
+def server():
+    ForgeHandler.requests = []
+    ForgeHandler.not_modified = 0
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), ForgeHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_forge_instance_keeps_scheme_and_sub_path():
+    assert forge_instance("git.example.org") == ("git.example.org", "https://git.example.org")
+    assert forge_instance("http://Example.org/gitlab/") == ("example.org/gitlab", "http://Example.org/gitlab")
+
+
+def test_adapter_fetch_is_abstract():
+    with pytest.raises(TypeError):
+        ForgeAdapter("https://example.org")
+
+
+def test_gitlab_adapter_batches_full_paths(server):
+    adapter = GitLabAdapter(f"http://{server}/gitlab")
+    payloads = adapter.fetch(["group/sub/project", "group/missing"])
+    adapter.close()
+
+    assert payloads == {"group/sub/project": GITLAB_PROJECTS["group/sub/project"], "group/missing": None}
+    assert ForgeHandler.requests == [
+        ("POST", "/gitlab/api/graphql", {"paths": ["group/sub/project", "group/missing"], "first": 2})
+    ]
+    columns = transform_forge_payload({"kind": "gitlab", "project": payloads["group/sub/project"]},
+                                      "2024-06-01T00:00:00Z")
+    assert columns["languages"] == "Python,C"
+    assert columns["project_age_in_days"] == 1613
+
+
+def test_gitea_adapter_maps_404_to_none(server):
+    adapter = GiteaAdapter(f"http://{server}/gitea", token="secret")
+    assert adapter.fetch(["owner/repo", "owner/missing"]) == {"owner/repo": GITEA_REPOS["owner/repo"],
+                                                              "owner/missing": None}
+    adapter.close()
+    assert ForgeHandler.requests[0] == ("GET", "/gitea/api/v1/repos/owner/repo", "token secret")
+
+
+def test_batcher_resolves_results_per_instance(server):
+    batcher = ForgeBatcher({f"http://{server}/gitlab": "gitlab", f"http://{server}/gitea": "gitea"})
+    gitlab, _ = forge_instance(f"http://{server}/gitlab")
+    found = batcher.submit(gitlab, "group/sub/project")
+    missing = batcher.submit(gitlab, "group/missing")
+    repo = batcher.submit(forge_instance(f"http://{server}/gitea")[0], "owner/repo")
+
+    assert found.result() == {"kind": "gitlab", "project": GITLAB_PROJECTS["group/sub/project"]}
+    with pytest.raises(LookupError):
+        missing.result()
+    assert repo.result()["kind"] == "gitea"
+    # One GraphQL query for both GitLab projects
+    assert [method for method, _, _ in ForgeHandler.requests].count("POST") == 1
+    assert batcher.clone_url(gitlab, "group/sub/project") == f"http://{server}/gitlab/group/sub/project.git"
+    batcher.close()
+
+    # The instances are known to the batcher only
+    assert batcher.forges[gitlab] == "gitlab"
+    assert canonical.NESTED_PLATFORMS == {"gitlab.com", "framagit.org"}
+    assert canonical.FLAT_PLATFORMS == {"github.com", "codeberg.org"}
+
+
+def test_batcher_shares_its_client_and_caches_payloads(server, tmp_path):
+    gitlab, _ = forge_instance(f"http://{server}/gitlab")
+    gitea, _ = forge_instance(f"http://{server}/gitea")
+    forges = {f"http://{server}/gitlab": "gitlab", f"http://{server}/gitea": "gitea"}
+    batcher = ForgeBatcher(forges, cache_path=tmp_path / "forge-cache.json")
+    # Both instances are served by the same host
+    assert batcher.adapter(gitlab).client is batcher.adapter(gitea).client is batcher.client
+    assert batcher.adapter(gitlab).limiter is batcher.adapter(gitea).limiter
+
+    # A repository listed twice is looked up once per run
+    assert batcher.submit(gitea, "owner/repo").result()["project"] == GITEA_REPOS["owner/repo"]
+    assert batcher.submit(gitea, "owner/repo").result()["project"] == GITEA_REPOS["owner/repo"]
+    assert len(ForgeHandler.requests) == 1
+    batcher.close()
+
+    # The next run sends a conditional request and reuses the cached payload
+    batcher = ForgeBatcher(forges, cache_path=tmp_path / "forge-cache.json")
+    assert batcher.submit(gitea, "owner/repo").result()["project"] == GITEA_REPOS["owner/repo"]
+    batcher.close()
+    assert len(ForgeHandler.requests) == 2 and ForgeHandler.not_modified == 1
+
+
+def test_etl_writes_entry_only_rows_when_a_forge_lookup_fails(server, monkeypatch, tmp_path):
+    readme = tmp_path / "list.md"
+    readme.write_text(
+        "# Awesome Test\n\n## Contents\n\n- [Energy](#energy)\n\n## Energy\n\n"
+        f"- [project](http://{server}/gitlab/group/sub/project) - Found.\n"
+        f"- [missing](http://{server}/gitlab/group/missing) - Not found.\n"
+        f"- [broken](http://{server}/broken/owner/repo) - Instance error.\n",
+        encoding="utf-8",
+    )
+    monkeypatch.setenv("GITHUB_API_KEY", "token")
+    monkeypatch.setattr(etl, "fetch_awesome_readme_content", lambda *args, lazy=False: AwesomeList(str(readme), lazy=lazy))
+    etl.run_etl_pipeline(
+        "https://github.com/owner/list", "README.md", tmp_path / "cache.md",
+        tmp_path / "projects.csv", tmp_path / "orgs.csv", None,
+        forges={f"http://{server}/gitlab": "gitlab", f"http://{server}/broken": "gitea"},
+    )
+
+    with open(tmp_path / "projects.csv", newline="", encoding="utf-8") as f:
+        rows = {row["project_name"]: row for row in csv.DictReader(f)}
+    assert set(rows) == {"project", "missing", "broken"}
+    assert rows["project"]["stargazers_count"] == "12"
+    assert rows["missing"]["stargazers_count"] == rows["broken"]["stargazers_count"] == ""
@@ -0,0 +1,67 @@
+import os
+import subprocess
+from datetime import datetime, timezone
+
+import pytest
+
+from khc_cli.utils.git_metrics import GitMetricsEngine, mirror_path, refresh_and_measure
+
+REFERENCE_DATE = datetime(2024, 6, 1, tzinfo=timezone.utc)
+
+
+def commit(repo, author, date, message):
+    env = dict(
+        os.environ,
+        GIT_AUTHOR_NAME=author, GIT_AUTHOR_EMAIL=f"{author}@example.org", GIT_AUTHOR_DATE=date,
+        GIT_COMMITTER_NAME=author, GIT_COMMITTER_EMAIL=f"{author}@example.org", GIT_COMMITTER_DATE=date,
+    )
+    with open(repo / "history.txt", "a") as f:
+        f.write(message + "\n")
+    subprocess.run(["git", "add", "history.txt"], cwd=repo, env=env, check=True, capture_output=True)
+    subprocess.run(["git", "commit", "-q", "-m", message], cwd=repo, env=env, check=True, capture_output=True)
+
+
+@pytest.fixture
+def fixture_repo(tmp_path):
+    repo = tmp_path / "upstream"
+    repo.mkdir()
+    subprocess.run(["git", "init", "-q", "-b", "main", str(repo)], check=True)
+    commit(repo, "alice", "2022-01-10T12:00:00+00:00", "first")
+    commit(repo, "alice", "2023-03-01T12:00:00+00:00", "second")
+    commit(repo, "bob", "2023-09-01T12:00:00+00:00", "third")
+    commit(repo, "alice", "2024-05-01T12:00:00+00:00", "fourth")
+    return repo
+
+
+def test_refresh_and_measure_clones_and_computes_metrics(tmp_path, fixture_repo):
+    metrics = refresh_and_measure(tmp_path / "cache", "owner/Repo", str(fixture_repo), REFERENCE_DATE)
+
+    assert (mirror_path(tmp_path / "cache", "owner/Repo") / "HEAD").exists()
+    assert metrics == {
+        "total_number_of_commits": 4,
+        "total_commits_last_year": 2,
+        "last_commit_date": "2024-05-01T12:00:00+00:00",
+        "development_distribution_score": 0.25,
+        "contributors": 2,
+    }
+
+
+def test_refresh_fetches_new_commits_into_the_existing_clone(tmp_path, fixture_repo):
+    cache = tmp_path / "cache"
+    refresh_and_measure(cache, "owner/repo", str(fixture_repo), REFERENCE_DATE)
+    commit(fixture_repo, "carol", "2024-05-20T12:00:00+00:00", "fifth")
+
+    metrics = refresh_and_measure(cache, "owner/repo", str(fixture_repo), REFERENCE_DATE)
+    assert metrics["total_number_of_commits"] == 5
+    assert metrics["contributors"] == 3
+    assert metrics["last_commit_date"] == "2024-05-20T12:00:00+00:00"
+
+
+def test_engine_computes_several_repositories_and_reports_failures(tmp_path, fixture_repo):
+    with GitMetricsEngine(tmp_path / "cache", processes=2) as engine:
+        metrics = engine.compute(
+            [("owner/repo", str(fixture_repo)), ("owner/missing", str(tmp_path / "missing"))],
+            REFERENCE_DATE,
+        )
+    assert metrics["owner/repo"]["total_number_of_commits"] == 4
+    assert metrics["owner/missing"] is None
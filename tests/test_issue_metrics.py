@@ -0,0 +1,107 @@
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+from khc_cli.utils.issue_metrics import (
+    LAST_CLOSED_SAMPLE, IssueMetricsBatcher, build_query, load_query_stats, transform_issue_metrics
+)
+
+SINCE = datetime(2023, 6, 1, tzinfo=timezone.utc)
+
+
+def repository_node(closed_at):
+    return {
+        "openIssues": {"totalCount": 4}, "closedIssues": {"totalCount": 40},
+        "openPullRequests": {"totalCount": 1}, "closedPullRequests": {"totalCount": 12},
+        "goodFirstIssues": {"totalCount": 2},
+        "lastClosed": {"nodes": [{"closedAt": date} for date in closed_at]},
+        "latestRelease": {"tagName": "v1.2.0", "publishedAt": "2024-04-01T00:00:00Z"},
+    }
+
+
+class FakeGraphQL:
+    def __init__(self, data):
+        self.data = data
+        self.queries = []
+
+    def graphql(self, url, query, variables=None, limiter=None):
+        self.queries.append(query)
+        return self.data
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def batcher(tmp_path):
+    batcher = IssueMetricsBatcher("token", batch_size=2, stats_path=tmp_path / "stats.json")
+    batcher.client.close()
+    return batcher
+
+
+def test_build_query_aliases_each_repository():
+    query = build_query(["owner/one", "owner/two"], SINCE)
+    assert query.startswith("query {\n  rateLimit { cost remaining resetAt }")
+    assert 'r0: repository(owner: "owner", name: "one")' in query
+    assert 's1: search(query: "repo:owner/two is:issue is:closed closed:>=2023-06-01", type: ISSUE' in query
+    assert f"lastClosed: issues(states: CLOSED, first: {LAST_CLOSED_SAMPLE}" in query
+    assert '["good first issue", "good-first-issue", "Good First Issue"]' in query
+
+
+def test_fetch_parses_counts_and_the_latest_closing_date(batcher):
+    batcher.client = FakeGraphQL({
+        "rateLimit": {"cost": 3, "remaining": 4000, "resetAt": "2030-01-01T00:00:00Z"},
+        # The most recently updated closed issue is not the last one closed
+        "r0": repository_node(["2021-03-01T00:00:00Z", "2024-05-02T10:00:00Z", None]),
+        "s0": {"issueCount": 9},
+        "r1": None,
+    })
+    metrics = batcher.fetch(["owner/one", "owner/missing"])
+    assert metrics == {
+        "owner/one": {
+            "open_issues": 4, "closed_issues": 40, "open_pullrequests": 1, "closed_pullrequests": 12,
+            "good_first_issue": 2, "issues_closed_last_year": 9, "last_issue_closed": "2024-05-02T10:00:00Z",
+            "last_release_tag_name": "v1.2.0", "last_released_date": "2024-04-01T00:00:00Z",
+        },
+        "owner/missing": None,
+    }
+    assert batcher.stats == {"queries": 1, "repositories": 1, "cost": 3, "remaining": 4000}
+
+
+def test_results_are_resolved_per_batch(batcher):
+    batcher.client = FakeGraphQL({"r0": repository_node([]), "s0": {"issueCount": 0}, "r1": None})
+    found = batcher.submit("owner/one")
+    missing = batcher.submit("owner/missing")
+    # The second submission filled the batch
+    assert len(batcher.client.queries) == 1
+    assert found.result()["last_issue_closed"] is None
+    with pytest.raises(LookupError):
+        missing.result()
+
+
+def test_waits_for_the_reset_when_points_run_out(batcher, monkeypatch):
+    drained = []
+    monkeypatch.setattr(batcher.limiter, "drain", drained.append)
+    batcher._account({"cost": 1, "remaining": 10, "resetAt": "2030-01-01T00:00:00Z"})
+    assert drained == [datetime(2030, 1, 1, tzinfo=timezone.utc).timestamp() + 1]
+    batcher._account({"cost": 1, "remaining": 1000, "resetAt": "2030-01-01T00:00:00Z"})
+    assert len(drained) == 1
+
+
+def test_measured_cost_is_saved_for_the_planner(batcher, tmp_path):
+    batcher.close()
+    assert load_query_stats(tmp_path / "stats.json") is None
+
+    batcher.stats.update(queries=2, cost=6)
+    batcher.close()
+    assert json.loads((tmp_path / "stats.json").read_text())["cost"] == 6
+    assert load_query_stats(tmp_path / "stats.json")["batch_size"] == 2
+
+
+def test_transform_issue_metrics():
+    columns = transform_issue_metrics({"open_issues": 4, "last_issue_closed": "2024-05-02T00:00:00Z"},
+                                      "2024-06-01T00:00:00+00:00")
+    assert columns["open_issues"] == 4
+    assert columns["days_until_last_issue_closed"] == 30
+    assert transform_issue_metrics(None) == {}
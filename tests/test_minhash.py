@@ -0,0 +1,61 @@
+import pytest
+
+from khc_cli.utils.minhash import (
+    MinHasher, SignatureIndex, entry_features, estimated_similarity, find_duplicate_clusters,
+)
+
+
+def entry(name, text, url):
+    return {"name": name, "text": text, "url": url, "rubric": "Energy"}
+
+
+ENTRIES = [
+    entry("pvlib", "- A set of functions and classes for simulating the performance of photovoltaic energy systems.",
+          "https://github.com/pvlib/pvlib-python"),
+    entry("pvlib", "- A set of functions and classes for simulating the performance of photovoltaic energy systems in Python.",
+          "https://github.com/someone/pvlib-fork"),
+    entry("windpowerlib", "- A library to model the output of wind farms.", "https://github.com/wind-python/windpowerlib"),
+    entry("pastas", "- Analysis of groundwater time series.", "https://github.com/pastas/pastas"),
+    entry("Pastas docs", "- Documentation.", "https://github.com/Pastas/pastas/tree/main/docs"),
+]
+
+
+def test_signatures_estimate_jaccard_similarity():
+    hasher = MinHasher(num_perm=256)
+    a = {f"feature {i}" for i in range(100)}
+    b = {f"feature {i}" for i in range(50, 150)}
+    assert hasher.signature(a) == hasher.signature(set(a))
+    assert estimated_similarity(hasher.signature(a), hasher.signature(a)) == 1
+    # True Jaccard similarity: 50 / 150
+    assert estimated_similarity(hasher.signature(a), hasher.signature(b)) == pytest.approx(1 / 3, abs=0.1)
+
+
+def test_features_use_the_canonical_repository():
+    features = entry_features("pvlib", "- Solar.", "https://github.com/PVLib/pvlib-python.git")
+    assert "repo:github.com/pvlib/pvlib-python" in features
+    assert "repo-name:pvlib-python" in features
+
+
+def test_near_duplicates_and_same_repository_entries_are_clustered(tmp_path):
+    clusters, stats = find_duplicate_clusters(ENTRIES, threshold=0.5, index_path=tmp_path / "index.json")
+    assert sorted(sorted(cluster) for cluster in clusters) == [[0, 1], [3, 4]]
+    assert stats["hashed"] == len(ENTRIES)
+
+
+def test_signature_index_only_hashes_new_entries(tmp_path):
+    index_path = tmp_path / "index.json"
+    find_duplicate_clusters(ENTRIES[:3], index_path=index_path)
+    _, stats = find_duplicate_clusters(ENTRIES, index_path=index_path)
+    assert stats["hashed"] == 2
+
+
+def test_signature_index_is_dropped_when_parameters_change(tmp_path):
+    index_path = tmp_path / "index.json"
+    find_duplicate_clusters(ENTRIES, index_path=index_path, num_perm=64)
+    index = SignatureIndex(index_path, MinHasher(num_perm=32))
+    assert index.signatures == {}
+
+
+def test_bands_must_divide_the_permutations():
+    with pytest.raises(ValueError):
+        find_duplicate_clusters(ENTRIES, bands=5, num_perm=64)
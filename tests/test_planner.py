@@ -0,0 +1,100 @@
+from types import SimpleNamespace
+
+from khc_cli.utils.planner import CLONE_SECONDS, estimate_stages, project_runtime, scan_entries
+
+
+class StubList:
+    def __init__(self, urls):
+        self.urls = urls
+
+    def iter_entries(self):
+        for url in self.urls:
+            yield "Rubric", SimpleNamespace(url=url), 0
+
+
+def test_scan_entries_deduplicates_like_the_etl():
+    scan = scan_entries(StubList([
+        "https://github.com/owner/a",
+        "https://github.com/Owner/A/tree/main",
+        "https://github.com/owner/b",
+        "https://github.com/other/c",
+        "https://gitlab.com/group/project",
+        "https://example.org/docs",
+    ]))
+    assert scan["entries"] == 6
+    assert scan["unique"] == 5
+    assert scan["github"] == ["owner/a", "owner/b", "other/c"]
+    assert scan["other"] == 2
+    assert scan["owners"] == 2
+    assert scan["forges"] == {"gitlab.com": {"kind": "gitlab", "keys": ["gitlab.com/group/project"]}}
+
+
+def test_self_hosted_forges_get_their_own_stage(tmp_path):
+    urls = [f"https://git.example.org/group/sub/project{i}" for i in range(60)]
+    urls += ["http://example.org/gitea/owner/repo", "https://codeberg.org/owner/repo"]
+    forges = {"git.example.org": "gitlab", "http://example.org/gitea": "gitea"}
+    scan = scan_entries(StubList(urls), forges=forges)
+    assert scan["unique"] == 62
+    assert {platform: len(forge["keys"]) for platform, forge in scan["forges"].items()} == {
+        "git.example.org": 60, "example.org/gitea": 1, "codeberg.org": 1,
+    }
+
+    stages = estimate_stages(scan, readme_requests=0, git_cache_dir=tmp_path)
+    requests = {stage["bucket"]: stage["requests"] for stage in stages if stage["bucket"] != "core"}
+    # GitLab projects are looked up 50 at a time, Gitea ones one by one
+    assert requests == {"git.example.org": 2, "example.org/gitea": 1, "codeberg.org": 1, "git": 0}
+    assert stages[-1]["seconds"] == 62 * CLONE_SECONDS
+
+    # Without the forges, the self-hosted entries are not enriched
+    assert set(scan_entries(StubList(urls)).get("forges")) == {"codeberg.org"}
+
+
+def test_estimate_stages_counts_requests_per_bucket():
+    stages = estimate_stages({"github": ["a/b", "c/d"], "owners": 2}, readme_requests=2)
+    assert [(stage["bucket"], stage["requests"]) for stage in stages] == [("core", 2), ("core", 2), ("core", 2)]
+
+
+def test_runtime_fits_in_the_quota():
+    stages = [{"name": "metadata", "bucket": "core", "requests": 100}]
+    buckets, seconds = project_runtime(stages, latency=0.5, concurrency=2)
+    assert buckets["core"]["fits"]
+    assert seconds == 25
+
+
+def test_runtime_waits_for_the_next_windows_beyond_the_quota():
+    stages = [{"name": "metadata", "bucket": "core", "requests": 12000}]
+    buckets, _ = project_runtime(stages, latency=0.0)
+    assert not buckets["core"]["fits"]
+    # 5000 requests now, 5000 after one window, the rest after a second one
+    assert buckets["core"]["wait"] == 2 * 3600
+
+    buckets, _ = project_runtime(stages, tokens=3, latency=0.0)
+    assert buckets["core"]["fits"]
+
+
+def test_git_stage_runs_alongside_the_api():
+    stages = [
+        {"name": "metadata", "bucket": "core", "requests": 10},
+        {"name": "clones", "bucket": "git", "requests": 0, "seconds": 400.0},
+    ]
+    buckets, seconds = project_runtime(stages, latency=1.0, git_processes=4)
+    assert buckets["git"]["seconds"] == 100
+    assert seconds == 100
+
+
+def test_graphql_stage_is_counted_in_measured_points(tmp_path):
+    scan = {"github": [f"owner/repo{i}" for i in range(100)], "owners": 1}
+    stats_path = tmp_path / "issue-metrics-stats.json"
+    stage = estimate_stages(scan, issue_metrics=True, issue_stats_path=stats_path)[-1]
+    assert (stage["bucket"], stage["requests"], stage["cost"]) == ("graphql", 5, 5)
+    assert "estimated" in stage["name"]
+
+    stats_path.write_text('{"queries": 4, "cost": 1200}')
+    stage = estimate_stages(scan, issue_metrics=True, issue_stats_path=stats_path)[-1]
+    assert (stage["requests"], stage["cost"]) == (5, 1500)
+    assert "300 points per query measured" in stage["name"]
+
+    # The quota is checked against the points, not the number of queries
+    buckets, _ = project_runtime([dict(stage, cost=6000)], latency=0.0)
+    assert buckets["graphql"]["requests"] == 5
+    assert not buckets["graphql"]["fits"]
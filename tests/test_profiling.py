@@ -0,0 +1,49 @@
+import pstats
+import time
+
+from rich.console import Console
+
+from khc_cli.utils.profiling import CommandProfiler
+
+
+def busy(seconds):
+    end = time.process_time() + seconds
+    while time.process_time() < end:
+        pass
+
+
+def waiting(seconds):
+    time.sleep(seconds)
+
+
+def test_profile_splits_cpu_time_and_wait(tmp_path):
+    profiler = CommandProfiler(tmp_path / "run.prof", interval=0.002)
+    profiler.start()
+    busy(0.2)
+    waiting(0.2)
+    profiler.stop()
+
+    stats = pstats.Stats(str(tmp_path / "run.prof"))
+    assert any(name == "busy" for _, _, name in stats.stats)
+    collapsed = (tmp_path / "run.prof.collapsed").read_text(encoding="utf-8").splitlines()
+    assert any(":busy:" in line and ":test_profile_splits_cpu_time_and_wait:" in line for line in collapsed)
+
+    busy_leaf = next(leaf for leaf in profiler.cpu_by_leaf if leaf.endswith(":busy"))
+    sleep_leaf = next(leaf for leaf in profiler.wait_by_leaf if leaf.endswith(":waiting"))
+    if profiler._cpu_clock is not None:
+        assert profiler.cpu_by_leaf[busy_leaf] > profiler.wait_by_leaf[busy_leaf]
+        assert profiler.wait_by_leaf[sleep_leaf] > profiler.cpu_by_leaf[sleep_leaf]
+    assert profiler.wall >= 0.4
+
+
+def test_report_lists_the_hotspots(tmp_path):
+    profiler = CommandProfiler(tmp_path / "run.prof", interval=0.002, top=5)
+    profiler.start()
+    busy(0.05)
+    profiler.stop()
+
+    console = Console(record=True, width=200)
+    profiler.report(console)
+    text = console.export_text()
+    assert "busy" in text
+    assert "run.prof.collapsed" in text
@@ -0,0 +1,88 @@
+import csv
+
+import numpy as np
+import pytest
+
+from khc_cli.utils.project_table import (
+    group_aggregates, load_project_table, project_enrichments, project_report, stale_mask, value_distribution,
+)
+
+NOW = np.datetime64("2024-06-01T00:00:00", "s")
+PROJECTS = [
+    {"project_name": "a", "git_url": "https://github.com/o/a", "rubric": "Solar", "stargazers_count": "100",
+     "last_commit_date": "2024-05-01T00:00:00Z", "dominating_language": "Python", "license": "MIT",
+     "organization_user_name": "o", "organization_country": "", "topics": "pv,solar"},
+    {"project_name": "b", "git_url": "https://github.com/o/b", "rubric": "Solar", "stargazers_count": "50",
+     "last_commit_date": "2020-01-01T00:00:00Z", "dominating_language": "Python", "license": "",
+     "organization_user_name": "o", "organization_country": "", "topics": ""},
+    {"project_name": "c", "git_url": "https://github.com/p/c", "rubric": "Wind", "stargazers_count": "",
+     "last_commit_date": "", "dominating_language": "Julia", "license": "MIT",
+     "organization_user_name": "p", "organization_country": "France", "topics": ""},
+]
+
+
+@pytest.fixture
+def table(tmp_path):
+    projects_csv = tmp_path / "projects.csv"
+    with open(projects_csv, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=list(PROJECTS[0]))
+        writer.writeheader()
+        writer.writerows(PROJECTS)
+    orgs_csv = tmp_path / "github_organizations.csv"
+    with open(orgs_csv, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["organization_user_name", "organization_country"])
+        writer.writeheader()
+        writer.writerow({"organization_user_name": "o", "organization_country": "Germany"})
+    return load_project_table(projects_csv, orgs_csv)
+
+
+def test_columns_are_typed_and_countries_filled_from_organizations(table):
+    assert np.isnan(table["stargazers_count"][2])
+    assert table["stargazers_count"][:2].tolist() == [100.0, 50.0]
+    assert np.isnat(table["last_commit_date"][2])
+    assert table["organization_country"].tolist() == ["Germany", "Germany", "France"]
+
+
+def test_group_aggregates(table):
+    groups = group_aggregates(table, "rubric", stale_days=365, now=NOW)
+    assert groups == [
+        {"group": "Solar", "projects": 2, "stars": 150, "mean_stars": 75.0, "active_ratio": 0.5, "stale": 1},
+        {"group": "Wind", "projects": 1, "stars": 0, "mean_stars": 0.0, "active_ratio": 0.0, "stale": 0},
+    ]
+
+
+def test_stale_mask_ignores_projects_without_commit_date(table):
+    assert stale_mask(table, 365, NOW).tolist() == [False, True, False]
+
+
+def test_value_distribution_skips_empty_values(table):
+    assert value_distribution(table, "license") == [{"value": "MIT", "projects": 2}]
+
+
+def test_project_report(table):
+    report = project_report(table, by="organization_country", stale_days=3 * 365)
+    assert report["projects"] == 3
+    assert [group["group"] for group in report["groups"]] == ["Germany", "France"]
+    assert [project["project_name"] for project in report["stale_projects"]] == ["b"]
+
+
+def test_project_enrichments_are_keyed_by_canonical_repository(tmp_path, table):
+    enrichments = project_enrichments(tmp_path / "projects.csv")
+    assert enrichments["o/a"]["topics"] == "pv solar"
+    assert enrichments["p/c"]["languages"] == "Julia"
+    assert project_enrichments(tmp_path / "missing.csv") == {}
+
+
+def test_dates_are_converted_to_utc_and_bad_cells_are_missing(tmp_path):
+    projects_csv = tmp_path / "projects.csv"
+    with open(projects_csv, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["project_name", "last_commit_date"])
+        writer.writeheader()
+        for name, date in [("offset", "2024-05-01T23:30:00-05:00"), ("utc", "2024-05-01T10:00:00.123Z"),
+                           ("naive", "2024-05-01T10:00:00"), ("broken", "n/a"), ("empty", "")]:
+            writer.writerow({"project_name": name, "last_commit_date": date})
+
+    dates = load_project_table(projects_csv)["last_commit_date"]
+    assert list(dates[:3]) == [np.datetime64("2024-05-02T04:30:00"), np.datetime64("2024-05-01T10:00:00"),
+                               np.datetime64("2024-05-01T10:00:00")]
+    assert np.isnat(dates[3]) and np.isnat(dates[4])
@@ -0,0 +1,118 @@
+import base64
+import csv
+import json
+
+import pytest
+import requests
+from typer.testing import CliRunner
+
+from khc_cli.commands import analyze
+from khc_cli.utils.readme_store import INDEX_NAME, BlobStore, ReadmeFetcher
+
+README = "# Project\n\nSolar [forecasting](https://example.org).\n"
+
+
+def test_blob_store_deduplicates_contents(tmp_path):
+    store = BlobStore(tmp_path)
+    digest = store.put(README)
+    assert store.put(README.encode("utf-8")) == digest
+    assert store.written == 1
+    assert digest in store and store.get(digest) == README
+    assert store.get("0" * 64) is None and store.get(None) is None
+    assert "0" * 64 not in store
+
+
+class FakeReadmes:
+    """Answers README requests, conditionally on the ETag of the current version."""
+
+    def __init__(self, monkeypatch):
+        self.readmes = {}
+        self.sent = []
+        monkeypatch.setattr(requests.Session, "request", lambda session, *args, **kwargs: self.http(*args, **kwargs))
+
+    def http(self, method, url, headers=None, **kwargs):
+        repo_path = url.split("/repos/")[1].removesuffix("/readme")
+        # Repository paths are case-insensitive
+        etag = (headers or {}).get("If-None-Match")
+        self.sent.append((repo_path, etag))
+        response = requests.Response()
+        response.url = url
+        content = self.readmes.get(repo_path.lower())
+        if content is None:
+            response.status_code, response._content = 404, b"{}"
+        elif etag == f'"{content}"':
+            response.status_code, response._content = 304, b""
+        else:
+            response.status_code = 200
+            response.headers["ETag"] = f'"{content}"'
+            response._content = json.dumps({
+                "sha": str(hash(content)), "content": base64.b64encode(content.encode()).decode()
+            }).encode()
+        return response
+
+
+@pytest.fixture
+def readmes(monkeypatch):
+    return FakeReadmes(monkeypatch)
+
+
+def test_unchanged_readmes_are_fetched_conditionally(readmes, tmp_path):
+    readmes.readmes["owner/repo"] = README
+    fetcher = ReadmeFetcher(tmp_path)
+    first = fetcher.fetch("owner/repo")
+    fetcher.close()
+
+    fetcher = ReadmeFetcher(tmp_path)
+    assert fetcher.fetch("Owner/Repo") == first
+    assert readmes.sent == [("owner/repo", None), ("Owner/Repo", f'"{README}"')]
+    assert fetcher.stats == {"fetched": 0, "not_modified": 1}
+
+    readmes.readmes["owner/repo"] = README + "More.\n"
+    changed = fetcher.fetch("Owner/Repo")
+    assert changed["hash"] != first["hash"]
+    assert fetcher.store.get(changed["hash"]).endswith("More.\n")
+    fetcher.close()
+
+
+def test_missing_readme_is_forgotten(readmes, tmp_path):
+    readmes.readmes["owner/repo"] = README
+    fetcher = ReadmeFetcher(tmp_path)
+    fetcher.fetch("owner/repo")
+    del readmes.readmes["owner/repo"]
+    assert fetcher.fetch("owner/repo") is None
+    fetcher.close()
+    assert json.loads((tmp_path / INDEX_NAME).read_text()) == {}
+
+
+def test_analyze_readme_prints_the_raw_markdown(tmp_path):
+    digest = BlobStore(tmp_path / "readmes").put("[bold]Not markup[/bold]")
+    with open(tmp_path / "projects.csv", "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["git_url", "readme_content"])
+        writer.writeheader()
+        writer.writerow({"git_url": "https://github.com/Owner/Repo", "readme_content": digest})
+
+    result = CliRunner().invoke(analyze.app, ["readme", "owner/repo", "--output-dir", str(tmp_path)])
+    assert result.exit_code == 0
+    assert result.output == "[bold]Not markup[/bold]\n"
+    result = CliRunner().invoke(analyze.app, ["readme", "owner/other", "--output-dir", str(tmp_path)])
+    assert result.exit_code == 1
+
+
+def test_analyze_readme_keeps_non_utf8_bytes(tmp_path):
+    store = BlobStore(tmp_path / "readmes")
+    latin1 = "Café crème\n".encode("latin-1")
+    utf16 = "Ünïcode".encode("utf-16")
+    rows = [{"git_url": "https://github.com/owner/latin", "readme_content": store.put(latin1)},
+            {"git_url": "https://github.com/owner/wide", "readme_content": store.put(utf16)}]
+    with open(tmp_path / "projects.csv", "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["git_url", "readme_content"])
+        writer.writeheader()
+        writer.writerows(rows)
+
+    assert store.get(rows[0]["readme_content"]) == "Caf\ufffd cr\ufffdme\n"
+    result = CliRunner().invoke(analyze.app, ["readme", "owner/latin", "--output-dir", str(tmp_path)])
+    assert result.exit_code == 0
+    assert result.stdout_bytes == latin1
+    result = CliRunner().invoke(analyze.app, ["readme", "owner/wide", "--output-dir", str(tmp_path)])
+    assert result.exit_code == 0
+    assert result.stdout_bytes == utf16 + b"\n"
@@ -0,0 +1,105 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from typer.testing import CliRunner
+
+from khc_cli import github_client
+from khc_cli.awesomecure.awesome2py import AwesomeList
+from khc_cli.commands import curate
+from khc_cli.utils.rubric_index import RubricIndex, project_terms
+
+LIST = """# Awesome Test
+
+## Contents
+
+- [Energy](#energy)
+- [Water](#water)
+
+## Energy
+
+- [pvlib](https://github.com/pvlib/pvlib-python) - Simulate solar photovoltaic power output.
+- [windpowerlib](https://github.com/wind-python/windpowerlib) - Wind turbine power output models.
+
+## Water
+
+- [pastas](https://github.com/pastas/pastas) - Groundwater level time series analysis.
+- [flopy](https://github.com/modflowpy/flopy) - Groundwater flow models with MODFLOW.
+"""
+
+
+@pytest.fixture
+def readme(tmp_path):
+    path = tmp_path / "README.md"
+    path.write_text(LIST, encoding="utf-8")
+    return path
+
+
+def build(index_path, readme):
+    index = RubricIndex(index_path)
+    return index, index.update(lambda: AwesomeList(str(readme), lazy=True), readme)
+
+
+def test_project_terms_weigh_topics_and_languages():
+    terms = project_terms("The solar tool", ["solar-energy"], ["Python"])
+    assert terms == {"solar": 2, "topic:solar-energy": 2, "energy": 1, "lang:python": 1}
+
+
+def test_suggest_ranks_the_most_similar_rubric_first(tmp_path, readme):
+    index, tokenized = build(tmp_path / "index.npz", readme)
+    assert tokenized == 4
+    assert index.suggest("Groundwater model calibration")[0][0] == "Water"
+    assert [rubric for rubric, _ in index.suggest("Solar power forecasting")] == ["Energy"]
+    assert index.suggest("Unrelated words only") == []
+
+
+def test_index_is_reloaded_and_only_rebuilt_when_the_list_changes(tmp_path, readme):
+    first, _ = build(tmp_path / "index.npz", readme)
+    index, tokenized = build(tmp_path / "index.npz", readme)
+    assert tokenized is None
+    assert index.rubrics == first.rubrics
+    np.testing.assert_allclose(index.data, first.data)
+
+    readme.write_text(LIST + "- [hydropower](https://github.com/o/hydro) - Run-of-river power.\n", encoding="utf-8")
+    _, tokenized = build(tmp_path / "index.npz", readme)
+    # Terms of unchanged entries are reused
+    assert tokenized == 1
+
+
+@pytest.mark.parametrize("content", [b"not a zip file", None])
+def test_unreadable_index_is_rebuilt(tmp_path, readme, content):
+    index_path = tmp_path / "index.npz"
+    if content is None:
+        # Older format, without the metadata array
+        np.savez_compressed(index_path, data=np.zeros(0))
+    else:
+        index_path.write_bytes(content)
+
+    index, tokenized = build(index_path, readme)
+    assert tokenized == 4
+    assert index.suggest("Groundwater")[0][0] == "Water"
+    assert RubricIndex(index_path).rubrics == ["Energy", "Water"]
+
+
+def add_project(monkeypatch, tmp_path, readme, *options):
+    repo = SimpleNamespace(name="modflow6", description="Groundwater flow models", topics=["groundwater"],
+                           language="Fortran")
+    monkeypatch.setattr(github_client, "GitHubClient",
+                        lambda key=None: SimpleNamespace(client=SimpleNamespace(get_repo=lambda path: repo)))
+    return CliRunner().invoke(curate.app, [
+        "add-project", "https://github.com/MODFLOW-USGS/modflow6", "--readme-path", str(readme),
+        "--projects-csv", str(tmp_path / "projects.csv"), "--index-path", str(tmp_path / "index.npz"), *options,
+    ])
+
+
+def test_add_project_only_suggests_a_section_on_request(monkeypatch, tmp_path, readme):
+    result = add_project(monkeypatch, tmp_path, readme)
+    assert result.exit_code == 0
+    assert readme.read_text(encoding="utf-8").rstrip().endswith("modflow6) - Groundwater flow models")
+
+    readme.write_text(LIST, encoding="utf-8")
+    result = add_project(monkeypatch, tmp_path, readme, "--suggest")
+    assert result.exit_code == 0
+    assert "Suggested section: Water" in result.output
+    water = readme.read_text(encoding="utf-8").split("## Water")[1]
+    assert "[modflow6](https://github.com/MODFLOW-USGS/modflow6)" in water
@@ -0,0 +1,68 @@
+from datetime import datetime, timedelta, timezone
+
+from khc_cli.utils.scheduler import DEFAULT_INTERVAL_HOURS, MIN_INTERVAL_HOURS, RefreshSchedule
+
+NOW = datetime(2024, 6, 1, tzinfo=timezone.utc)
+REPO = {"pushed_at": "2024-05-01T00:00:00Z", "updated_at": "2024-05-01T00:00:00Z", "stargazers_count": 100}
+
+
+def test_interval_shrinks_on_change_and_grows_otherwise(tmp_path):
+    schedule = RefreshSchedule(tmp_path / "schedule.json")
+    schedule.record("Owner/Repo", REPO, NOW)
+    assert schedule.repos["owner/repo"]["interval_hours"] == DEFAULT_INTERVAL_HOURS
+
+    schedule.record("owner/repo", REPO, NOW + timedelta(days=1))
+    assert schedule.repos["owner/repo"]["interval_hours"] == DEFAULT_INTERVAL_HOURS * 1.5
+
+    schedule.record("owner/repo", dict(REPO, pushed_at="2024-06-02T00:00:00Z"), NOW + timedelta(days=2))
+    assert schedule.repos["owner/repo"]["interval_hours"] == max(DEFAULT_INTERVAL_HOURS * 0.75, MIN_INTERVAL_HOURS)
+
+    schedule.save()
+    assert RefreshSchedule(tmp_path / "schedule.json").repos == schedule.repos
+
+
+def test_only_due_repositories_have_a_priority():
+    schedule = RefreshSchedule()
+    schedule.record("owner/fresh", REPO, NOW)
+    assert schedule.priority("owner/fresh", NOW + timedelta(hours=1)) is None
+    assert schedule.priority("owner/fresh", NOW + timedelta(days=2)) > 0
+    assert schedule.priority("owner/never-fetched", NOW) == float("inf")
+
+
+def test_select_charges_every_enabled_stage():
+    schedule = RefreshSchedule()
+    keys = [f"owner{i // 2}/repo{i}" for i in range(10)]
+
+    # Metadata per repository, organization per owner
+    assert len(schedule.select(keys, 10, now=NOW)) == 6
+    # Plus README and clone per repository, and one query per batch of 20 issue lookups
+    selected = schedule.select(keys, 10, now=NOW, per_repo=3, batched=(20,))
+    assert selected == {"owner0/repo0", "owner0/repo1"}
+
+
+def test_select_prefers_repositories_without_payload():
+    schedule = RefreshSchedule()
+    for key in ["a/old", "b/old"]:
+        schedule.record(key, REPO, NOW - timedelta(days=30))
+    selected = schedule.select(["a/old", "b/old", "c/new"], 2, fetchable={"c/new"}, now=NOW)
+    assert selected == {"c/new"}
+
+
+def test_new_release_counts_as_a_change():
+    schedule = RefreshSchedule()
+    schedule.record("owner/repo", REPO, NOW, release="v1.0")
+    schedule.record("owner/repo", REPO, NOW + timedelta(days=1))
+    # Release not fetched this time: the known one is kept, nothing changed
+    assert schedule.repos["owner/repo"]["release"] == "v1.0"
+    assert schedule.repos["owner/repo"]["interval_hours"] == DEFAULT_INTERVAL_HOURS * 1.5
+
+    schedule.record("owner/repo", REPO, NOW + timedelta(days=2), release="v1.1")
+    assert schedule.repos["owner/repo"]["interval_hours"] == DEFAULT_INTERVAL_HOURS * 0.75
+
+
+def test_states_without_release_are_not_seen_as_changed():
+    schedule = RefreshSchedule()
+    schedule.record("owner/repo", REPO, NOW)
+    del schedule.repos["owner/repo"]["release"]
+    schedule.record("owner/repo", REPO, NOW + timedelta(days=1), release="v1.0")
+    assert schedule.repos["owner/repo"]["interval_hours"] == DEFAULT_INTERVAL_HOURS * 1.5
@@ -0,0 +1,51 @@
+import pytest
+
+from khc_cli.utils.scraping import find_readme_container, parse_dependents_page
+
+DEPENDENTS_PAGE = b"""<html><body><header><div class="Box-row">not a dependent</div></header>
+<div class="Box-row"><a data-repository-hovercards-enabled="" href="/alice">alice</a> /
+<a data-hovercard-type="repository" href="/alice/solar">solar</a></div>
+<div class="Box-row"><a data-repository-hovercards-enabled="" href="/bob">bob</a> /
+<a data-hovercard-type="repository" href="/bob/wind">wind</a></div>
+<div class="paginate-container"><div class="BtnGroup"><a href="?page=1">Previous</a>
+<a href="?dependents_after=abc">Next</a></div></div></body></html>"""
+
+# README inside the repository container, as on current GitHub markup
+REPOSITORY_PAGE = b"""<html><body><main id="js-repo-pjax-container">
+<table><tr><td><a href="/owner/repo/blob/main/setup.py">setup.py</a></td></tr></table>
+<div id="readme"><article class="markdown-body entry-content"><h1>Repo</h1><p>Hello</p></article></div>
+<div class="Layout-sidebar">About</div></main></body></html>"""
+
+
+@pytest.mark.parametrize("parser", ["html.parser", None])
+def test_parse_dependents_page(parser):
+    dependents, next_url = parse_dependents_page(DEPENDENTS_PAGE, parser)
+    assert dependents == ["alice/solar", "bob/wind"]
+    assert next_url == "?dependents_after=abc"
+
+
+def test_last_dependents_page_has_no_next_url():
+    dependents, next_url = parse_dependents_page(b"<html><body></body></html>")
+    assert (dependents, next_url) == ([], None)
+
+
+def test_readme_is_extracted_without_building_the_repository_container():
+    kind, container = find_readme_container(REPOSITORY_PAGE)
+    assert kind == "readme"
+    assert container.find("article").h1.get_text() == "Repo"
+    # Only the README subtree was built, not the file tree around it
+    assert container.find_parent("main") is None
+    assert "setup.py" not in str(container.find_parent() or "")
+
+
+def test_markdown_body_article_is_the_first_fallback():
+    page = b'<html><body><main id="js-repo-pjax-container"><article class="markdown-body">Text</article></main></body></html>'
+    kind, container = find_readme_container(page)
+    assert (kind, container.name, container.get_text()) == ("markdown-body", "article", "Text")
+
+
+def test_repository_container_is_the_last_resort():
+    page = b'<html><body><main id="js-repo-pjax-container"><p>Only text</p></main></body></html>'
+    kind, container = find_readme_container(page)
+    assert (kind, container.get_text()) == ("main", "Only text")
+    assert find_readme_container(b"<html><body><p>nothing</p></body></html>") == (None, None)
@@ -0,0 +1,95 @@
+import csv
+import os
+
+import pytest
+
+from khc_cli.awesomecure.awesome2py import AwesomeList
+from khc_cli.utils.search_index import SearchIndex, fts_query
+
+LIST = """# Awesome Test
+
+## Contents
+
+- [Energy](#energy)
+- [Climate](#climate)
+
+## Energy
+
+- [pvlib](https://github.com/pvlib/pvlib-python) - Simulate the performance of photovoltaic energy systems.
+- [Open Energy Modelling](https://github.com/oemof/oemof-solph) - Model energy supply systems.
+
+## Climate
+
+- [pastas](https://github.com/pastas/pastas) - Analysis of groundwater time series.
+"""
+
+
+def write(path, content):
+    path.write_text(content, encoding="utf-8")
+    # Modification times can be equal within a test: force a new signature
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+@pytest.fixture
+def index(tmp_path):
+    readme = tmp_path / "README.md"
+    write(readme, LIST)
+    with SearchIndex(tmp_path / "search.sqlite") as index:
+        index.readme = readme
+        yield index
+
+
+def update(index, projects_csv_path=None):
+    return index.update(lambda: AwesomeList(str(index.readme), lazy=True), index.readme, projects_csv_path)
+
+
+def names(results):
+    return [result["name"] for result in results]
+
+
+def test_fts_query():
+    assert fts_query("solar forecast") == '"solar" "forecast"*'
+    assert fts_query('"exact phrase" OR pv*') == '"exact phrase" OR pv*'
+    assert fts_query("  -- ") is None
+
+
+def test_updates_are_incremental(index, tmp_path):
+    assert update(index) == {"added": 3, "updated": 0, "removed": 0}
+    assert update(index) is None
+
+    write(index.readme, LIST.replace("Analysis of groundwater", "Groundwater").replace(
+        "- [Open Energy Modelling](https://github.com/oemof/oemof-solph) - Model energy supply systems.\n", ""
+    ))
+    assert update(index) == {"added": 0, "updated": 1, "removed": 1}
+    assert names(index.search("energy")) == ["pvlib"]
+
+    # Metadata of the ETL output is indexed too
+    projects = tmp_path / "projects.csv"
+    with open(projects, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["git_url", "topics", "languages", "organization_name"])
+        writer.writeheader()
+        writer.writerow({"git_url": "https://github.com/pastas/pastas", "topics": "hydrology,groundwater",
+                         "languages": "Python", "organization_name": "Pastas"})
+    assert update(index, projects) == {"added": 0, "updated": 1, "removed": 0}
+    assert names(index.search("hydrology")) == ["pastas"]
+
+
+def test_search_ranks_names_first_and_matches_prefixes(index):
+    update(index)
+    assert names(index.search("energy")) == ["Open Energy Modelling", "pvlib"]
+    assert names(index.search("photovolt")) == ["pvlib"]
+    assert names(index.search("energy", limit=1)) == ["Open Energy Modelling"]
+    assert index.search("pvlib")[0]["rubric"] == "Energy"
+
+
+def test_lookup_by_repository_url(index):
+    update(index)
+    assert names(index.lookup("http://www.github.com/PVLib/pvlib-python.git")) == ["pvlib"]
+    assert index.lookup("https://github.com/owner/unlisted") == []
+
+
+def test_invalid_query_raises_value_error(index):
+    update(index)
+    with pytest.raises(ValueError, match="Invalid search query"):
+        index.search('"unbalanced')
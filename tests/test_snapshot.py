@@ -0,0 +1,61 @@
+import csv
+
+from khc_cli.commands.etl import run_transform_from_snapshot
+from khc_cli.utils.snapshot import SnapshotWriter, iter_records, list_segments, load_snapshot, payload_id
+
+ENTRY = {"name": "Project", "url": "https://github.com/owner/project", "text": "- A project.", "rubric": "Energy"}
+REPO = {
+    "full_name": "owner/project",
+    "owner": {"login": "owner", "type": "Organization"},
+    "stargazers_count": 42,
+    "created_at": "2020-01-01T00:00:00Z",
+}
+ORGANIZATION = {"login": "owner", "name": "Owner", "location": "Berlin"}
+
+
+def test_payload_id_ignores_key_order():
+    assert payload_id({"a": 1, "b": 2}) == payload_id({"b": 2, "a": 1})
+    assert payload_id({"a": 1}) != payload_id({"a": 2})
+
+
+def test_segment_round_trip_stores_shared_organizations_once(tmp_path):
+    with SnapshotWriter(tmp_path, run_id="1") as writer:
+        writer.add_repo("owner/project", ENTRY, {"repo": REPO}, "2024-01-01T00:00:00+00:00")
+        writer.add_organization("owner", ORGANIZATION)
+        writer.add_repo("owner/other", dict(ENTRY, url="https://github.com/owner/other"), {}, None)
+        writer.add_organization("owner", ORGANIZATION)
+
+    kinds = [record["kind"] for record in iter_records(writer.path)]
+    assert kinds == ["repo", "organization", "repo"]
+    repo_records, organizations = load_snapshot(tmp_path)
+    assert [record["key"] for record in repo_records] == ["owner/project", "owner/other"]
+    assert organizations == {"owner": ORGANIZATION}
+
+
+def test_load_snapshot_reads_the_latest_segment(tmp_path):
+    with SnapshotWriter(tmp_path, run_id="1") as writer:
+        writer.add_repo("old/project", ENTRY, {})
+    with SnapshotWriter(tmp_path, run_id="2") as writer:
+        writer.add_repo("new/project", ENTRY, {})
+
+    assert len(list_segments(tmp_path)) == 2
+    repo_records, _ = load_snapshot(tmp_path)
+    assert [record["key"] for record in repo_records] == ["new/project"]
+
+
+def test_transform_from_snapshot_rebuilds_the_csv_offline(tmp_path):
+    with SnapshotWriter(tmp_path / "snapshots", run_id="1") as writer:
+        writer.add_repo("owner/project", ENTRY, {"repo": REPO}, "2024-01-01T00:00:00+00:00")
+        writer.add_organization("owner", ORGANIZATION)
+
+    projects_csv = tmp_path / "projects.csv"
+    count = run_transform_from_snapshot(tmp_path / "snapshots", projects_csv, tmp_path / "orgs.csv")
+
+    assert count == 1
+    with open(projects_csv, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert rows[0]["project_name"] == "Project"
+    assert rows[0]["oneliner"] == "A project."
+    assert rows[0]["stargazers_count"] == "42"
+    assert rows[0]["project_age_in_days"] == "1461"
+    assert rows[0]["organization_name"] == "Owner"
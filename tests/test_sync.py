@@ -0,0 +1,105 @@
+import csv
+
+import pytest
+
+from khc_cli.awesomecure.awesome2py import AwesomeList
+from khc_cli.commands import sync
+from khc_cli.utils.snapshot import load_snapshot
+
+LIST = """# Awesome Test
+
+## Contents
+
+- [Climate](#climate)
+
+## Climate
+
+- [E3SM](https://github.com/e3sm-project/e3sm) - Earth system model.
+- [pastas](https://github.com/pastas/pastas) - Groundwater time series.
+"""
+
+
+def test_diff_entries_ignores_key_casing():
+    record = {"name": "E3SM", "text": "- Model.", "url": "u", "rubric": "Climate"}
+    diff = sync.diff_entries(
+        {"e3sm-project/e3sm": record, "old/gone": record},
+        {"E3SM-Project/E3SM": dict(record, rubric="Earth"), "new/one": record},
+    )
+    assert diff == {"added": ["new/one"], "removed": ["old/gone"], "moved": ["E3SM-Project/E3SM"], "changed": []}
+
+
+class FakeGitHub:
+    """Stands in for the GitHub API: list HEAD, list README and repository payloads."""
+
+    def __init__(self, monkeypatch, tmp_path):
+        self.readme = tmp_path / "list.md"
+        self.readme.write_text(LIST, encoding="utf-8")
+        self.sha = "sha1"
+        self.failing = set()
+        self.fetched = []
+        monkeypatch.setenv("GITHUB_API_KEY", "token")
+        monkeypatch.setattr(sync, "fetch_head_sha", self.fetch_head_sha)
+        monkeypatch.setattr(sync, "fetch_awesome_readme_content", self.fetch_list)
+        monkeypatch.setattr(sync, "extract_github_payload", self.extract)
+
+    def fetch_head_sha(self, awesome_repo_path, github_api_key=None, etag=None):
+        # Conditional request: unchanged HEAD answers 304
+        return (None, etag) if etag == self.sha else (self.sha, self.sha)
+
+    def fetch_list(self, g, awesome_repo_path, readme_filename, local_readme_path, lazy=False):
+        return AwesomeList(str(self.readme), lazy=lazy)
+
+    def extract(self, g, key):
+        self.fetched.append(key)
+        if key.lower() in self.failing:
+            raise RuntimeError("API error")
+        full_name = {"e3sm-project/e3sm": "E3SM-Project/E3SM"}.get(key.lower(), key)
+        return {"repo": {"full_name": full_name, "owner": {"login": full_name.split("/")[0]},
+                         "stargazers_count": 10}}, None
+
+
+@pytest.fixture
+def github(monkeypatch, tmp_path):
+    return FakeGitHub(monkeypatch, tmp_path)
+
+
+def run(tmp_path):
+    return sync.run_sync_pipeline(
+        "https://github.com/owner/list", "README.md", tmp_path / "cache.md",
+        tmp_path / "projects.csv", tmp_path / "orgs.csv", tmp_path / "state.json",
+        snapshot_dir=tmp_path / "snapshots", repo_index_path=tmp_path / "repo-index.json",
+    )
+
+
+def rows(tmp_path):
+    with open(tmp_path / "projects.csv", newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def test_unchanged_rows_keep_their_payload_after_a_rename_changed_the_key_casing(github, tmp_path):
+    run(tmp_path)
+    assert github.fetched == ["e3sm-project/e3sm", "pastas/pastas"]
+
+    # The list moved, but not these entries: nothing is fetched again
+    github.sha = "sha2"
+    diff = run(tmp_path)
+    assert diff["added"] == [] and diff["removed"] == []
+    assert len(github.fetched) == 2
+    assert [row["stargazers_count"] for row in rows(tmp_path)] == ["10", "10"]
+    records, _ = load_snapshot(tmp_path / "snapshots")
+    assert [record["payload"]["repo"]["full_name"] for record in records] == ["E3SM-Project/E3SM", "pastas/pastas"]
+
+
+def test_failed_entries_are_retried_when_the_list_did_not_move(github, tmp_path):
+    github.failing = {"pastas/pastas"}
+    diff = run(tmp_path)
+    assert diff["failures"] == ["https://github.com/pastas/pastas"]
+
+    github.failing = set()
+    diff = run(tmp_path)
+    assert diff["added"] == ["pastas/pastas"]
+    assert github.fetched.count("pastas/pastas") == 2
+    assert len(rows(tmp_path)) == 2
+
+    # Nothing left to retry: the next run stops at the conditional HEAD request
+    assert run(tmp_path) is None
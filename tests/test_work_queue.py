@@ -0,0 +1,121 @@
+import time
+
+from khc_cli.utils.work_queue import CLAIMED, DONE, FAILED, PENDING, WorkQueue
+
+
+def make_queue(tmp_path, **kwargs):
+    queue = WorkQueue(tmp_path / "queue.sqlite", **kwargs)
+    queue.enqueue([(f"owner/repo{i}", {"url": f"https://github.com/owner/repo{i}"}) for i in range(5)])
+    return queue
+
+
+def test_claims_follow_list_order_and_do_not_overlap(tmp_path):
+    with make_queue(tmp_path) as queue:
+        first = queue.claim("a", batch_size=3)
+        second = queue.claim("b", batch_size=3)
+        assert [key for _, key, _ in first] == ["owner/repo0", "owner/repo1", "owner/repo2"]
+        assert [key for _, key, _ in second] == ["owner/repo3", "owner/repo4"]
+        assert queue.claim("c") == []
+        assert queue.counts() == {CLAIMED: 5}
+
+
+def test_results_are_read_back_in_list_order(tmp_path):
+    with make_queue(tmp_path) as queue:
+        batch = queue.claim("a", batch_size=5)
+        for item_id, key, _ in reversed(batch):
+            assert queue.complete(item_id, "a", {"repo": {"full_name": key}}, None, "2024-01-01")
+        results = list(queue.iter_results())
+        assert [key for key, *_ in results] == [f"owner/repo{i}" for i in range(5)]
+        assert all(status == DONE for _, _, status, *_ in results)
+        assert results[0][3] == {"repo": {"full_name": "owner/repo0"}}
+
+
+def test_expired_lease_is_handed_out_again(tmp_path):
+    with make_queue(tmp_path, lease_seconds=0.05) as queue:
+        stale = queue.claim("a", batch_size=1)
+        time.sleep(0.1)
+        taken_over = queue.claim("b", batch_size=1)
+        assert [key for _, key, _ in taken_over] == [key for _, key, _ in stale]
+
+
+def test_complete_after_losing_the_lease_is_rejected(tmp_path):
+    with make_queue(tmp_path, lease_seconds=0.05) as queue:
+        (item_id, _, _), = queue.claim("a", batch_size=1)
+        time.sleep(0.1)
+        queue.claim("b", batch_size=1)
+        assert queue.complete(item_id, "b", {"repo": "from b"}, None, "t1")
+        # The late answer of the first worker must not overwrite the result of its successor
+        assert not queue.complete(item_id, "a", {"repo": "from a"}, None, "t0")
+        assert not queue.fail(item_id, "a", "timeout")
+        key, entry, status, payload, *_ = next(queue.iter_results())
+        assert (status, payload) == (DONE, {"repo": "from b"})
+
+
+def test_complete_with_an_expired_lease_is_rejected(tmp_path):
+    with make_queue(tmp_path, lease_seconds=0.05) as queue:
+        (item_id, _, _), = queue.claim("a", batch_size=1)
+        time.sleep(0.1)
+        assert not queue.complete(item_id, "a", {}, None, "t0")
+
+
+def test_failures_are_retried_until_max_attempts(tmp_path):
+    with make_queue(tmp_path, max_attempts=2) as queue:
+        (item_id, _, _), = queue.claim("a", batch_size=1)
+        assert queue.fail(item_id, "a", "boom")
+        assert queue.counts()[PENDING] == 5
+        (retried_id, _, _), = queue.claim("a", batch_size=1)
+        assert retried_id == item_id
+        assert queue.fail(item_id, "a", "boom again")
+        assert queue.counts()[FAILED] == 1
+
+
+def test_items_whose_leases_keep_expiring_end_up_failed(tmp_path):
+    with WorkQueue(tmp_path / "queue.sqlite", lease_seconds=0, max_attempts=2) as queue:
+        queue.enqueue([("owner/crash", {"url": "https://github.com/owner/crash"})])
+        assert len(queue.claim("a")) == 1
+        time.sleep(0.01)
+        assert len(queue.claim("b")) == 1
+        time.sleep(0.01)
+        # Second lease expired too: the shard finishes instead of handing it out forever
+        assert queue.claim("c") == []
+        assert queue.counts() == {FAILED: 1}
+        *_, error = next(queue.iter_results())
+        assert error == "lease expired"
+
+
+def test_workers_with_the_same_index_get_distinct_identifiers(tmp_path, monkeypatch):
+    from khc_cli.commands import shard
+
+    # Two shard runs on hosts or containers sharing a hostname
+    monkeypatch.setattr(shard.socket, "gethostname", lambda: "host")
+    first, second = shard.default_worker_id(), shard.default_worker_id()
+    assert first != second
+
+    with make_queue(tmp_path, lease_seconds=0.05) as queue:
+        (item_id, _, _), = queue.claim(first, batch_size=1)
+        time.sleep(0.1)
+        queue.claim(second, batch_size=1)
+        assert not queue.complete(item_id, first, {"repo": "stale"}, None, "t0")
+        assert queue.complete(item_id, second, {"repo": "current"}, None, "t1")
+
+
+def test_local_workers_do_not_share_identifiers(monkeypatch):
+    from khc_cli.commands import shard
+
+    started = []
+
+    class FakeProcess:
+        def __init__(self, target, args, kwargs):
+            started.append(kwargs)
+
+        def start(self):
+            pass
+
+        def join(self):
+            pass
+
+    monkeypatch.setattr(shard.multiprocessing, "Process", FakeProcess)
+    shard.run_shard_workers("queue.sqlite", "token", processes=2)
+    shard.run_shard_workers("queue.sqlite", "token", processes=2)
+    # Identifiers are left to each process (host, pid and a random suffix)
+    assert all("worker_id" not in kwargs for kwargs in started)